@@ -5,24 +5,59 @@ import json
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class AgentBase:
+    handled_task_types = ()  # Task types this agent accepts; indexed by the core's dispatcher
+    max_concurrency = 1  # Tasks the core's executor may run on this agent at once
+    execution_mode = 'thread'  # 'process' lets offload() move CPU-bound work to the process pool
+    tier = None  # 'edge' or 'fog' places the agent in the core's topology
+
     def __init__(self, agent_id):
         self.agent_id = agent_id
         self.core = None  # Will be set when registered with the core
         self.state = {}
         logging.info(f"AgentBase {self.agent_id} initialized")
 
+    def on_register(self, core):
+        # Called by the core once the agent is registered; start background work here
+        pass
+
+    def on_unregister(self):
+        # Called by the core on unregister and shutdown; stop background work here
+        pass
+
     def can_handle(self, task):
-        return False
+        return task.get('type') in self.handled_task_types
+
+    def can_steal(self, task):
+        # Whether this agent may take task from the backlog of a busier agent of the same class
+        return self.can_handle(task)
 
     def receive_task(self, task):
         pass
 
+    def prefetch(self, task):
+        # Called when task is queued behind running ones; start non-blocking I/O for it here
+        pass
+
+    def offload(self, task):
+        # Return a picklable (func, args) pair to run the task in a worker process, or None
+        return None
+
+    def complete_offload(self, task, result):
+        self.report(result)
+
     def report(self, data):
         if self.core:
             self.core.receive_report(self.agent_id, data)
         else:
             logging.warning(f"{self.agent_id} has no core reference")
 
+    def send_message(self, queue, message):
+        # Through the core's transport: handed over in-process unless queue is bound as remote
+        if self.core:
+            self.core.transport.send(queue, message)
+        else:
+            logging.warning(f"{self.agent_id} has no core reference")
+
     def update_state(self, key, value):
         self.state[key] = value
         logging.info(f"{self.agent_id} state updated: {key} = {value}")
@@ -38,6 +73,13 @@ class AgentBase:
         except Exception as e:
             logging.error(f"Error saving state for {self.agent_id}: {e}")
 
+    def checkpoint_state(self):
+        # (metadata, arrays) for utils.checkpoint; arrays are stored raw and restored memory-mapped
+        return {'state': self.state}, {}
+
+    def restore_checkpoint(self, metadata, arrays):
+        self.state = metadata.get('state', {})
+
     def load_state(self, filepath):
         try:
             with open(filepath, 'r') as file:
@@ -1,40 +1,13 @@
-import pika
 import logging
-import threading
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime=s - %(levelname=s - %(message=s')
-
-class CommunicationManager:
-    def __init__(self, host='localhost'):
-        self.host = host
-        self.connection = pika.BlockingConnection(pika.ConnectionParameters(host))
-        self.channel = self.connection.channel()
-        logging.info("CommunicationManager initialized")
+from utils.communication import Communication
 
-    def send_message(self, queue, message):
-        try:
-            self.channel.queue_declare(queue=queue)
-            self.channel.basic_publish(exchange='', routing_key=queue, body=message)
-            logging.info(f"Message sent to queue {queue}: {message}")
-        except Exception as e:
-            logging.error(f"Error sending message to queue {queue}: {e}")
-
-    def receive_messages(self, queue, callback):
-        try:
-            self.channel.queue_declare(queue=queue)
-            self.channel.basic_consume(queue=queue, on_message_callback=callback, auto_ack=True)
-            logging.info(f"Waiting for messages from queue {queue}")
-            self.channel.start_consuming()
-        except Exception as e:
-            logging.error(f"Error receiving messages from queue {queue}: {e}")
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    def close_connection(self):
-        try:
-            self.connection.close()
-            logging.info("CommunicationManager connection closed")
-        except Exception as e:
-            logging.error(f"Error closing CommunicationManager connection: {e}")
+# Kept for existing imports: the pika wrapper lives in utils.communication, and new
+# code should go through utils.transport so in-process traffic skips the broker.
+CommunicationManager = Communication
 
 # Example usage
 def example_callback(ch, method, properties, body):
@@ -1,29 +1,27 @@
 from learning_agent_base import LearningAgentBase
 import logging
-import requests
-from bs4 import BeautifulSoup
-import spacy
-from transformers import pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
-import numpy as np
+from urllib.parse import quote_plus
+from utils.model_registry import model_registry
+from utils import inference_batcher
+from utils.web_fetcher import web_fetcher
+from utils.nlp_cache import nlp_cache
+from utils.topic_model import topic_model
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class CuriosityEngine(LearningAgentBase):
+    handled_task_types = ('explore',)
+    search_url_template = "https://www.google.com/search?q={query}"
+    nlp_batch_size = 32
+
     def __init__(self, agent_id):
         state_size = 100  # Define based on actual states
         action_size = 10  # Define based on actual actions
         super().__init__(agent_id, state_size, action_size)
-        self.nlp = spacy.load("en_core_web_sm")
-        self.summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-        self.vectorizer = TfidfVectorizer(stop_words='english')
+        self.topic_model = topic_model  # One per process, shared by every engine; saved with each engine's checkpoints
         logging.info(f"CuriosityEngine {self.agent_id} initialized")
 
-    def can_handle(self, task):
-        return task.get('type') == 'explore'
-
     def receive_task(self, task):
         topic = task.get('topic')
         try:
@@ -33,37 +31,88 @@ class CuriosityEngine(LearningAgentBase):
             reward = self.evaluate_findings(findings)
             next_state = self.get_state(topic)
             self.remember(state, action, reward, next_state, done=False)
+            if task.get('related_results'):  # Seeded by the core's knowledge index
+                findings['seeded_from'] = [result['id'] for result in task['related_results']]
             self.report({'agent': self.agent_id, 'topic': topic, 'findings': findings})
             self.replay(batch_size=32)  # Adjust batch size as needed
         except Exception as e:
             logging.error(f"Error exploring topic by {self.agent_id}: {e}")
             self.report({'agent': self.agent_id, 'error': str(e)})
 
+    def search_url(self, topic):
+        return self.search_url_template.format(query=quote_plus(topic))
+
+    def prefetch(self, task):
+        # Starts the search while earlier topics are still being analysed; explore()'s get() takes the held result
+        if task.get('topic'):
+            web_fetcher.prefetch(self.search_url(task['topic']))
+
+    @property
+    def nlp(self):
+        return model_registry.get('en_core_web_sm')
+
+    @property
+    def summarizer(self):
+        return inference_batcher.summarizer
+
+    def _summarize(self, content):
+        return self.summarizer(content, max_length=100, min_length=30, do_sample=False)['summary_text']
+
+    def _entities(self, texts):
+        # NER only: the shared pipeline's other components are disabled for this call
+        nlp = self.nlp
+        disabled = [name for name in nlp.pipe_names if name not in ('tok2vec', 'ner')]
+        return [[[ent.text, ent.label_] for ent in doc.ents]
+                for doc in nlp.pipe(texts, batch_size=self.nlp_batch_size, disable=disabled)]
+
+    def related_topics(self, text, k=5, exclude=None):
+        # Topics seen in earlier explorations whose snippets are closest to text
+        return self.topic_model.related(text, k=k, exclude=exclude)
+
+    def checkpoint_state(self):
+        metadata, arrays = super().checkpoint_state()
+        topic_metadata, topic_arrays = self.topic_model.checkpoint_state()
+        metadata['topic_model'] = topic_metadata
+        arrays.update((f"topic_model/{name}", array) for name, array in topic_arrays.items())
+        return metadata, arrays
+
+    def restore_checkpoint(self, metadata, arrays):
+        super().restore_checkpoint(metadata, arrays)
+        if 'topic_model' not in metadata:
+            return
+        topic_arrays = {name[len('topic_model/'):]: array for name, array in arrays.items() if name.startswith('topic_model/')}
+        # Every engine checkpoints the shared model; keep whichever copy has seen the most documents
+        if int(topic_arrays['counts'].sum()) > int(self.topic_model.counts[:self.topic_model.size].sum()):
+            self.topic_model.restore_checkpoint(metadata['topic_model'], topic_arrays)
+
     def explore(self, topic, action):
+        from bs4 import BeautifulSoup
+
         logging.info(f"{self.agent_id} is exploring the topic: {topic} with action: {action}")
-        search_url = f"https://www.google.com/search?q={topic.replace(' ', '+')}"
-        response = requests.get(search_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        html = web_fetcher.get(self.search_url(topic))  # Pooled, cached, and usually already prefetched
+        soup = BeautifulSoup(html, 'html.parser')
 
-        snippets = soup.find_all('div', class_='BNeawe s3v9rd AP7Wnd')
-        content = " ".join([snippet.text for snippet in snippets[:10]])  # More snippets for comprehensive analysis
+        texts = [snippet.text for snippet in soup.find_all('div', class_='BNeawe s3v9rd AP7Wnd')]
+        content = " ".join(texts[:10])  # More snippets for comprehensive analysis
         logging.info(f"{self.agent_id} fetched content: {content}")
 
-        summary = self.summarizer(content, max_length=100, min_length=30, do_sample=False)[0]['summary_text']
+        # Every NLP step goes through the content-hash cache: repeated topics and snippets are lookups
+        # Keys include the model identities, so changing a model doesn't serve the old model's results
+        summary = nlp_cache.get_or_compute('summary', content, self._summarize,
+                                           params=(100, 30, model_registry.identity(self.summarizer.model_name)))
         logging.info(f"{self.agent_id} generated summary: {summary}")
 
-        doc = self.nlp(content)
-        entities = [(ent.text, ent.label_) for ent in doc.ents]
+        per_snippet = nlp_cache.get_or_compute_many('entities', texts[:10], self._entities,
+                                                    params=(model_registry.identity('en_core_web_sm'),))
+        entities = [entity for snippet_entities in per_snippet for entity in snippet_entities]
         logging.info(f"{self.agent_id} identified entities: {entities}")
 
-        tfidf_matrix = self.vectorizer.fit_transform([snippet.text for snippet in snippets])
-        num_clusters = 5
-        km = KMeans(n_clusters=num_clusters)
-        km.fit(tfidf_matrix)
-        clusters = km.labels_.tolist()
-        logging.info(f"{self.agent_id} performed clustering: {clusters}")
+        # Hashing is cheaper than a cache lookup of the dense vector, so it is not cached
+        clusters = self.topic_model.partial_fit(texts, label=topic) if texts else []
+        related = self.related_topics(content, exclude=topic) if content else []
+        logging.info(f"{self.agent_id} assigned snippets to topics {clusters}; related: {related}")
 
-        return {'summary': summary, 'entities': entities, 'clusters': clusters}
+        return {'summary': summary, 'entities': entities, 'clusters': clusters, 'related_topics': related}
 
     def get_state(self, topic):
         return hash(topic) % self.state_size
@@ -2,23 +2,32 @@ from learning_agent_base import LearningAgentBase
 import logging
 import random
 import json
+import threading
+import time
 import numpy as np
-from sklearn.preprocessing import StandardScaler
+from utils.online_stats import OnlineStats
+from utils.codec import pack_readings
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime=s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class EdgeNodeAgent(LearningAgentBase):
+    handled_task_types = ('collect_data', 'preprocess_data', 'stream_data')
+    stream_batch_size = 4096
+    tier = 'edge'
+    fog_id = None  # Fog to report to; None lets the core's topology pick the least loaded one
+
     def __init__(self, agent_id):
         state_size = 100  # Define based on actual states
         action_size = 10  # Define based on actual actions
         super().__init__(agent_id, state_size, action_size)
-        self.scaler = StandardScaler()
+        self.sensor_stats = OnlineStats()  # Running per-sensor mean/variance/min/max
+        self.stats_lock = threading.Lock()  # sensor_stats is shared by the streaming thread and executor threads
+        self.streaming_thread = None
+        self.stop_event = threading.Event()
+        self.upstream = None  # Inbox of the assigned fog, set by the core; None reports straight to the core
         logging.info(f"EdgeNodeAgent {self.agent_id} initialized")
 
-    def can_handle(self, task):
-        return task.get('type') in ['collect_data', 'preprocess_data']
-
     def receive_task(self, task):
         task_type = task.get('type')
         try:
@@ -26,32 +35,145 @@ class EdgeNodeAgent(LearningAgentBase):
                 data = self.collect_data(task)
             elif task_type == 'preprocess_data':
                 data = self.preprocess_data(task)
+            elif task_type == 'stream_data':
+                self.start_streaming(task['queue'], task.get('downstream'))
+                data = {'streaming': task['queue']}
             self.report({'agent': self.agent_id, 'result': data})
         except Exception as e:
             logging.error(f"Error handling task by {self.agent_id}: {e}")
             self.report({'agent': self.agent_id, 'error': str(e)})
 
+    def can_steal(self, task):
+        # Tasks pinned to a sensor need that sensor's running stats, which live in the owning edge
+        return self.can_handle(task) and task.get('sensor_id') is None
+
+    def report(self, data):
+        # With a fog assigned, reports go there to be pre-aggregated instead of reaching the core one by one
+        if self.upstream is not None and self.core is not None:
+            self.send_message(self.upstream, data)
+        else:
+            super().report(data)
+
     def collect_data(self, task):
         sensor_id = task.get('sensor_id', 'default_sensor')
         logging.info(f"{self.agent_id} is collecting data from sensor: {sensor_id}")
         data = {'sensor_id': sensor_id, 'timestamp': time.time(), 'value': random.uniform(0, 100)}
         logging.info(f"Collected data: {data}")
-        return json.dumps(data)
+        return data
 
     def preprocess_data(self, task):
         raw_data = task.get('data')
         logging.info(f"{self.agent_id} is preprocessing data: {raw_data}")
-        data = json.loads(raw_data)
-        values = np.array([data['value']]).reshape(-1, 1)
-        scaled_values = self.scaler.fit_transform(values)
-        processed_data = {'original_data': data, 'processed_data': scaled_values.tolist()}
+        data = json.loads(raw_data) if isinstance(raw_data, (str, bytes)) else raw_data  # Text from the GUI
+        with self.stats_lock:
+            slot = self.sensor_stats.slot(data.get('sensor_id', 'default_sensor'))
+            self.sensor_stats.partial_fit([slot], [data['value']])
+            scaled_values = self.sensor_stats.transform([slot], [data['value']])  # Against the sensor's history so far
+        processed_data = {'original_data': data, 'processed_data': scaled_values}
         logging.info(f"Preprocessed data: {processed_data}")
-        return json.dumps(processed_data)
+        return processed_data
+
+    def stream(self, source, downstream=None, batch_size=None, window=1.0, stop_event=None):
+        # Ingests readings until source is exhausted or stop_event is set. source is an
+        # iterable or the name of a transport queue; items are (sensor_id, timestamp, value)
+        # tuples, dicts with those keys, or chunks {'sensor_id', 'timestamps', 'values'}.
+        # Readings are buffered into preallocated arrays and emitted every batch_size
+        # readings or window seconds to downstream: a transport queue name or a callable,
+        # by default the assigned fog's inbox (or 'edge_batches' without one).
+        downstream = downstream or self.upstream or 'edge_batches'
+        stop_event = stop_event or self.stop_event
+        if isinstance(source, str):
+            source = self._receive_readings(source, stop_event)
+        batch_size = batch_size or self.stream_batch_size
+        slots = np.empty(batch_size, dtype=np.int64)
+        timestamps = np.empty(batch_size, dtype=np.float64)
+        values = np.empty(batch_size, dtype=np.float64)
+        slot_of = self._slot
+        filled = ingested = 0
+        window_start = time.monotonic()
+        for reading in source:
+            if reading is None:
+                pass  # Idle tick from a queue source; only the window check below applies
+            elif isinstance(reading, tuple):
+                slots[filled], timestamps[filled], values[filled] = slot_of(reading[0]), reading[1], reading[2]
+                filled += 1
+            elif 'values' in reading:
+                if filled:
+                    self._emit_batch(downstream, slots[:filled], timestamps[:filled], values[:filled])
+                    ingested += filled
+                    filled = 0
+                chunk_values = np.asarray(reading['values'], dtype=np.float64)
+                chunk_slots = np.full(len(chunk_values), slot_of(reading['sensor_id']), dtype=np.int64)
+                for start in range(0, len(chunk_values), batch_size):
+                    end = start + batch_size
+                    self._emit_batch(downstream, chunk_slots[start:end], np.asarray(reading['timestamps'][start:end]),
+                                     chunk_values[start:end])
+                ingested += len(chunk_values)
+                window_start = time.monotonic()
+            else:
+                slots[filled] = slot_of(reading['sensor_id'])
+                timestamps[filled], values[filled] = reading['timestamp'], reading['value']
+                filled += 1
+            if filled == batch_size or (filled and time.monotonic() - window_start >= window):
+                self._emit_batch(downstream, slots[:filled], timestamps[:filled], values[:filled])
+                ingested += filled
+                filled = 0
+                window_start = time.monotonic()
+            if stop_event.is_set():
+                break
+        if filled:
+            self._emit_batch(downstream, slots[:filled], timestamps[:filled], values[:filled])
+            ingested += filled
+        logging.info(f"{self.agent_id} finished streaming after {ingested} readings")
+        return ingested
+
+    def _receive_readings(self, queue, stop_event, poll_interval=0.05):
+        while not stop_event.is_set():
+            yield self.core.transport.receive(queue, timeout=poll_interval)
+
+    def _slot(self, sensor_id):
+        with self.stats_lock:
+            return self.sensor_stats.slot(sensor_id)
+
+    def _emit_batch(self, downstream, slots, timestamps, values):
+        with self.stats_lock:
+            self.sensor_stats.partial_fit(slots, values)
+            sensor_ids = list(self.sensor_stats.keys)
+            scaled = self.sensor_stats.transform(slots, values).astype(np.float32)
+        batch = {'agent': self.agent_id,
+                 'sensor_ids': sensor_ids,  # Index with 'sensors' to get each reading's sensor
+                 'sensors': slots.astype(np.int32),  # Copies: the stream buffers are reused
+                 'readings': pack_readings(timestamps, values),
+                 'scaled': scaled}
+        if callable(downstream):
+            downstream(batch)
+        else:
+            self.send_message(downstream, batch)
+
+    def start_streaming(self, source, downstream=None, **kwargs):
+        if self.streaming_thread and self.streaming_thread.is_alive():
+            raise RuntimeError(f"{self.agent_id} is already streaming")
+        self.stop_event.clear()
+        self.streaming_thread = threading.Thread(target=self.stream, args=(source, downstream), kwargs=kwargs, daemon=True)
+        self.streaming_thread.start()
+
+    def stop_streaming(self, timeout=None):
+        self.stop_event.set()
+        if self.streaming_thread and self.streaming_thread is not threading.current_thread():
+            self.streaming_thread.join(timeout)
+        self.streaming_thread = None
+
+    def on_unregister(self):
+        self.stop_streaming(timeout=5)
 
 # Example usage
 if __name__ == '__main__':
     task_collect = {'type': 'collect_data', 'sensor_id': 'sensor_42'}
-    task_preprocess = {'type': 'preprocess_data', 'data': '{"sensor_id": "sensor_42", "timestamp": 1234567890, "value": 42}'}
+    task_preprocess = {'type': 'preprocess_data', 'data': {'sensor_id': 'sensor_42', 'timestamp': 1234567890, 'value': 42}}
     edge_node_agent = EdgeNodeAgent("EdgeNodeAgent_1")
     edge_node_agent.receive_task(task_collect)
     edge_node_agent.receive_task(task_preprocess)
+    readings = ((f"sensor_{i % 8}", time.time(), random.uniform(0, 100)) for i in range(100000))
+    batches = []
+    edge_node_agent.stream(readings, downstream=batches.append)
+    logging.info(f"Streamed {len(batches)} batches; sensor_0 stats: {edge_node_agent.sensor_stats.stats('sensor_0')}")
@@ -1,53 +1,215 @@
 from learning_agent_base import LearningAgentBase
 import logging
+import os
+import threading
+import time
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.cluster import KMeans
+from utils.window_aggregator import WindowedAggregator
+from utils.incremental_regression import IncrementalLinearRegression, batch_statistics
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime=s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class FogNodeAgent(LearningAgentBase):
-    def __init__(self, agent_id):
+    handled_task_types = ('aggregate_data', 'optimize_learning')
+    global_key = '__all__'  # Aggregator key for statistics across every node
+    tier = 'fog'
+    forward_interval = 5.0  # Seconds between summaries forwarded to the core
+    flush_size = 1024  # Single readings buffered before they are added to the aggregator
+    execution_mode = 'process'  # Large optimize_learning batches have their statistics computed in the process pool
+    offload_rows = 100000  # Smaller batches are cheaper to fold in on the executor thread than to pickle
+    regression_save_interval = 30.0  # Minimum seconds between writes of the regression state to regression_path
+
+    def __init__(self, agent_id, regression_path=None):
         state_size = 100  # Define based on actual states
         action_size = 10  # Define based on actual actions
         super().__init__(agent_id, state_size, action_size)
-        self.model = LinearRegression()
+        # Updated from each batch of performance metrics; self.model is the Q-network
+        self.regression_model = IncrementalLinearRegression()
+        # The regression state is part of the agent's checkpoints; given a regression_path it is
+        # also saved there, at most every regression_save_interval seconds and on unregister
+        self.regression_path = regression_path
+        self.regression_saved = time.monotonic()
+        self.regression_dirty = False
+        if regression_path and os.path.exists(regression_path):
+            try:
+                self.regression_model.load(regression_path)
+                logging.info(f"{self.agent_id} resumed regression state from {regression_path}")
+            except Exception as e:
+                logging.error(f"Error loading regression state for {self.agent_id}: {e}")
+        self.aggregator = WindowedAggregator(bucket_width=1.0, num_buckets=60)  # 1s tumbling, 60s sliding windows
+        self.aggregation_thread = None
+        self.stop_event = threading.Event()
+        self.pending_readings = {}  # edge id -> ([timestamps], [values]) not yet in the aggregator
+        self.pending_count = 0
+        self.pending_lock = threading.Lock()
         logging.info(f"FogNodeAgent {self.agent_id} initialized")
 
-    def can_handle(self, task):
-        return task.get('type') in ['aggregate_data', 'optimize_learning']
-
     def receive_task(self, task):
         if task['type'] == 'aggregate_data':
             self.aggregate_data(task)
         elif task['type'] == 'optimize_learning':
             self.optimize_learning(task)
 
+    def can_steal(self, task):
+        # Aggregates and the regression model are per fog, so its tasks only make sense on the fog they were sent to
+        return False
+
+    @property
+    def inbox(self):
+        # Transport queue the edges assigned to this fog report and stream to
+        return f"fog.{self.agent_id}"
+
+    def on_register(self, core):
+        self.start_aggregating(self.inbox, self.forward_interval)
+
+    def on_unregister(self):
+        self.stop_aggregating(timeout=5)
+        self.save_regression()
+
+    def checkpoint_state(self):
+        metadata, arrays = super().checkpoint_state()
+        metadata['regression'], regression_arrays = self.regression_model.checkpoint_state()
+        arrays.update((f"regression/{name}", array) for name, array in regression_arrays.items())
+        return metadata, arrays
+
+    def restore_checkpoint(self, metadata, arrays):
+        super().restore_checkpoint(metadata, arrays)
+        if 'regression' in metadata:
+            self.regression_model.restore_checkpoint(metadata['regression'], {name[len('regression/'):]: array
+                                                     for name, array in arrays.items() if name.startswith('regression/')})
+
+    def handle_message(self, message):
+        # Edge batches and single readings are aggregated here; anything else (errors,
+        # results that aren't readings) is passed on to the core unchanged
+        if 'readings' in message:
+            self.ingest_batch(message)
+            return
+        result = message.get('result')
+        if isinstance(result, dict) and 'value' in result and 'timestamp' in result:
+            with self.pending_lock:
+                timestamps, values = self.pending_readings.setdefault(message['agent'], ([], []))
+                timestamps.append(result['timestamp'])
+                values.append(result['value'])
+                self.pending_count += 1
+            if self.pending_count >= self.flush_size:
+                self.flush()
+        else:
+            self.report(message)
+
+    def flush(self):
+        with self.pending_lock:
+            pending, self.pending_readings, self.pending_count = self.pending_readings, {}, 0
+        for edge_id, (timestamps, values) in pending.items():
+            self.aggregator.add(edge_id, timestamps, values)
+            self.aggregator.add(self.global_key, timestamps, values)
+
+    def forward_summary(self):
+        # One compact report per interval in place of every reading the edges sent
+        self.flush()
+        edges = [key for key in self.aggregator.keys if key != self.global_key]
+        self.report({'agent': self.agent_id,
+                     'summary': {'edges': {edge_id: self.aggregator.sliding(edge_id) for edge_id in edges},
+                                 'global': self.aggregator.sliding(self.global_key),
+                                 'timestamp': time.time()}})
+
+    def ingest_batch(self, batch):
+        # Edge batches as emitted by EdgeNodeAgent.stream: 'agent' plus packed (timestamp, value) 'readings'
+        readings = batch['readings']
+        self.aggregator.add(batch['agent'], readings['timestamp'], readings['value'])
+        return self.aggregator.add(self.global_key, readings['timestamp'], readings['value'])
+
     def aggregate_data(self, task):
-        logging.info(f"{self.agent_id} is aggregating data from nodes: {task['node_ids']}")
+        logging.info(f"{self.agent_id} is aggregating data from nodes: {task.get('node_ids')}")
         try:
-            data = [np.random.rand(10) for _ in task['node_ids']]  # Example data generation
-            aggregated_data = np.mean(data, axis=0)
-            self.report({'agent': self.agent_id, 'aggregated_data': aggregated_data.tolist()})
+            if 'batch' in task:
+                self.ingest_batch(task['batch'])
+            self.flush()
+            node_ids = task.get('node_ids') or [key for key in self.aggregator.keys if key != self.global_key]
+            aggregated_data = {node_id: self.aggregator.sliding(node_id) for node_id in node_ids}
+            self.report({'agent': self.agent_id, 'aggregated_data': aggregated_data,
+                         'global': self.aggregator.sliding(self.global_key)})
         except Exception as e:
             logging.error(f"Error aggregating data by {self.agent_id}: {e}")
 
+    def start_aggregating(self, queue='edge_batches', forward_interval=None):
+        # Consumes edge traffic from the core's transport on a background thread,
+        # forwarding a summary to the core every forward_interval seconds if given
+        if self.aggregation_thread and self.aggregation_thread.is_alive():
+            raise RuntimeError(f"{self.agent_id} is already aggregating")
+        self.stop_event.clear()
+        self.aggregation_thread = threading.Thread(target=self._aggregate, args=(queue, forward_interval), daemon=True)
+        self.aggregation_thread.start()
+
+    def _aggregate(self, queue, forward_interval, poll_interval=0.05):
+        transport = self.core.transport
+        next_forward = time.monotonic() + forward_interval if forward_interval else None
+        while not self.stop_event.is_set():
+            message = transport.receive(queue, timeout=poll_interval)
+            try:
+                if message is not None:
+                    self.handle_message(message)
+                elif self.pending_count:
+                    self.flush()  # Idle: no reason to hold readings back
+                if next_forward is not None and time.monotonic() >= next_forward:
+                    self.forward_summary()
+                    next_forward = time.monotonic() + forward_interval
+            except Exception as e:
+                logging.error(f"Error aggregating edge traffic by {self.agent_id}: {e}")
+        self.flush()
+
+    def stop_aggregating(self, timeout=None):
+        self.stop_event.set()
+        if self.aggregation_thread and self.aggregation_thread is not threading.current_thread():
+            self.aggregation_thread.join(timeout)
+        self.aggregation_thread = None
+
+    def offload(self, task):
+        # X'X and X'y of a large batch are computed in a worker; complete_offload folds them into the model
+        if task['type'] != 'optimize_learning' or len(task['performance']['inputs']) < self.offload_rows:
+            return None
+        return batch_statistics, (task['performance']['inputs'], task['performance']['outputs'])
+
+    def complete_offload(self, task, statistics):
+        try:
+            self.regression_model.merge(*statistics)
+            self._regression_updated()
+        except Exception as e:
+            logging.error(f"Error optimizing learning by {self.agent_id}: {e}")
+
     def optimize_learning(self, task):
         logging.info(f"{self.agent_id} is optimizing learning parameters.")
         performance_metrics = task['performance']
         try:
-            X = np.array(performance_metrics['inputs'])
-            y = np.array(performance_metrics['outputs'])
-            self.model.fit(X, y)
-            optimized_params = self.model.coef_.tolist()
-            self.report({'agent': self.agent_id, 'optimized_params': optimized_params})
+            # Each task carries only the new metrics since the last one
+            self.regression_model.partial_fit(performance_metrics['inputs'], performance_metrics['outputs'])
+            self._regression_updated()
         except Exception as e:
             logging.error(f"Error optimizing learning by {self.agent_id}: {e}")
 
+    def _regression_updated(self):
+        self.regression_dirty = True
+        if time.monotonic() - self.regression_saved >= self.regression_save_interval:
+            self.save_regression()
+        self.report({'agent': self.agent_id, 'optimized_params': self.regression_model.coef_.tolist()})
+
+    def save_regression(self):
+        if not self.regression_path or not self.regression_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.regression_path) or '.', exist_ok=True)
+            self.regression_model.save(self.regression_path)
+            self.regression_saved = time.monotonic()
+            self.regression_dirty = False
+        except Exception as e:
+            logging.error(f"Error saving regression state for {self.agent_id}: {e}")
+
 # Example usage
 if __name__ == '__main__':
-    task_example_aggregate = {'type': 'aggregate_data', 'node_ids': [1, 2, 3]}
+    from utils.codec import pack_readings
+    timestamps = np.arange(0, 30, 0.01)
+    batch = {'agent': 'EdgeNodeAgent_1', 'readings': pack_readings(timestamps, np.random.normal(50, 5, len(timestamps)))}
+    task_example_aggregate = {'type': 'aggregate_data', 'node_ids': ['EdgeNodeAgent_1'], 'batch': batch}
     task_example_optimize = {'type': 'optimize_learning', 'performance': {'inputs': [[1, 2], [3, 4]], 'outputs': [5, 6]}}
     fog_node_agent = FogNodeAgent("FogNodeAgent_1")
     fog_node_agent.receive_task(task_example_aggregate)
@@ -2,23 +2,33 @@ from agent_base import AgentBase
 import logging
 import time
 import random
-import json
-from transformers import pipeline
+from utils.inference_batcher import zero_shot_classifier
+from utils.agent_factory import release_agent
 from datetime import datetime
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class MrMeeseeks(AgentBase):
+    poolable = True  # Recycled through utils.agent_factory's warm pool after self_destruct
+
     def __init__(self, agent_id, task):
         super().__init__(agent_id)
         self.task = task
         self.start_time = time.time()
-        self.classifier = pipeline("zero-shot-classification")
         logging.info(f"Initialized Mr. Meeseeks agent: {self.agent_id} with task: {self.task}")
 
-    def can_handle(self, task):
-        return False
+    def reset(self, agent_id, task):
+        self.agent_id = agent_id
+        self.task = task
+        self.core = None
+        self.state = {}
+        self.start_time = time.time()
+        logging.info(f"Recycled Mr. Meeseeks agent: {self.agent_id} with task: {self.task}")
+
+    @property
+    def classifier(self):
+        return zero_shot_classifier
 
     def perform_task(self):
         try:
@@ -48,26 +58,26 @@ class MrMeeseeks(AgentBase):
         sensor_id = task.get('sensor_id', 'default_sensor')
         logging.info(f"{self.agent_id} is collecting data from sensor: {sensor_id}")
         data = {'sensor_id': sensor_id, 'timestamp': datetime.utcnow().isoformat(), 'value': random.uniform(0, 100)}
-        return json.dumps(data)
+        return data
 
     def preprocess_data(self, task):
         data = task.get('data')
         logging.info(f"{self.agent_id} is preprocessing data: {data}")
         processed_data = {'original_data': data, 'processed_data': f"Processed {data}"}
-        return json.dumps(processed_data)
+        return processed_data
 
     def solve_problem(self, task):
         problem_description = task.get('description', 'default_problem')
         logging.info(f"{self.agent_id} is solving problem: {problem_description}")
         solution = self.classifier(problem_description, candidate_labels=["solution1", "solution2", "solution3"])
-        return json.dumps(solution)
+        return solution
 
     def self_destruct(self):
         logging.info(f"{self.agent_id} has completed its task and will now self-destruct.")
-        time.sleep(1)
         if self.core:
-            del self.core.agents[self.agent_id]
+            self.core.unregister_agent(self.agent_id)
             logging.info(f"{self.agent_id} removed from core's agent list.")
+        release_agent('MrMeeseeks', self)
 
 # Example usage
 if __name__ == '__main__':
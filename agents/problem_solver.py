@@ -1,23 +1,23 @@
 from learning_agent_base import LearningAgentBase
 import logging
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from transformers import pipeline
+from utils.agent_factory import create_agent
+from utils.inference_batcher import zero_shot_classifier
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime=s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class ProblemSolver(LearningAgentBase):
+    handled_task_types = ('solve_problem',)
+
     def __init__(self, agent_id):
         state_size = 100  # Define based on actual states
         action_size = 10  # Define based on actual actions
         super().__init__(agent_id, state_size, action_size)
-        self.model = LinearRegression()
-        self.classifier = pipeline("zero-shot-classification")
         logging.info(f"ProblemSolver {self.agent_id} initialized")
 
-    def can_handle(self, task):
-        return task.get('type') == 'solve_problem'
+    @property
+    def classifier(self):
+        return zero_shot_classifier  # Batched together with every MrMeeseeks' calls
 
     def receive_task(self, task):
         problem = task.get('problem')
@@ -27,13 +27,16 @@ class ProblemSolver(LearningAgentBase):
             subtasks = self.decompose_problem(problem, action)
             for subtask in subtasks:
                 meeseeks_id = f"MrMeeseeks_{self.agent_id}_{subtask['id']}"
-                meeseeks = MrMeeseeks(meeseeks_id, subtask)
+                meeseeks = create_agent('MrMeeseeks', meeseeks_id, subtask)
                 self.core.register_agent(meeseeks)
                 meeseeks.perform_task()
             reward = self.evaluate_solution(subtasks)
             next_state = self.get_state(problem)
             self.remember(state, action, reward, next_state, done=False)
-            self.report({'agent': self.agent_id, 'problem': problem, 'subtasks': subtasks})
+            report = {'agent': self.agent_id, 'problem': problem, 'subtasks': subtasks}
+            if task.get('related_results'):  # Seeded by the core's knowledge index
+                report['seeded_from'] = [result['id'] for result in task['related_results']]
+            self.report(report)
             self.replay(batch_size=32)  # Adjust batch size as needed
         except Exception as e:
             logging.error(f"Error solving problem by {self.agent_id}: {e}")
@@ -0,0 +1,74 @@
+# Cost of checkpointing a fleet of learning agents: a full checkpoint, a delta after
+# a little more training, how long save() blocks the caller when writes run in the
+# background, and restoring every agent sequentially vs in parallel. For reference it
+# also times the previous per-agent save_state (JSON) + save_weights files, which
+# leave out the replay memory and optimizer state.
+# Usage: python benchmarks/checkpointing.py [num_agents] [memory_size]
+import sys
+import os
+import time
+import shutil
+import logging
+import tempfile
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from learning_agent_base import LearningAgentBase
+from utils.checkpoint import Checkpointer
+
+STATE_SIZE = 16
+
+def make_agents(num_agents, memory_size):
+    return [LearningAgentBase(f"LearningAgent_{i}", STATE_SIZE, 4, memory_size=memory_size) for i in range(num_agents)]
+
+def train(agents, steps):
+    for agent in agents:
+        for _ in range(steps):
+            agent.remember(np.random.rand(STATE_SIZE), 1, 1.0, np.random.rand(STATE_SIZE), False)
+        agent.replay(32)
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label}: {(time.perf_counter() - start) * 1e3:.1f}ms")
+    return result
+
+def run(num_agents, memory_size):
+    directory = tempfile.mkdtemp()
+    try:
+        agents = make_agents(num_agents, memory_size)
+        train(agents, memory_size)
+        legacy = os.path.join(directory, 'legacy')
+        os.makedirs(legacy)
+
+        def legacy_save():
+            for agent in agents:
+                agent.save_state(os.path.join(legacy, f"{agent.agent_id}.json"))
+                agent.save(os.path.join(legacy, f"{agent.agent_id}.npz"))
+        timed(f"save_state + save_weights, {num_agents} agents (no replay memory)", legacy_save)
+
+        checkpointer = Checkpointer(os.path.join(directory, 'checkpoints'))
+        timed(f"full checkpoint, {num_agents} agents x {memory_size} transitions",
+              lambda: checkpointer.save_all(agents, background=False))
+        train(agents, 100)
+        timed("delta checkpoint after 100 more transitions each", lambda: checkpointer.save_all(agents, background=False))
+        train(agents, 100)
+        timed("save_all in the background: time blocked", lambda: checkpointer.save_all(agents))
+        timed("  ... until the writes finish", checkpointer.wait)
+        checkpointer.close()
+
+        restorer = Checkpointer(os.path.join(directory, 'checkpoints'))
+        fresh = make_agents(num_agents, memory_size)
+        timed("restore one by one", lambda: [restorer.restore(agent) for agent in fresh])
+        fresh = make_agents(num_agents, memory_size)
+        restored = timed("restore_all in parallel", lambda: restorer.restore_all(fresh, max_workers=8))
+        print(f"restored {restored} agents; agent 0 has {len(fresh[0].memory)} transitions, epsilon {fresh[0].epsilon:.3f}")
+        restorer.close()
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
@@ -0,0 +1,77 @@
+# Throughput of CPU-bound tasks spread over 1..N core processes in cluster mode,
+# all talking through one local broker stand-in (utils.inprocess_broker.serve_broker).
+# A driver node with no agents of its own submits tasks with affinity keys, so they
+# are forwarded to worker nodes by rendezvous hashing once gossip has spread the
+# workers' registrations. Scaling is bounded by the number of CPUs available.
+# Usage: python benchmarks/cluster_scaling.py [num_tasks] [max_nodes] [task_ms]
+import sys
+import os
+import time
+import logging
+import multiprocessing
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from agent_base import AgentBase
+from utils.cluster import create_cluster_core
+from utils.inprocess_broker import serve_broker, BrokerClient
+
+class CrunchAgent(AgentBase):
+    handled_task_types = ('crunch',)
+
+    def receive_task(self, task):
+        deadline = time.thread_time() + task['cpu_seconds']
+        while time.thread_time() < deadline:  # Holds the GIL, like pure-Python agent work
+            pass
+        self.core.transport.send('bench.done', {'task': task['affinity'], 'node': self.core.cluster.node_id})
+
+def run_worker(node_id, seeds, broker_address, stop_event):
+    logging.getLogger().setLevel(logging.WARNING)
+    core, node = create_cluster_core(node_id, seeds, broker=BrokerClient(broker_address), gossip_interval=0.1)
+    core.transport.bind_remote('bench.done')
+    for i in range(4):
+        core.register_agent(CrunchAgent(f"{node_id}_crunch_{i}"))
+    core.automate_task_distribution()
+    stop_event.wait()
+    core.shutdown(timeout=5)
+
+def run(num_tasks, num_nodes, task_ms, broker_address):
+    workers = [f"worker_{num_nodes}_{i}" for i in range(num_nodes)]
+    stop_event = multiprocessing.Event()
+    processes = [multiprocessing.Process(target=run_worker, args=(node_id, workers, broker_address, stop_event))
+                 for node_id in workers]
+    for process in processes:
+        process.start()
+    core, node = create_cluster_core(f"driver_{num_nodes}", workers, broker=BrokerClient(broker_address), gossip_interval=0.1)
+    core.transport.bind_remote('bench.done')
+    while len(node.handlers.get('crunch', ())) < 4 * num_nodes:  # Wait for gossip to reach the driver
+        time.sleep(0.05)
+    core.automate_task_distribution()
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        core.send_task({'type': 'crunch', 'affinity': f"{num_nodes}-{i}", 'cpu_seconds': task_ms / 1000})
+    nodes = {}
+    for _ in range(num_tasks):
+        done = core.transport.receive('bench.done', timeout=60)
+        if done is None:
+            break
+        nodes[done['node']] = nodes.get(done['node'], 0) + 1
+    elapsed = time.perf_counter() - start
+    print(f"{num_nodes} node(s): {sum(nodes.values())} tasks in {elapsed:.2f}s ({sum(nodes.values()) / elapsed:.0f} tasks/s); "
+          f"per node {sorted(nodes.values())}")
+    stop_event.set()
+    core.shutdown(timeout=5)
+    for process in processes:
+        process.join()
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    args = [int(arg) for arg in sys.argv[1:4]]
+    num_tasks, max_nodes, task_ms = args + [400, 4, 5][len(args):]
+    manager = serve_broker()
+    nodes = 1
+    while nodes <= max_nodes:
+        run(num_tasks, nodes, task_ms, manager.address)
+        nodes *= 2
+    manager.shutdown()
@@ -0,0 +1,43 @@
+# Encode/decode cost and size on the wire of utils.codec against JSON for typical
+# messages: a single sensor reading, a batch of readings and a report with a feature matrix.
+# Usage: python benchmarks/codec_overhead.py [iterations]
+import sys
+import os
+import json
+import time
+import logging
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+import numpy as np
+from utils.codec import encode, decode, pack_readings
+
+def as_json(message):
+    return json.dumps(message, default=lambda value: value.tolist())
+
+def time_per_call(func, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def run(iterations):
+    timestamps = time.time() + np.arange(1000, dtype=np.float64)
+    values = np.random.uniform(0, 100, 1000)
+    messages = {
+        'sensor reading': {'agent': 'EdgeNodeAgent_1', 'result': {'sensor_id': 'sensor_42', 'timestamp': time.time(), 'value': 42.5}},
+        '1000 readings': {'agent': 'EdgeNodeAgent_1', 'sensor_id': 'sensor_42', 'readings': pack_readings(timestamps, values)},
+        '256x100 features': {'agent': 'FogNodeAgent_1', 'features': np.random.rand(256, 100).astype(np.float32)},
+    }
+    for name, message in messages.items():
+        json_body, binary_body = as_json(message), encode(message)
+        count = max(iterations // (100 if len(binary_body) > 10000 else 1), 10)
+        print(f"{name}: json {len(json_body.encode())} bytes, "
+              f"encode {time_per_call(as_json, message, count):.1f}us, decode {time_per_call(json.loads, json_body, count):.1f}us | "
+              f"codec {len(binary_body)} bytes, "
+              f"encode {time_per_call(encode, message, count):.1f}us, decode {time_per_call(decode, binary_body, count):.1f}us")
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
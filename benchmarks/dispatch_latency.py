@@ -0,0 +1,70 @@
+# End-to-end latency from TaskScheduler.add_task to agent.receive_task.
+# Usage: python benchmarks/dispatch_latency.py [num_tasks]
+import sys
+import os
+import time
+import threading
+import logging
+import statistics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from agent_base import AgentBase
+from omnipong_core import OmnipongCore
+from utils.task_scheduler import TaskScheduler
+
+class LatencyProbe(AgentBase):
+    handled_task_types = ('ping',)
+
+    def __init__(self, agent_id, expected):
+        super().__init__(agent_id)
+        self.latencies = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    def receive_task(self, task):
+        self.latencies.append(time.perf_counter() - task['sent_at'])
+        if len(self.latencies) >= self.expected:
+            self.done.set()
+
+def summarize(label, latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label}: {len(latencies)} tasks in {elapsed:.3f}s ({len(latencies) / elapsed:.0f} tasks/s), "
+          f"latency mean {statistics.mean(latencies) * 1e3:.3f} ms, "
+          f"p50 {statistics.median(latencies) * 1e3:.3f} ms, p99 {p99 * 1e3:.3f} ms")
+
+def run(num_tasks):
+    core = OmnipongCore()
+    scheduler = TaskScheduler()
+    scheduler.schedule_tasks(core)
+    core.automate_task_distribution()
+
+    # One task at a time: measures wake-up latency of both stages
+    probe = LatencyProbe('LatencyProbe_1', num_tasks)
+    core.register_agent(probe)
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        received = len(probe.latencies)
+        scheduler.add_task({'type': 'ping', 'id': i, 'sent_at': time.perf_counter()})
+        while len(probe.latencies) == received:
+            time.sleep(0)
+    summarize("sequential", probe.latencies, time.perf_counter() - start)
+
+    # Burst: measures batch draining throughput
+    probe = LatencyProbe('LatencyProbe_1', num_tasks)
+    core.register_agent(probe)
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        scheduler.add_task({'type': 'ping', 'id': i, 'sent_at': time.perf_counter()})
+    probe.done.wait()
+    summarize("burst", probe.latencies, time.perf_counter() - start)
+
+    scheduler.stop()
+    core.shutdown()
+    print("Previous polling loops: up to 10 s added latency, 0.2 tasks/s")
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,61 @@
+# Ingest rate of EdgeNodeAgent.stream for per-reading tuples, per-reading tuples fed
+# through the core's in-memory transport, and pre-batched array chunks.
+# Usage: python benchmarks/edge_streaming.py [num_readings]
+import sys
+import os
+import time
+import logging
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+import numpy as np
+from omnipong_core import OmnipongCore
+from agents.edge_node_agent import EdgeNodeAgent
+
+def report(label, count, elapsed):
+    print(f"{label}: {count} readings in {elapsed:.3f}s ({count / elapsed:.0f} readings/s)")
+
+def run(count, num_sensors=64):
+    sensors = [f"sensor_{i}" for i in range(num_sensors)]
+    timestamps = time.time() + np.arange(count) * 1e-3
+    values = np.random.uniform(0, 100, count)
+    batches = []
+
+    agent = EdgeNodeAgent('EdgeNodeAgent_bench')
+    readings = [(sensors[i % num_sensors], timestamps[i], values[i]) for i in range(count)]
+    start = time.perf_counter()
+    agent.stream(iter(readings), downstream=batches.append)
+    report("tuples from a generator", count, time.perf_counter() - start)
+
+    core = OmnipongCore()
+    agent = EdgeNodeAgent('EdgeNodeAgent_transport')
+    core.register_agent(agent)
+    done = threading.Event()
+    received = []
+
+    def downstream(batch):
+        received.append(len(batch['sensors']))
+        if sum(received) >= count:
+            done.set()
+
+    start = time.perf_counter()
+    agent.start_streaming('sensor_readings', downstream, window=0.05)
+    core.transport.send_many('sensor_readings', readings)
+    done.wait(60)
+    report("tuples through the in-memory transport", sum(received), time.perf_counter() - start)
+    agent.stop_streaming()
+    core.shutdown()
+
+    agent = EdgeNodeAgent('EdgeNodeAgent_chunks')
+    per_sensor = count // num_sensors
+    chunks = [{'sensor_id': sensor, 'timestamps': timestamps[i * per_sensor:(i + 1) * per_sensor],
+               'values': values[i * per_sensor:(i + 1) * per_sensor]} for i, sensor in enumerate(sensors)]
+    start = time.perf_counter()
+    agent.stream(iter(chunks), downstream=batches.append)
+    report("array chunks", per_sensor * num_sensors, time.perf_counter() - start)
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
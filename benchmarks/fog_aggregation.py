@@ -0,0 +1,54 @@
+# Ingest rate and query latency of the fog-level WindowedAggregator, and of the full
+# EdgeNodeAgent -> in-memory transport -> FogNodeAgent pipeline.
+# Usage: python benchmarks/fog_aggregation.py [num_readings]
+import sys
+import os
+import time
+import logging
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+import numpy as np
+from omnipong_core import OmnipongCore
+from agents.edge_node_agent import EdgeNodeAgent
+from agents.fog_node_agent import FogNodeAgent
+from utils.window_aggregator import WindowedAggregator
+
+def run(count, batch_size=4096, num_nodes=16):
+    timestamps = np.linspace(0, 120, count)  # Two sliding windows' worth of event time
+    values = np.random.lognormal(3, 1, count)
+
+    aggregator = WindowedAggregator(bucket_width=1.0, num_buckets=60)
+    start = time.perf_counter()
+    for i, offset in enumerate(range(0, count, batch_size)):
+        aggregator.add(f"node_{i % num_nodes}", timestamps[offset:offset + batch_size], values[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start
+    print(f"WindowedAggregator.add: {count} readings in {elapsed:.3f}s ({count / elapsed:.0f} readings/s)")
+
+    for name, query in (('sliding', aggregator.sliding), ('tumbling', aggregator.tumbling)):
+        start = time.perf_counter()
+        for i in range(1000):
+            query(f"node_{i % num_nodes}")
+        print(f"{name} query: {(time.perf_counter() - start) * 1e3:.1f}us per query")
+
+    core = OmnipongCore()
+    edge, fog = EdgeNodeAgent('EdgeNodeAgent_1'), FogNodeAgent('FogNodeAgent_1')
+    core.register_agent(edge)
+    core.register_agent(fog)
+    per_sensor = count // num_nodes
+    chunks = [{'sensor_id': f"sensor_{i}", 'timestamps': timestamps[i * per_sensor:(i + 1) * per_sensor],
+               'values': values[i * per_sensor:(i + 1) * per_sensor]} for i in range(num_nodes)]
+    start = time.perf_counter()
+    edge.stream(iter(chunks), batch_size=batch_size)  # To the fog's inbox, assigned on registration
+    while core.transport.local.pending(fog.inbox):
+        time.sleep(0.001)
+    fog.stop_aggregating()  # Drains what it already received
+    elapsed = time.perf_counter() - start
+    print(f"edge -> fog pipeline: {per_sensor * num_nodes} readings in {elapsed:.3f}s "
+          f"({per_sensor * num_nodes / elapsed:.0f} readings/s); global window {fog.aggregator.sliding(fog.global_key)['count']}")
+    core.shutdown()
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
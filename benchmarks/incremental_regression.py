@@ -0,0 +1,49 @@
+# Per-update cost of IncrementalLinearRegression.partial_fit as history grows,
+# against refitting on the full history each time (sklearn LinearRegression if
+# installed, else NumPy least squares), which is what optimize_learning used to do.
+# Usage: python benchmarks/incremental_regression.py [total_rows] [batch_size]
+import sys
+import os
+import time
+import logging
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+import numpy as np
+from utils.incremental_regression import IncrementalLinearRegression
+
+def full_refit(X, y):
+    try:
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression().fit(X, y).coef_
+    except ImportError:
+        design = np.hstack([X, np.ones((len(X), 1))])
+        return np.linalg.lstsq(design, y, rcond=None)[0][:-1]
+
+def run(total_rows, batch_size, num_features=16):
+    true_coef = np.random.randn(num_features)
+    model = IncrementalLinearRegression()
+    history_X, history_y = [], []
+    checkpoints = {int(total_rows * fraction) // batch_size * batch_size for fraction in (0.001, 0.01, 0.1, 0.5, 1.0)}
+    refit_limit = min(total_rows, 1000000)  # Full refits beyond this take too long to be worth measuring
+    for rows in range(batch_size, total_rows + 1, batch_size):
+        X = np.random.rand(batch_size, num_features)
+        y = X @ true_coef + np.random.normal(0, 0.1, batch_size)
+        start = time.perf_counter()
+        model.partial_fit(X, y)
+        incremental = (time.perf_counter() - start) * 1e3
+        if rows <= refit_limit:
+            history_X.append(X)
+            history_y.append(y)
+        if rows in checkpoints:
+            line = f"{rows:>9} rows seen: partial_fit {incremental:.3f}ms"
+            if rows <= refit_limit:
+                start = time.perf_counter()
+                coef = full_refit(np.vstack(history_X), np.concatenate(history_y))
+                line += f", full refit {(time.perf_counter() - start) * 1e3:.1f}ms, max coef difference {np.abs(coef - model.coef_).max():.2e}"
+            print(line)
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000000, int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,41 @@
+# Zero-shot classification throughput: one pipeline call per request vs. the micro-batching service.
+# Usage: python benchmarks/inference_batching.py [num_requests] [num_threads]
+import sys
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from utils.model_registry import model_registry
+from utils.inference_batcher import InferenceBatcher
+
+LABELS = ["solution1", "solution2", "solution3"]
+
+def problems(num_requests):
+    return [f"Develop solutions for problem number {i} in the energy grid" for i in range(num_requests)]
+
+def measure(label, call, inputs, num_threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_threads) as pool:
+        list(pool.map(call, inputs))
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {len(inputs)} requests in {elapsed:.2f}s ({len(inputs) / elapsed:.1f} req/s)")
+
+def run(num_requests, num_threads):
+    classifier = model_registry.get('zero-shot-classification')
+    classifier("warm up", candidate_labels=LABELS)
+    inputs = problems(num_requests)
+
+    measure("per-call", lambda text: classifier(text, candidate_labels=LABELS), inputs, num_threads)
+    for max_batch_size in (8, 16, 32):
+        batcher = InferenceBatcher('zero-shot-classification', max_batch_size=max_batch_size, max_wait=0.01)
+        measure(f"batched (max_batch_size={max_batch_size})",
+                lambda text: batcher(text, candidate_labels=LABELS), inputs, num_threads)
+        print(f"  average batch size: {batcher.batched_requests / max(batcher.batches, 1):.1f}")
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 256, int(sys.argv[2]) if len(sys.argv) > 2 else 64)
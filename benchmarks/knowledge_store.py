@@ -0,0 +1,62 @@
+# Cost of persisting reports with the KnowledgeStore against the previous
+# save_knowledge_base, which rewrote the whole knowledge base as JSON, plus indexed
+# query latency and reopen time as history grows.
+# Usage: python benchmarks/knowledge_store.py [num_reports]
+import sys
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from utils.knowledge_store import KnowledgeStore
+
+def make_report(i):
+    return {'agent': f"CuriosityEngine_{i % 8}", 'topic': f"topic_{i % 100}",
+            'findings': {'summary': 'x' * 200, 'clusters': [i % 5] * 10}}
+
+def run(num_reports):
+    directory = tempfile.mkdtemp()
+    try:
+        history = {}
+        start = time.perf_counter()
+        json_saves = 0
+        for i in range(num_reports):
+            history[f"report_{i}"] = make_report(i)  # Keeping history in one dict, as update() can't
+            if i % 1000 == 999:
+                with open(os.path.join(directory, 'knowledge_base.json'), 'w') as file:
+                    json.dump(history, file)
+                json_saves += 1
+        print(f"JSON rewrite every 1000 reports: {time.perf_counter() - start:.2f}s for {num_reports} reports "
+              f"({json_saves} saves of the growing dict)")
+
+        store = KnowledgeStore(os.path.join(directory, 'store'))
+        start = time.perf_counter()
+        for i in range(num_reports):
+            store.append(make_report(i)['agent'], make_report(i))
+        store.sync()
+        elapsed = time.perf_counter() - start
+        print(f"KnowledgeStore append + final sync: {elapsed:.2f}s ({num_reports / elapsed:.0f} reports/s)")
+
+        for label, filters in (('by agent, last 10', {'agent': 'CuriosityEngine_3', 'limit': 10}),
+                               ('by topic', {'topic': 'topic_42'}),
+                               ('by agent and topic', {'agent': 'CuriosityEngine_2', 'topic': 'topic_42'})):
+            start = time.perf_counter()
+            results = store.query(**filters)
+            print(f"query {label}: {len(results)} records in {(time.perf_counter() - start) * 1e3:.2f}ms")
+        store.close()
+
+        start = time.perf_counter()
+        store = KnowledgeStore(os.path.join(directory, 'store'))
+        print(f"reopen from snapshot: {(time.perf_counter() - start) * 1e3:.1f}ms for {len(store)} records")
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
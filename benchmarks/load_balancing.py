@@ -0,0 +1,60 @@
+# Makespan and per-agent task counts for four agents of one class, one of them four
+# times slower, under first-match selection, least outstanding tasks, and power of
+# two choices on EWMA expected wait, each with and without work stealing.
+# Usage: python benchmarks/load_balancing.py [num_tasks] [task_ms]
+import sys
+import os
+import time
+import logging
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from agent_base import AgentBase
+from omnipong_core import OmnipongCore
+from utils.agent_executor import AgentExecutor
+
+class SleepyAgent(AgentBase):
+    handled_task_types = ('work',)
+
+    def __init__(self, agent_id, task_seconds, done):
+        super().__init__(agent_id)
+        self.task_seconds = task_seconds
+        self.done = done
+
+    def receive_task(self, task):
+        time.sleep(self.task_seconds)  # I/O-bound work, so threads overlap
+        self.done.release()
+
+def run(label, num_tasks, task_ms, load, work_stealing):
+    core = OmnipongCore(executor=AgentExecutor(max_threads=8, max_pending=num_tasks, work_stealing=work_stealing))
+    done = threading.Semaphore(0)
+    for i in range(4):
+        core.register_agent(SleepyAgent(f"SleepyAgent_{i}", task_ms / 1000 * (4 if i == 0 else 1), done))
+    if load == 'outstanding':
+        core.dispatcher.load = lambda agent: core.executor.queue_depth(agent.agent_id)
+    elif load is None:
+        core.dispatcher.load = None
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        core.send_task({'type': 'work', 'id': i})
+    core.distribute_tasks()
+    for _ in range(num_tasks):
+        done.acquire()
+    elapsed = time.perf_counter() - start
+    stats = core.agent_stats()
+    counts = [f"{stats[agent_id]['completed']}" + (f" ({stats[agent_id]['stolen']} stolen)" if stats[agent_id]['stolen'] else '')
+              for agent_id in sorted(stats)]
+    print(f"{label:<45} makespan {elapsed:.2f}s; completed per agent (slow one first): {', '.join(counts)}")
+    core.shutdown()
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    args = [int(arg) for arg in sys.argv[1:3]]
+    num_tasks, task_ms = args + [400, 5][len(args):]
+    for work_stealing in (False, True):
+        suffix = ', work stealing' if work_stealing else ''
+        run(f"first match{suffix}", num_tasks, task_ms, None, work_stealing)
+        run(f"least outstanding{suffix}", num_tasks, task_ms, 'outstanding', work_stealing)
+        run(f"power of two choices, EWMA wait{suffix}", num_tasks, task_ms, 'expected_wait', work_stealing)
@@ -0,0 +1,70 @@
+# Publish/consume throughput of utils.communication.Communication.
+# Usage: python benchmarks/messaging_throughput.py [num_messages] [amqp_host]
+# Without amqp_host the in-process broker stand-in is used, so no RabbitMQ is needed.
+import sys
+import os
+import time
+import asyncio
+import logging
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from utils.communication import Communication
+from utils.inprocess_broker import InProcessBroker
+
+def report(label, count, elapsed):
+    print(f"{label}: {count} messages in {elapsed:.3f}s ({count / elapsed:.0f} msg/s)")
+
+def publish_single(comm, queue, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        comm.send_message(queue, b'x' * 128)
+    report("send_message, 1 thread", count, time.perf_counter() - start)
+
+def publish_threads(comm, queue, count, num_threads=8):
+    per_thread = count // num_threads
+    threads = [threading.Thread(target=lambda: [comm.send_message(queue, b'x' * 128) for _ in range(per_thread)])
+               for _ in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report(f"send_message, {num_threads} threads", per_thread * num_threads, time.perf_counter() - start)
+
+def publish_batched(comm, queue, count):
+    start = time.perf_counter()
+    comm.send_messages(queue, [b'x' * 128] * count)
+    report("send_messages (batched)", count, time.perf_counter() - start)
+
+async def consume(comm, queue, count, prefetch_count):
+    received = 0
+    done = asyncio.Event()
+
+    async def handler(body, properties):
+        nonlocal received
+        received += 1
+        if received >= count:
+            done.set()
+
+    start = time.perf_counter()
+    consumer = asyncio.ensure_future(comm.consume(queue, handler, prefetch_count=prefetch_count, stop_event=done))
+    await consumer
+    report(f"async consume, prefetch {prefetch_count}", received, time.perf_counter() - start)
+
+def run(count, host):
+    broker = None if host else InProcessBroker()
+    comm = Communication(host=host or 'localhost', pool_size=8, broker=broker)
+    publish_single(comm, 'bench_single', count)
+    publish_threads(comm, 'bench_threads', count)
+    for prefetch_count in (1, 10, 100):
+        queue = f"bench_batched_{prefetch_count}"
+        publish_batched(comm, queue, count)
+        asyncio.run(consume(comm, queue, count, prefetch_count))
+    comm.close_connection()
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000, sys.argv[2] if len(sys.argv) > 2 else None)
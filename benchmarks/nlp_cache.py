@@ -0,0 +1,55 @@
+# Cost of CuriosityEngine's NLP steps with and without the content-hash NlpCache on a
+# skewed stream of explorations (a few hot topics, snippets shared between topics).
+# The models are stood in for by a fixed cost per batch plus per text, so the numbers
+# show hit rates and cache overhead rather than spaCy/transformers speed; a second
+# cache instance on the same directory shows the on-disk tier after a restart.
+# Usage: python benchmarks/nlp_cache.py [num_explorations] [ms_per_text]
+import sys
+import os
+import time
+import shutil
+import logging
+import tempfile
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from utils.nlp_cache import NlpCache
+
+def explorations(count, num_topics=200, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = np.minimum(rng.zipf(1.3, count), num_topics)
+    for topic in topics:
+        # Each topic's results: mostly its own snippets plus some shared with neighbouring topics
+        yield [f"snippet {(int(topic) * 7 + offset) % (num_topics * 5)} about topic {int(topic) + offset // 8}" for offset in range(10)]
+
+def run(count, ms_per_text):
+    calls = {'texts': 0}
+
+    def model(texts):
+        calls['texts'] += len(texts)
+        time.sleep(0.002 + ms_per_text / 1000 * len(texts))  # Batch overhead plus per-text inference
+        return [[[text.split()[-1], 'TOPIC']] for text in texts]
+
+    start = time.perf_counter()
+    for texts in explorations(count):
+        model(texts)
+    print(f"no cache: {time.perf_counter() - start:.2f}s, {calls['texts']} texts through the model")
+
+    directory = tempfile.mkdtemp()
+    try:
+        for label in ('memory + disk, cold', 'new process, disk tier warm'):
+            cache = NlpCache(path=directory)
+            calls['texts'] = 0
+            start = time.perf_counter()
+            for texts in explorations(count):
+                cache.get_or_compute_many('entities', texts, model)
+            print(f"{label}: {time.perf_counter() - start:.2f}s, {calls['texts']} texts through the model, "
+                  f"{cache.hits} memory hits, {cache.disk_hits} disk hits")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 300, float(sys.argv[2]) if len(sys.argv) > 2 else 5)
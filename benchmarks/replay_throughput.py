@@ -0,0 +1,66 @@
+# Replay steps/sec: the previous per-transition predict/predict/fit loop vs. the batched LearningAgentBase.replay.
+# Usage: python benchmarks/replay_throughput.py [steps] [batch_size] [numpy|keras]
+import sys
+import os
+import time
+import random
+import logging
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from learning_agent_base import LearningAgentBase
+from utils.replay_buffer import ReplayBuffer
+
+def per_transition_replay(agent, batch_size):
+    states, actions, rewards, next_states, dones, _, _ = agent.memory.sample(batch_size)
+    for state, action, reward, next_state, done in zip(states, actions, rewards, next_states, dones):
+        state, next_state = agent._state_vector(state), agent._state_vector(next_state)
+        target = reward
+        if not done:
+            target = reward + agent.gamma * np.amax(agent.model.predict(next_state, verbose=0)[0])
+        target_f = agent.model.predict(state, verbose=0)
+        target_f[0][action] = target
+        agent.model.fit(state, target_f, epochs=1, verbose=0)
+
+def measure(label, replay, steps):
+    start = time.perf_counter()
+    for _ in range(steps):
+        replay()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {steps / elapsed:.1f} replay steps/s ({elapsed / steps * 1e3:.1f} ms/step)")
+
+def run(steps, batch_size, backend):
+    start = time.perf_counter()
+    agent = LearningAgentBase('ReplayBenchmark', state_size=100, action_size=10, model_backend=backend)
+    print(f"{backend} agent construction: {(time.perf_counter() - start) * 1e3:.1f} ms")
+    fill(agent)
+    measure("per-transition", lambda: per_transition_replay(agent, batch_size), max(1, steps // 10))
+    measure("batched", lambda: agent.replay(batch_size), steps)
+    agent = LearningAgentBase('ReplayBenchmark', state_size=100, action_size=10, prioritized_replay=True, model_backend=backend)
+    fill(agent)
+    measure("batched, prioritized", lambda: agent.replay(batch_size), steps)
+
+    # Insert/sample cost of the array-backed buffer stays flat as capacity grows
+    for capacity in (10**4, 10**5, 10**6):
+        buffer = ReplayBuffer(capacity, 100, prioritized=True)
+        state = np.random.rand(100).astype(np.float32)
+        start = time.perf_counter()
+        for i in range(20000):
+            buffer.append(state, i % 10, 1.0, state, False)
+        insert = (time.perf_counter() - start) / 20000
+        start = time.perf_counter()
+        for _ in range(1000):
+            buffer.sample(batch_size)
+        sample = (time.perf_counter() - start) / 1000
+        print(f"ReplayBuffer capacity {capacity}: append {insert * 1e6:.1f} us, sample({batch_size}) {sample * 1e6:.1f} us")
+
+def fill(agent):
+    for _ in range(2000):
+        agent.remember(random.randrange(100), random.randrange(10), random.random(), random.randrange(100), random.random() < 0.05)
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100, int(sys.argv[2]) if len(sys.argv) > 2 else 32,
+        sys.argv[3] if len(sys.argv) > 3 else 'numpy')
@@ -0,0 +1,43 @@
+# Import-time profile of the dashboard entry point plus agent construction time.
+# Usage: python benchmarks/startup_time.py [module] [top_n]
+import sys
+import os
+import time
+import logging
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+def import_profile(module):
+    # Runs `python -X importtime -c "import <module>"` in a fresh interpreter; returns (total_us, rows)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.dirname(ROOT), os.environ.get('PYTHONPATH', '')]))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+    top_level = [row for row in rows if not row[2].startswith('  ')]
+    return sum(row[0] for row in top_level), rows
+
+def agent_construction():
+    from utils.agent_factory import create_agent
+    logging.getLogger().setLevel(logging.WARNING)  # The import above installed the INFO handler
+    for agent_type in ('CuriosityEngine', 'ProblemSolver', 'EdgeNodeAgent', 'FogNodeAgent'):
+        start = time.perf_counter()
+        create_agent(agent_type, f"{agent_type}_bench")
+        print(f"create_agent('{agent_type}'): {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+if __name__ == '__main__':
+    module = sys.argv[1] if len(sys.argv) > 1 else 'omnipong.gui.visualization'
+    top_n = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    total, rows = import_profile(module)
+    print(f"import {module}: {total / 1e3:.1f} ms")
+    for cumulative, self_time, name in sorted(rows, reverse=True)[:top_n]:
+        print(f"  {cumulative / 1e3:9.1f} ms cumulative {self_time / 1e3:8.1f} ms self  {name.strip()}")
+    agent_construction()
@@ -0,0 +1,59 @@
+# Simulates many edge and fog agents in one process and compares the report volume
+# reaching the core with edges reporting straight to it (flat) against edges
+# reporting to their assigned fog, which forwards summaries (tiered).
+# Usage: python benchmarks/tiered_topology.py [num_edges] [num_fogs] [readings_per_edge]
+import sys
+import os
+import time
+import random
+import logging
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from omnipong_core import OmnipongCore
+from agents.edge_node_agent import EdgeNodeAgent
+from agents.fog_node_agent import FogNodeAgent
+
+class SimulatedFog(FogNodeAgent):
+    forward_interval = 0.5
+
+def simulate_edge(edge, readings):
+    # Same report an edge makes for every collect_data task
+    for i in range(readings):
+        edge.report({'agent': edge.agent_id, 'result': {'sensor_id': f"{edge.agent_id}_sensor_{i % 4}",
+                                                        'timestamp': time.time(), 'value': random.uniform(0, 100)}})
+
+def run(num_edges, num_fogs, readings_per_edge, tiered):
+    core = OmnipongCore()
+    fogs = [SimulatedFog(f"FogNodeAgent_{i}") for i in range(num_fogs if tiered else 0)]
+    edges = [EdgeNodeAgent(f"EdgeNodeAgent_{i}") for i in range(num_edges)]
+    for agent in fogs + edges:
+        core.register_agent(agent)
+    threads = [threading.Thread(target=simulate_edge, args=(edge, readings_per_edge)) for edge in edges]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for fog in fogs:
+        while core.transport.local.pending(fog.inbox):
+            time.sleep(0.01)
+        fog.forward_summary()
+    elapsed = time.perf_counter() - start
+    total = num_edges * readings_per_edge
+    print(f"{'tiered' if tiered else 'flat'}: {total} readings from {num_edges} edges in {elapsed:.2f}s, "
+          f"{core.report_count} reports reached the core ({total / max(core.report_count, 1):.0f} readings per report)")
+    if tiered:
+        task = {'type': 'aggregate_data', 'node_id': 'EdgeNodeAgent_7'}
+        print(f"aggregate_data for EdgeNodeAgent_7 routed to {core.select_agent(task).agent_id} "
+              f"(assigned fog {core.topology.edges['EdgeNodeAgent_7']})")
+    core.shutdown()
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    args = [int(arg) for arg in sys.argv[1:4]]
+    num_edges, num_fogs, readings_per_edge = args + [100, 10, 1000][len(args):]
+    run(num_edges, num_fogs, readings_per_edge, tiered=False)
+    run(num_edges, num_fogs, readings_per_edge, tiered=True)
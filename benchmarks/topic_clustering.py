@@ -0,0 +1,68 @@
+# CuriosityEngine's clustering on a stream of exploration results (batches of 10
+# snippets drawn from latent topics): the old per-call TfidfVectorizer + KMeans(5),
+# a KMeans refit on everything seen so far (what carrying state across calls used to
+# take), and the OnlineTopicModel, which assigns each snippet against its growing set
+# of centroids. Purity is the share of snippets whose topic's majority latent topic
+# is their own.
+# Usage: python benchmarks/topic_clustering.py [num_batches] [num_latent_topics]
+import sys
+import os
+import time
+import logging
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from utils.topic_model import OnlineTopicModel
+
+def make_stream(num_batches, num_latent, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabularies = [[f"term{topic}_{word}" for word in range(30)] for topic in range(num_latent)]
+    common = [f"common{word}" for word in range(50)]
+    for _ in range(num_batches):
+        topic = int(rng.integers(num_latent))
+        texts = [" ".join(list(rng.choice(vocabularies[topic], 8)) + list(rng.choice(common, 4))) for _ in range(10)]
+        yield topic, texts
+
+def purity(assignments, truth):
+    majority = {}
+    for cluster, label in zip(assignments, truth):
+        majority.setdefault(cluster, {}).setdefault(label, 0)
+        majority[cluster][label] += 1
+    return sum(max(counts.values()) for counts in majority.values()) / len(truth)
+
+def run(num_batches, num_latent):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.cluster import KMeans
+
+    stream = list(make_stream(num_batches, num_latent))
+    start = time.perf_counter()
+    for _, texts in stream[:min(num_batches, 100)]:
+        KMeans(n_clusters=5, n_init=10).fit(TfidfVectorizer(stop_words='english').fit_transform(texts))
+    per_call = (time.perf_counter() - start) / min(num_batches, 100)
+    print(f"TF-IDF + KMeans(5) per call: {per_call * 1e3:.1f}ms per batch (labels not comparable across calls)")
+
+    seen = [text for _, texts in stream[:num_batches // 2] for text in texts]
+    start = time.perf_counter()
+    KMeans(n_clusters=num_latent, n_init=1).fit(TfidfVectorizer(stop_words='english').fit_transform(seen))
+    print(f"KMeans refit on the {len(seen)} snippets seen halfway: {(time.perf_counter() - start) * 1e3:.1f}ms per batch")
+
+    model = OnlineTopicModel()
+    model.transform(["warm up"])
+    assignments, truth, timings = [], [], []
+    for topic, texts in stream:
+        start = time.perf_counter()
+        assignments.extend(model.partial_fit(texts, label=f"topic {topic}"))
+        timings.append(time.perf_counter() - start)
+        truth.extend([topic] * len(texts))
+    quarter = len(timings) // 4
+    print(f"OnlineTopicModel: {np.mean(timings[:quarter]) * 1e3:.2f}ms per batch in the first quarter, "
+          f"{np.mean(timings[-quarter:]) * 1e3:.2f}ms in the last; {model.size} topics, purity {purity(assignments, truth):.3f}")
+    start = time.perf_counter()
+    related = model.related(stream[0][1][0], k=3)
+    print(f"related() over all topics: {(time.perf_counter() - start) * 1e3:.2f}ms -> {[r['labels'] for r in related]}")
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,64 @@
+# Throughput and one-way latency of the utils.transport implementations.
+# Usage: python benchmarks/transport_throughput.py [num_messages] [amqp_host]
+# Without amqp_host the AMQP transport runs against the in-process broker stand-in,
+# which measures the client-side encode/publish/get overhead but not the network.
+import sys
+import os
+import time
+import logging
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+import numpy as np
+from utils.communication import Communication
+from utils.inprocess_broker import InProcessBroker
+from utils.transport import InMemoryTransport, AmqpTransport
+
+def make_message(i):
+    return {'agent': 'EdgeNodeAgent_1', 'sequence': i, 'data': [0.5] * 16, 'sent': time.perf_counter()}
+
+def throughput(name, transport, count):
+    messages = [make_message(i) for i in range(count)]
+    start = time.perf_counter()
+    transport.send_many('bench_throughput', messages)
+    received = 0
+    while received < count and transport.receive('bench_throughput', timeout=5) is not None:
+        received += 1
+    elapsed = time.perf_counter() - start
+    print(f"{name} throughput: {received} messages in {elapsed:.3f}s ({received / elapsed:.0f} msg/s)")
+
+def latency(name, transport, count):
+    # A sender thread paces single sends; the receiver records arrival - send time
+    latencies = []
+
+    def receive():
+        while len(latencies) < count:
+            message = transport.receive('bench_latency', timeout=5)
+            if message is None:
+                break
+            latencies.append(time.perf_counter() - message['sent'])
+
+    receiver = threading.Thread(target=receive)
+    receiver.start()
+    for i in range(count):
+        transport.send('bench_latency', make_message(i))
+        time.sleep(0.0002)
+    receiver.join()
+    micros = np.array(latencies) * 1e6
+    print(f"{name} latency over {len(micros)} messages: p50 {np.percentile(micros, 50):.0f}us, "
+          f"p99 {np.percentile(micros, 99):.0f}us")
+
+def run(count, host):
+    broker = None if host else InProcessBroker()
+    transports = [('in-memory', InMemoryTransport()),
+                  ('amqp', AmqpTransport(Communication(host=host or 'localhost', broker=broker)))]
+    for name, transport in transports:
+        throughput(name, transport, count)
+        latency(name, transport, min(count, 2000))
+        transport.close()
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,94 @@
+# Build and query cost of the IVF index behind the core's KnowledgeIndex at 10^5 and
+# 10^6 entries, on clustered unit vectors standing in for report embeddings: build time
+# (one bulk add, which trains the lists), then per-query latency and recall@10 against
+# exact brute-force search for a few nprobe settings. Also times embedding report text,
+# and opening a KnowledgeIndex over a store of reports: rebuilt from every stored record
+# vs loaded from the files saved with the store's snapshots, then the cost of a snapshot
+# that saves 1000 new reports on top of them.
+# Usage: python benchmarks/vector_index.py [sizes, comma separated] [dim] [stored reports]
+import sys
+import os
+import time
+import shutil
+import logging
+import tempfile
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from utils.vector_index import IVFIndex, TextEmbedder, KnowledgeIndex
+from utils.knowledge_store import KnowledgeStore
+
+def clustered_vectors(count, dim, num_centers=2000, noise=0.35, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((num_centers, dim)).astype(np.float32)
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 100000):
+        stop = min(start + 100000, count)
+        chunk = centers[rng.integers(num_centers, size=stop - start)] + noise * rng.standard_normal((stop - start, dim)).astype(np.float32)
+        vectors[start:stop] = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+    return vectors
+
+def startup(num_reports):
+    path = tempfile.mkdtemp()
+    try:
+        store = KnowledgeStore(path)
+        for i in range(num_reports):
+            store.append(f"CuriosityEngine_{i % 4}", {'topic': f"topic {i}", 'findings': {'summary': f"summary {i % 997} of {i % 31}"}})
+        store.close()
+        for label in ('rebuilt from the store', 'loaded from the saved index'):
+            store = KnowledgeStore(path)
+            start = time.perf_counter()
+            index = KnowledgeIndex()
+            index.attach(store)
+            print(f"knowledge index over {num_reports} reports, {label}: {time.perf_counter() - start:.2f}s")
+            store.close()  # Snapshots the store, which saves the index
+        store = KnowledgeStore(path)
+        index.attach(store)
+        for i in range(1000):
+            report = {'topic': f"new topic {i}", 'findings': {'summary': f"summary {i % 997}"}}
+            index.add_report('CuriosityEngine_0', report, store.append('CuriosityEngine_0', report))
+        start = time.perf_counter()
+        store.snapshot()
+        print(f"snapshot saving 1000 new reports over {num_reports}: {(time.perf_counter() - start) * 1e3:.1f}ms")
+        store.close()
+    finally:
+        shutil.rmtree(path)
+
+def run(sizes, dim, num_queries=200, k=10):
+    rng = np.random.default_rng(1)
+    for size in sizes:
+        vectors = clustered_vectors(size, dim)
+        queries = vectors[rng.integers(size, size=num_queries)] + 0.05 * rng.standard_normal((num_queries, dim)).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        start = time.perf_counter()
+        truth = [set(np.argpartition(-(vectors @ query), k)[:k].tolist()) for query in queries]
+        brute = (time.perf_counter() - start) / num_queries
+
+        index = IVFIndex(dim)
+        start = time.perf_counter()
+        index.add(vectors, np.arange(size))
+        print(f"{size} vectors x {dim}: built in {time.perf_counter() - start:.1f}s "
+              f"({len(index.list_sizes)} lists); brute force {brute * 1e3:.2f}ms per query")
+        for nprobe in (4, 8, 16, 32):
+            start = time.perf_counter()
+            found = [set(index.search(query, k, nprobe)[0].tolist()) for query in queries]
+            elapsed = (time.perf_counter() - start) / num_queries
+            recall = np.mean([len(f & t) / k for f, t in zip(found, truth)])
+            print(f"  nprobe {nprobe:2d}: {elapsed * 1e3:.2f}ms per query, recall@{k} {recall:.3f}")
+        del index, vectors
+
+    embedder = TextEmbedder(dim=dim)
+    reports = [f"topic {i % 997} summary of findings about subject {i % 31} and entity {i % 113}" for i in range(10000)]
+    embedder.embed(reports[:10])
+    start = time.perf_counter()
+    embedder.embed(reports)
+    print(f"embedding {len(reports)} report texts: {(time.perf_counter() - start) * 1e3:.0f}ms")
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    sizes = [int(float(size)) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else [100000, 1000000]
+    run(sizes, int(sys.argv[2]) if len(sys.argv) > 2 else 128)
+    startup(int(float(sys.argv[3])) if len(sys.argv) > 3 else 20000)
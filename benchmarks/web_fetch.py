@@ -0,0 +1,109 @@
+# CuriosityEngine's fetch stage against a local stand-in search server with fixed
+# latency: one blocking urllib request per topic followed by its analysis (as the
+# old explore did) vs the shared AsyncFetcher with the next topic prefetched while
+# the current one is analysed. Like a real search page, those responses are sent
+# with 'private, max-age=0' and no validator, so only the held prefetch avoids a
+# second download. Then, with cacheable responses, repeat lookups served from the
+# cache and revalidated with ETags once max-age runs out.
+# Usage: python benchmarks/web_fetch.py [num_topics] [latency_ms] [analysis_ms]
+import sys
+import os
+import time
+import hashlib
+import logging
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+from utils.web_fetcher import AsyncFetcher, HttpCache
+
+LATENCY = 0.05
+MAX_AGE = 60
+
+class SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so pooled connections are reused
+    requests_served = 0
+    not_modified = 0
+    cacheable = False
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        etag = f'"{hashlib.sha1(query.encode()).hexdigest()}"'
+        type(self).requests_served += 1
+        if self.cacheable and self.headers.get('If-None-Match') == etag:
+            type(self).not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f"max-age={MAX_AGE}")
+            self.end_headers()
+            return
+        body = ''.join(f'<div class="BNeawe s3v9rd AP7Wnd">{query} result {i}</div>' for i in range(10)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if self.cacheable:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f"max-age={MAX_AGE}")
+        else:
+            self.send_header('Cache-Control', 'private, max-age=0')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def run(num_topics, latency_ms, analysis_ms):
+    global LATENCY
+    LATENCY = latency_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SearchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_port}/search?q=topic+{i}" for i in range(num_topics)]
+    analyse = lambda text: time.sleep(analysis_ms / 1000)  # Stands in for summarization, NER and clustering
+
+    start = time.perf_counter()
+    for url in urls:
+        with urllib.request.urlopen(url) as response:
+            analyse(response.read().decode())
+    print(f"blocking fetch then analyse, {num_topics} topics: {time.perf_counter() - start:.2f}s")
+
+    fetcher = AsyncFetcher(per_host=8, cache=HttpCache())
+    served = SearchHandler.requests_served
+    start = time.perf_counter()
+    fetcher.prefetch(urls[0])
+    for i, url in enumerate(urls):
+        if i + 1 < len(urls):
+            fetcher.prefetch(urls[i + 1])  # Topic i+1 downloads while topic i is analysed
+        analyse(fetcher.get(url))
+    print(f"pipelined (prefetch next topic): {time.perf_counter() - start:.2f}s, "
+          f"{SearchHandler.requests_served - served} requests for {num_topics} topics")
+
+    SearchHandler.cacheable = True
+    for future in [fetcher.submit(url) for url in urls]:
+        future.result()
+    start = time.perf_counter()
+    futures = [fetcher.submit(url) for url in urls]
+    for future in futures:
+        future.result()
+    print(f"cached repeat of all topics: {(time.perf_counter() - start) * 1e3:.1f}ms ({fetcher.cache.hits} hits)")
+
+    for entry in fetcher.cache.entries.values():
+        entry['expires'] = 0.0  # As if max-age had run out
+    served, not_modified = SearchHandler.requests_served, SearchHandler.not_modified
+    start = time.perf_counter()
+    futures = [fetcher.submit(url) for url in urls]
+    for future in futures:
+        future.result()
+    print(f"after max-age: {time.perf_counter() - start:.2f}s for {SearchHandler.requests_served - served} requests, "
+          f"{SearchHandler.not_modified - not_modified} answered 304 Not Modified")
+    fetcher.close()
+    server.shutdown()
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50, float(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 50)
@@ -2,20 +2,18 @@ import logging
 import threading
 import tkinter as tk
 from tkinter import ttk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import pandas as pd
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime=s - %(levelname=s - %(message=s')
 
 class DataVisualizationAgent:
     def __init__(self):
-        self.data = pd.DataFrame()
+        self.data = None  # pandas is imported by the first update_data call
         logging.info("DataVisualizationAgent initialized")
 
     def update_data(self, new_data):
         try:
+            import pandas as pd
             self.data = pd.DataFrame(new_data)
             logging.info(f"Data updated: {new_data}")
         except Exception as e:
@@ -23,6 +21,7 @@ class DataVisualizationAgent:
 
     def create_visualization(self, chart_type='line'):
         try:
+            from matplotlib.figure import Figure
             fig = Figure(figsize=(6, 4), dpi=100)
             ax = fig.add_subplot(111)
 
@@ -45,6 +44,7 @@ class DataVisualizationAgent:
     def display_visualization(self, chart_type='line'):
         fig = self.create_visualization(chart_type)
         if fig is not None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
             root = tk.Tk()
             root.title(f'{chart_type.capitalize()} Chart')
             canvas = FigureCanvasTkAgg(fig, master=root)
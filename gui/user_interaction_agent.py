@@ -1,16 +1,30 @@
 import logging
 import threading
-from transformers import AutoModel, AutoTokenizer
+from utils.model_registry import model_registry
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def load_minicpm(model_name="openbmb/MiniCPM-o-2_6"):
+    from transformers import AutoModel, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+    model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
+    return tokenizer, model
+
+model_registry.register('MiniCPM-o-2_6', load_minicpm)
 
 class UserInteractionAgent:
     def __init__(self):
-        model_name = "openbmb/MiniCPM-o-2_6"
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
-        self.model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
-        logging.info("UserInteractionAgent initialized with MiniCPM model")
+        # The MiniCPM model is loaded by the first interpret_input call, not here
+        logging.info("UserInteractionAgent initialized; MiniCPM model loads on first use")
+
+    @property
+    def tokenizer(self):
+        return model_registry.get('MiniCPM-o-2_6')[0]
+
+    @property
+    def model(self):
+        return model_registry.get('MiniCPM-o-2_6')[1]
 
     def interpret_input(self, user_input):
         inputs = self.tokenizer(user_input, return_tensors="pt")
@@ -1,26 +1,31 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
-import time
 from omnipong.omnipong_core import OmnipongCore
-from omnipong.utils.agent_factory import create_agent
+from utils.agent_factory import create_agent  # Same registry and agent pool the agents use
 from omnipong.gui.user_interaction_agent import UserInteractionAgent
 from omnipong.gui.data_visualization_agent import DataVisualizationAgent
+from utils.model_registry import model_registry  # Same module instance the agents use
+from utils.knowledge_store import KnowledgeStore
+from utils.checkpoint import Checkpointer
+from utils.vector_index import KnowledgeIndex
+from utils.nlp_cache import nlp_cache  # Same module instance the agents use
 
 class OmnipongApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Omnipong Dashboard")
-        self.core = OmnipongCore()
+        nlp_cache.use_disk('data/nlp_cache', max_bytes=256 * 2**20)
+        self.core = OmnipongCore(knowledge_store=KnowledgeStore('data/knowledge'), checkpointer=Checkpointer('data/checkpoints'),
+                                 knowledge_index=KnowledgeIndex())
         self.user_agent = UserInteractionAgent()
         self.viz_agent = DataVisualizationAgent()
 
-        # Create and register agents
-        self.create_agents()
-
         # Set up GUI components
         self.setup_ui()
 
+        # Create and register agents once the window has been drawn
+        self.root.after_idle(self.create_agents)
+
         # Start background task processing
         self.start_processing()
 
@@ -34,6 +39,10 @@ class OmnipongApp:
         self.core.register_agent(problem_solver)
         self.core.register_agent(edge_node_agent)
         self.core.register_agent(fog_node_agent)
+        self.core.restore_agents()
+
+        # Load the shared transformer/spaCy models while the dashboard comes up
+        model_registry.warmup(['zero-shot-classification', 'summarization', 'en_core_web_sm'], background=True)
 
     def setup_ui(self):
         self.tab_control = ttk.Notebook(self.root)
@@ -129,18 +138,18 @@ class OmnipongApp:
 
     def update_task_list(self):
         self.task_list.delete(0, tk.END)
-        for task in self.core.task_queue:
+        for task in list(self.core.task_queue):  # Snapshot; the dispatcher drains it concurrently
             self.task_list.insert(tk.END, f"Task: {task['type']} - {task.get('topic', task.get('problem', task.get('sensor_id', task.get('data', ''))))}")
 
     def start_processing(self):
-        self.processing_thread = threading.Thread(target=self.process_tasks)
-        self.processing_thread.start()
-
-    def process_tasks(self):
-        while True:
-            self.core.distribute_tasks()
-            self.update_task_list()
-            time.sleep(5)  # Update every 5 seconds
+        # The core dispatches as soon as tasks arrive; refresh the list on the Tk thread afterwards
+        self.core.add_dispatch_callback(lambda: self.root.after(0, self.update_task_list))
+        self.core.automate_task_distribution()
+        self.root.protocol("WM_DELETE_WINDOW", self.shutdown)
+
+    def shutdown(self):
+        self.core.shutdown(timeout=5)
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,42 +1,55 @@
 from agent_base import AgentBase
 import numpy as np
 import random
-import json
 import logging
-from collections import deque
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense
-from tensorflow.keras.optimizers import Adam
+from utils.replay_buffer import ReplayBuffer
+from utils.q_network import build_q_network, get_optimizer_state, set_optimizer_state
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class LearningAgentBase(AgentBase):
-    def __init__(self, agent_id, state_size, action_size):
+    def __init__(self, agent_id, state_size, action_size, memory_size=2000, prioritized_replay=False, memory_path=None,
+                 model_backend='numpy'):
         super().__init__(agent_id)
         self.state_size = state_size
         self.action_size = action_size
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayBuffer(memory_size, state_size, prioritized=prioritized_replay, path=memory_path)
         self.gamma = 0.95  # Discount rate
         self.epsilon = 1.0  # Exploration rate
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
         self.learning_rate = 0.001
-        self.model = self._build_model()
+        self.model_backend = model_backend  # 'numpy' (default) or 'keras', which imports TensorFlow
+        self._model = None  # Built on first use; see the model property
         logging.info(f"LearningAgentBase {self.agent_id} initialized with state size {self.state_size} and action size {self.action_size}")
 
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self._build_model()
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
     def _build_model(self):
         # Neural Network for Deep Q-Learning
-        model = Sequential()
-        model.add(Dense(24, input_dim=self.state_size, activation='relu'))
-        model.add(Dense(24, activation='relu'))
-        model.add(Dense(self.action_size, activation='linear'))
-        model.compile(loss='mse', optimizer=Adam(learning_rate=self.learning_rate))
-        logging.info("Neural network model built for Q-learning")
+        model = build_q_network(self.model_backend, self.state_size, self.action_size, (24, 24), self.learning_rate)
+        logging.info(f"Neural network model built for Q-learning with {self.model_backend} backend")
         return model
 
+    def _state_vector(self, state):
+        # Agents hand over either a discrete state index or a state array; the network wants a (1, state_size) row
+        if np.ndim(state) == 0:
+            vector = np.zeros((1, self.state_size), dtype=np.float32)
+            vector[0, int(state) % self.state_size] = 1.0
+            return vector
+        return np.reshape(state, [1, self.state_size]).astype(np.float32)
+
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.append(self._state_vector(state)[0], action, reward, self._state_vector(next_state)[0], done)
         logging.info(f"Memory updated with state: {state}, action: {action}, reward: {reward}, next_state: {next_state}, done: {done}")
 
     def act(self, state):
@@ -44,25 +57,63 @@ class LearningAgentBase(AgentBase):
             action = random.randrange(self.action_size)
             logging.info(f"Random action chosen due to exploration: {action}")
             return action
-        act_values = self.model.predict(state)
+        act_values = self.model.predict_on_batch(self._state_vector(state))
         action = np.argmax(act_values[0])
         logging.info(f"Action chosen based on model prediction: {action}")
         return action
 
     def replay(self, batch_size):
-        minibatch = random.sample(self.memory, batch_size)
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                target = reward + self.gamma * np.amax(self.model.predict(next_state)[0])
-            target_f = self.model.predict(state)
-            target_f[0][action] = target
-            self.model.fit(state, target_f, epochs=1, verbose=0)
-            logging.info(f"Replay memory updated and model trained for state: {state}")
+        # One batched predict for Q(s), one for Q(s') and one training step for the whole minibatch
+        batch_size = min(batch_size, len(self.memory))
+        if batch_size == 0:
+            return
+        states, actions, rewards, next_states, dones, indices, weights = self.memory.sample(batch_size)
+
+        next_q = np.asarray(self.model.predict_on_batch(next_states))
+        targets = np.array(self.model.predict_on_batch(states))
+        rows = np.arange(batch_size)
+        td_targets = rewards + self.gamma * np.amax(next_q, axis=1) * ~dones
+        self.memory.update_priorities(indices, td_targets - targets[rows, actions])
+        targets[rows, actions] = td_targets
+        if self.memory.prioritized:
+            self.model.train_on_batch(states, targets, sample_weight=weights)
+        else:
+            self.model.train_on_batch(states, targets)
+        logging.info(f"Replay trained model on minibatch of {batch_size} transitions")
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
             logging.info(f"Epsilon updated: {self.epsilon}")
 
+    def checkpoint_state(self):
+        # Exploration schedule, network weights, optimizer slots and the replay memory in one checkpoint
+        metadata, arrays = super().checkpoint_state()
+        metadata.update(epsilon=self.epsilon, epsilon_min=self.epsilon_min, epsilon_decay=self.epsilon_decay,
+                        gamma=self.gamma, model_layers=0, optimizer_slots=0)
+        if self._model is not None:  # Still unbuilt: nothing learned yet
+            weights = self._model.get_weights()
+            optimizer = get_optimizer_state(self._model)
+            arrays.update((f"model/{i}", weight) for i, weight in enumerate(weights))
+            arrays.update((f"optimizer/{i}", slot) for i, slot in enumerate(optimizer))
+            metadata.update(model_layers=len(weights), optimizer_slots=len(optimizer))
+        if self.memory.path is None:
+            arrays.update((f"memory/{name}", array) for name, array in self.memory.checkpoint_arrays().items())
+            metadata['max_priority'] = self.memory.max_priority
+        else:
+            self.memory.flush()  # Already persisted in its own memory-mapped files
+        return metadata, arrays
+
+    def restore_checkpoint(self, metadata, arrays):
+        super().restore_checkpoint(metadata, arrays)
+        for name in ('epsilon', 'epsilon_min', 'epsilon_decay', 'gamma'):
+            setattr(self, name, metadata.get(name, getattr(self, name)))
+        if metadata.get('model_layers'):
+            self.model.set_weights([arrays[f"model/{i}"] for i in range(metadata['model_layers'])])
+        if metadata.get('optimizer_slots'):
+            set_optimizer_state(self.model, [arrays[f"optimizer/{i}"] for i in range(metadata['optimizer_slots'])])
+        memory = {name[len('memory/'):]: array for name, array in arrays.items() if name.startswith('memory/')}
+        if memory:
+            self.memory.restore(memory, metadata.get('max_priority', 1.0))
+
     def load(self, name):
         self.model.load_weights(name)
         logging.info(f"Model weights loaded from {name}")
@@ -81,5 +132,5 @@ if __name__ == '__main__':
     next_state = np.reshape([0, 1, 0, 0], [1, state_size])
     agent.remember(state, action, 1, next_state, False)
     agent.replay(1)
-    agent.save("model_weights.h5")
-    agent.load("model_weights.h5")
+    agent.save("model_weights.npz")
+    agent.load("model_weights.npz")
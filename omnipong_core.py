@@ -1,68 +1,207 @@
 import logging
 import json
-import time
-from utils.communication import Communication
+import threading
+from utils.transport import create_transport
+from utils.task_dispatcher import TaskDispatcher
+from utils.agent_executor import AgentExecutor
+from utils.topology import Topology
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def _json_default(value):
+    # Reports may carry NumPy arrays and scalars (see utils.codec); JSON gets them as lists/numbers
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _report_id(match):
+    # The knowledge store's record id of a knowledge index match; its index id when there is no store
+    return match['record_id'] if match.get('record_id') is not None else match['id']
 
 class OmnipongCore:
-    def __init__(self):
+    def __init__(self, executor=None, transport=None, knowledge_store=None, checkpointer=None, knowledge_index=None):
         self.agents = {}
-        self.task_queue = []
-        self.knowledge_base = {}
-        self.communication = Communication()
+        self.executor = executor if executor is not None else AgentExecutor()
+        self.dispatcher = TaskDispatcher(load=getattr(self.executor, 'expected_wait', None))  # Load-aware when it can be
+        self.task_queue = self.dispatcher.pending
+        # Optional utils.knowledge_store.KnowledgeStore keeping every report; knowledge_base stays the latest-value view
+        self.knowledge_store = knowledge_store
+        self.knowledge_base = dict(knowledge_store.latest) if knowledge_store is not None else {}
+        self.knowledge_lock = threading.Lock()  # Reports arrive from executor threads
+        self.checkpointer = checkpointer  # Optional utils.checkpoint.Checkpointer for agent state
+        # Optional utils.vector_index.KnowledgeIndex: tasks matching earlier reports are skipped or seeded with them
+        self.knowledge_index = knowledge_index
+        if knowledge_index is not None and knowledge_store is not None:
+            knowledge_index.attach(knowledge_store)  # Loads the index saved with the store; indexes only newer records
+        self.short_circuited = 0
+        self.dispatch_callbacks = []  # Called after each distribution pass that assigned or answered tasks
+        self.distribution_thread = None
+        self.topology = Topology()  # Edge -> fog assignments and data locality
+        self.report_count = 0
+        self.cluster = None  # Set by utils.cluster.ClusterNode when this core is part of a cluster
+        self.transport = transport if transport is not None else create_transport()  # In-memory unless remote queues are bound
         logging.info("Omnipong Core initialized")
 
     def register_agent(self, agent):
         try:
             self.agents[agent.agent_id] = agent
+            self.dispatcher.add_agent(agent)
             agent.core = self  # Set reference back to core
+            if agent.tier == 'fog':
+                for edge_id in self.topology.add_fog(agent.agent_id):
+                    self._connect_edge(edge_id)
+            elif agent.tier == 'edge':
+                self.topology.assign(agent.agent_id, agent.fog_id)
+                self._connect_edge(agent.agent_id)
+            agent.on_register(self)
             logging.info(f"Agent '{agent.agent_id}' registered")
         except Exception as e:
             logging.error(f"Error registering agent '{agent.agent_id}': {e}")
 
+    def _connect_edge(self, edge_id):
+        # Points an edge's reports at its fog's inbox, or back at the core when it has none
+        edge, fog = self.agents.get(edge_id), self.agents.get(self.topology.edges.get(edge_id))
+        if edge is not None:
+            edge.upstream = fog.inbox if fog is not None else None
+
+    def unregister_agent(self, agent_id):
+        try:
+            self.dispatcher.remove_agent(agent_id)
+            self.executor.forget_agent(agent_id)
+            agent = self.agents.pop(agent_id, None)
+            for edge_id in self.topology.remove(agent_id):
+                self.topology.assign(edge_id)
+                self._connect_edge(edge_id)
+            if agent is not None:
+                agent.on_unregister()
+                agent.core = None
+            logging.info(f"Agent '{agent_id}' unregistered")
+        except Exception as e:
+            logging.error(f"Error unregistering agent '{agent_id}': {e}")
+
     def send_task(self, task):
         try:
-            self.task_queue.append(task)
+            self.dispatcher.enqueue(task)
             logging.info(f"Task added to queue: {task}")
         except Exception as e:
             logging.error(f"Error adding task to queue: {e}")
 
     def distribute_tasks(self):
+        distributed = 0
         try:
-            while self.task_queue:
-                task = self.task_queue.pop(0)
+            while True:
+                task = self.dispatcher.next_task()
+                if task is None:
+                    break
+                if self.knowledge_index is not None and not self._consult_index(task):
+                    distributed += 1  # Answered from the knowledge base
+                    continue
                 agent = self.select_agent(task)
                 if agent:
-                    agent.receive_task(task)
+                    self.executor.submit(agent, task)
+                    distributed += 1
                     logging.info(f"Task '{task}' assigned to agent '{agent.agent_id}'")
                 else:
                     logging.warning(f"No suitable agent found for task: {task}")
         except Exception as e:
             logging.error(f"Error distributing tasks: {e}")
+        if distributed:
+            for callback in self.dispatch_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f"Error in dispatch callback: {e}")
+        return distributed
+
+    def _consult_index(self, task):
+        # False when an earlier report already answers task, which is then reported again marked
+        # reused_from instead of being dispatched; otherwise similar reports seed it
+        try:
+            match = self.knowledge_index.lookup(task)
+            if match is None:
+                return True
+            kind, results = match
+            if kind == 'reuse':
+                self.short_circuited += 1
+                reused = results[0]
+                logging.info(f"Task '{task}' answered by the report from '{reused['agent']}' at {reused['timestamp']:.0f}")
+                self.receive_report(reused['agent'], dict(reused['report'], reused_from=_report_id(reused)))
+                return False
+            task['related_results'] = [{'id': _report_id(r), 'similarity': r['similarity'], 'agent': r['agent'],
+                                        'subject': r['subject'], 'report': r['report']} for r in results]
+        except Exception as e:
+            logging.error(f"Error consulting knowledge index for task '{task}': {e}")
+        return True
+
+    def similar_knowledge(self, text, k=5):
+        # Earlier reports most similar to text, best first
+        if self.knowledge_index is None:
+            return []
+        return self.knowledge_index.similar(text, k)
+
+    def add_dispatch_callback(self, callback):
+        self.dispatch_callbacks.append(callback)
 
     def select_agent(self, task):
         try:
-            for agent in self.agents.values():
-                if agent.can_handle(task):
+            # Clustered: tasks with an affinity key go to the node that owns the key
+            clustered = self.cluster is not None and not task.get('cluster_forwarded')
+            if clustered and task.get('affinity') is not None:
+                agent = self.cluster.select_agent(task)
+                if agent is not None:
                     return agent
-            return None
+            # Prefer the edge holding the task's data, then its fog, over any agent of the right type
+            for agent_id in self.topology.candidates(task):
+                agent = self.agents.get(agent_id)
+                if agent is not None and agent.can_handle(task):
+                    return agent
+            agent = self.dispatcher.select_agent(task)
+            if agent is not None and agent.tier == 'edge' and task.get('sensor_id') is not None:
+                self.topology.locate(task['sensor_id'], agent.agent_id)
+            if agent is None and clustered:
+                agent = self.cluster.select_agent(task)  # No local agent: any node that has one
+            return agent
         except Exception as e:
             logging.error(f"Error selecting agent for task '{task}': {e}")
             return None
 
+    def agent_stats(self):
+        # Per-agent queue depth, completed/stolen counts and EWMA latency from the executor
+        return self.executor.stats()
+
     def receive_report(self, agent_id, report):
         try:
             logging.info(f"Core received report from '{agent_id}': {report}")
-            self.knowledge_base.update(report)
+            with self.knowledge_lock:
+                self.knowledge_base.update(report)
+                self.report_count += 1
+            record_id = self.knowledge_store.append(agent_id, report) if self.knowledge_store is not None else None
+            if self.knowledge_index is not None:
+                self.knowledge_index.add_report(agent_id, report, record_id)
         except Exception as e:
             logging.error(f"Error receiving report from '{agent_id}': {e}")
 
-    def save_knowledge_base(self, filepath):
+    def query_knowledge(self, agent=None, topic=None, since=None, until=None, limit=None):
+        # Report history from the knowledge store, filtered through its indexes
+        if self.knowledge_store is None:
+            return []
+        return self.knowledge_store.query(agent=agent, topic=topic, since=since, until=until, limit=limit)
+
+    def save_knowledge_base(self, filepath=None):
+        # With a knowledge store every report is already in its log, so saving only syncs what's new
+        if self.knowledge_store is not None:
+            try:
+                self.knowledge_store.sync()
+                logging.info(f"Knowledge store synced at {self.knowledge_store.path}")
+            except Exception as e:
+                logging.error(f"Error syncing knowledge store: {e}")
+            return
         try:
+            with self.knowledge_lock:
+                snapshot = dict(self.knowledge_base)
             with open(filepath, 'w') as file:
-                json.dump(self.knowledge_base, file)
+                json.dump(snapshot, file, default=_json_default)
             logging.info(f"Knowledge base saved to {filepath}")
         except Exception as e:
             logging.error(f"Error saving knowledge base: {e}")
@@ -75,13 +214,57 @@ class OmnipongCore:
         except Exception as e:
             logging.error(f"Error loading knowledge base: {e}")
 
-    def automate_task_distribution(self, interval=5):
-        import threading
+    def checkpoint_agents(self, background=True):
+        # Captures every agent now; the writes finish in the checkpointer's pool unless background=False
+        if self.checkpointer is None:
+            return []
+        return self.checkpointer.save_all(list(self.agents.values()), background)
+
+    def restore_agents(self):
+        # Restores registered agents from their latest checkpoints in parallel; returns how many had one
+        if self.checkpointer is None:
+            return 0
+        restored = self.checkpointer.restore_all(list(self.agents.values()))
+        logging.info(f"Restored {restored} of {len(self.agents)} agents from checkpoints")
+        return restored
+
+    def automate_task_distribution(self, interval=None):
+        # Dispatches as soon as send_task enqueues work; interval only bounds idle waits
+        if self.distribution_thread and self.distribution_thread.is_alive():
+            return
+        self.dispatcher.open()
+
         def distribute():
-            while True:
-                self.distribute_tasks()
-                time.sleep(interval)
-        threading.Thread(target=distribute, daemon=True).start()
+            while not self.dispatcher.closed:
+                if self.dispatcher.wait_for_task(timeout=interval):
+                    self.distribute_tasks()
+            logging.info("Task distribution stopped")
+
+        self.distribution_thread = threading.Thread(target=distribute, daemon=True)
+        self.distribution_thread.start()
+
+    def stop_task_distribution(self, timeout=None):
+        self.dispatcher.close()
+        if self.distribution_thread and self.distribution_thread is not threading.current_thread():
+            self.distribution_thread.join(timeout)
+        self.distribution_thread = None
+
+    def shutdown(self, timeout=None):
+        self.stop_task_distribution(timeout)
+        if self.cluster is not None:
+            self.cluster.stop(timeout)
+        for agent in list(self.agents.values()):
+            try:
+                agent.on_unregister()
+            except Exception as e:
+                logging.error(f"Error stopping agent '{agent.agent_id}': {e}")
+        self.executor.shutdown(wait=True)
+        if self.checkpointer is not None:  # Agents are idle now, so the final capture is consistent
+            self.checkpoint_agents(background=False)
+            self.checkpointer.close()
+        self.transport.close()
+        if self.knowledge_store is not None:
+            self.knowledge_store.close()
 
 # Example usage
 if __name__ == '__main__':
@@ -89,3 +272,4 @@ if __name__ == '__main__':
     core.save_knowledge_base('data/knowledge_base.json')
     core.load_knowledge_base('data/knowledge_base.json')
     core.automate_task_distribution()
+    core.shutdown()
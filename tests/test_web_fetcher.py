@@ -0,0 +1,122 @@
+# AsyncFetcher against a local stand-in HTTP server: ETag revalidation, retries on
+# 429/5xx, the stale copy on final failure, shared in-flight downloads and prefetch
+# results held until get() takes them.
+# Usage: python -m pytest tests/test_web_fetcher.py
+import sys
+import os
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT, os.path.dirname(ROOT)])
+
+pytest.importorskip('aiohttp')
+import aiohttp
+from utils.web_fetcher import AsyncFetcher, HttpCache
+
+# Serves each path from a script of (status, headers, body) responses, repeating the
+# last one, and records the request headers it saw
+class ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+            script = server.scripts[self.path]
+            status, headers, body = script.pop(0) if len(script) > 1 else script[0]
+        time.sleep(server.latency)
+        if status == 304 or (status == 200 and 'If-None-Match' in self.headers and headers.get('ETag') == self.headers['If-None-Match']):
+            status, body = 304, b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.scripts = {}
+    httpd.latency = 0.0
+    httpd.url = lambda path: f"http://127.0.0.1:{httpd.server_port}{path}"
+    httpd.count = lambda path: sum(1 for requested, _ in httpd.requests if requested == path)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def fetcher():
+    fetcher = AsyncFetcher(retries=2, backoff=0.01, timeout=5, cache=HttpCache())
+    yield fetcher
+    fetcher.close()
+
+UNCACHEABLE = {'Cache-Control': 'private, max-age=0'}  # As search pages are sent
+
+def test_revalidates_with_etag(server, fetcher):
+    server.scripts['/page'] = [(200, {'ETag': '"v1"', 'Cache-Control': 'max-age=0'}, b'body')]
+    assert fetcher.get(server.url('/page')) == 'body'
+    assert fetcher.get(server.url('/page')) == 'body'
+    assert server.count('/page') == 2
+    assert server.requests[1][1].get('If-None-Match') == '"v1"'
+    assert fetcher.cache.revalidated == 1
+
+def test_fresh_entry_served_from_cache(server, fetcher):
+    server.scripts['/page'] = [(200, {'Cache-Control': 'max-age=60'}, b'body')]
+    fetcher.get(server.url('/page'))
+    assert fetcher.get(server.url('/page')) == 'body'
+    assert server.count('/page') == 1
+    assert fetcher.cache.hits == 1
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retries_then_succeeds(server, fetcher, status):
+    server.scripts['/page'] = [(status, {}, b''), (200, UNCACHEABLE, b'body')]
+    assert fetcher.get(server.url('/page')) == 'body'
+    assert server.count('/page') == 2
+
+def test_gives_up_after_retries_without_cached_copy(server, fetcher):
+    server.scripts['/page'] = [(503, {}, b'')]
+    with pytest.raises(aiohttp.ClientResponseError):
+        fetcher.get(server.url('/page'))
+    assert server.count('/page') == fetcher.retries + 1
+
+def test_stale_copy_on_final_failure(server, fetcher):
+    server.scripts['/page'] = [(200, {'Cache-Control': 'max-age=0'}, b'stale'), (503, {}, b'')]
+    assert fetcher.get(server.url('/page')) == 'stale'
+    assert fetcher.get(server.url('/page')) == 'stale'
+    assert server.count('/page') == 1 + fetcher.retries + 1
+
+def test_concurrent_requests_share_one_download(server, fetcher):
+    server.scripts['/page'] = [(200, UNCACHEABLE, b'body')]
+    server.latency = 0.2
+    futures = [fetcher.submit(server.url('/page')) for _ in range(5)]
+    assert [future.result() for future in futures] == ['body'] * 5
+    assert server.count('/page') == 1
+
+def test_prefetch_held_until_get(server, fetcher):
+    server.scripts['/page'] = [(200, UNCACHEABLE, b'body')]
+    fetcher.prefetch(server.url('/page')).result()  # Finished before explore() would ask for it
+    assert fetcher.get(server.url('/page')) == 'body'
+    assert server.count('/page') == 1
+    assert fetcher.get(server.url('/page')) == 'body'  # Taken: an uncacheable page is downloaded again
+    assert server.count('/page') == 2
+
+def test_each_prefetch_matches_one_get(server, fetcher):
+    server.scripts['/page'] = [(200, UNCACHEABLE, b'body')]
+    fetcher.prefetch(server.url('/page'))
+    fetcher.prefetch(server.url('/page'))
+    assert fetcher.get(server.url('/page')) == 'body'
+    assert fetcher.get(server.url('/page')) == 'body'
+    assert server.count('/page') == 1
+    assert not fetcher.prefetched
@@ -1 +1,6 @@
-from utils.agent_factory import create_agent
+def __getattr__(name):
+    # Resolved on first use so importing a utils submodule doesn't import every agent
+    if name == 'create_agent':
+        from utils.agent_factory import create_agent
+        return create_agent
+    raise AttributeError(f"module 'utils' has no attribute '{name}'")
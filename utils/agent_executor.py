@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class _AgentSlot:
+    def __init__(self, agent):
+        self.agent = agent
+        self.limit = getattr(agent, 'max_concurrency', 1)
+        self.running = 0
+        self.backlog = deque()
+        self.completed = 0
+        self.stolen = 0  # Tasks this agent took from a busier peer's backlog
+        self.latency = None  # EWMA of task service time in seconds
+        self.forgotten = False  # Agent unregistered; remove the slot once it is idle
+
+# Runs agent.receive_task off the dispatcher thread. Each agent gets at most
+# agent.max_concurrency tasks in flight; extra tasks wait in that agent's backlog
+# so a slow agent never ties up pool threads that other agents could use.
+# Agents with execution_mode 'process' may return a picklable (func, args) pair
+# from offload(task); that work runs in the process pool and its result is
+# handed back through agent.complete_offload, which reports to the core.
+# Per-agent queue depth and an EWMA of service time are tracked for load-aware
+# selection (expected_wait) and exposed through stats(). With work_stealing, an
+# agent that drains its backlog takes the newest waiting task from the longest
+# backlog among agents of the same class whose can_steal() accepts it.
+# forget_agent() drops an agent's slot once its running and backlogged tasks are
+# done, so agents may unregister from inside their own task.
+class AgentExecutor:
+    def __init__(self, max_threads=8, max_processes=0, max_pending=1000, work_stealing=True, latency_alpha=0.2):
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='agent') if max_threads else None
+        self.process_pool = ProcessPoolExecutor(max_workers=max_processes) if max_processes else None
+        self.pending = threading.BoundedSemaphore(max_pending)  # submit() blocks once this many tasks are in flight
+        self.slots = {}  # agent_id -> _AgentSlot
+        self.groups = {}  # agent class -> agent ids, the candidates for stealing from each other
+        self.work_stealing = work_stealing
+        self.latency_alpha = latency_alpha
+        self.default_latency = 0.001  # Assumed service time for agents with no completed task yet
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        logging.info(f"AgentExecutor initialized with {max_threads} threads and {max_processes} processes")
+
+    def submit(self, agent, task):
+        if self.thread_pool is None:
+            self._run(agent, task)
+            return
+        self.pending.acquire()
+        with self.lock:
+            self.in_flight += 1
+            slot = self.slots.get(agent.agent_id)
+            if slot is None:
+                slot = self.slots[agent.agent_id] = _AgentSlot(agent)
+                self.groups.setdefault(type(agent), set()).add(agent.agent_id)
+            slot.forgotten = False
+            queued = slot.running >= slot.limit
+            if queued:
+                slot.backlog.append(task)
+            else:
+                slot.running += 1
+        if not queued:
+            self._start(agent, task)
+            return
+        prefetch = getattr(agent, 'prefetch', None)
+        if prefetch is not None:  # The task has to wait: let the agent start its I/O meanwhile
+            try:
+                prefetch(task)
+            except Exception as e:
+                logging.error(f"Error prefetching for {agent.agent_id}: {e}")
+
+    def _start(self, agent, task):
+        try:
+            self.thread_pool.submit(self._run_and_release, agent, task)
+        except RuntimeError as e:  # Pool already shut down; drop this agent's backlog too
+            logging.error(f"Error submitting task for {agent.agent_id}: {e}")
+            with self.lock:
+                slot = self.slots[agent.agent_id]
+                dropped = len(slot.backlog) + 1
+                slot.backlog.clear()
+                slot.running -= 1
+                self.in_flight -= dropped
+                self._remove_if_idle_locked(agent.agent_id, slot)
+            for _ in range(dropped):
+                self.pending.release()
+
+    def _run_and_release(self, agent, task):
+        offloaded = False
+        started = time.perf_counter()
+        try:
+            offloaded = self._run(agent, task, started)
+        finally:
+            if not offloaded:
+                self._task_done(agent, time.perf_counter() - started)
+
+    def _run(self, agent, task, started=None):
+        # Returns True when the task continues in the process pool
+        try:
+            spec = None
+            if getattr(agent, 'execution_mode', 'thread') == 'process' and hasattr(agent, 'offload'):
+                spec = agent.offload(task)
+            if spec is None:
+                agent.receive_task(task)
+                return False
+            func, args = spec
+            if self.process_pool is None or self.thread_pool is None:
+                agent.complete_offload(task, func(*args))
+                return False
+            future = self.process_pool.submit(func, *args)
+            future.add_done_callback(lambda f: self._offload_done(agent, task, f, started))
+            return True
+        except Exception as e:
+            logging.error(f"Error executing task by {agent.agent_id}: {e}")
+            agent.report({'agent': agent.agent_id, 'error': str(e)})
+            return False
+
+    def _offload_done(self, agent, task, future, started):
+        try:
+            agent.complete_offload(task, future.result())
+        except Exception as e:
+            logging.error(f"Error in offloaded task by {agent.agent_id}: {e}")
+            agent.report({'agent': agent.agent_id, 'error': str(e)})
+        finally:
+            self._task_done(agent, time.perf_counter() - started)
+
+    def _task_done(self, agent, elapsed):
+        self.pending.release()
+        with self.lock:
+            self.in_flight -= 1
+            slot = self.slots[agent.agent_id]
+            slot.completed += 1
+            if slot.latency is None:
+                slot.latency = elapsed
+            else:
+                slot.latency += self.latency_alpha * (elapsed - slot.latency)
+            if slot.backlog:
+                task = slot.backlog.popleft()
+            else:
+                task = self._steal_locked(agent) if self.work_stealing and not slot.forgotten else None
+                if task is None:
+                    slot.running -= 1
+                    self._remove_if_idle_locked(agent.agent_id, slot)
+                    return
+                slot.stolen += 1
+        self._start(agent, task)
+
+    def _steal_locked(self, thief):
+        victims = [self.slots[agent_id] for agent_id in self.groups.get(type(thief), ())
+                   if agent_id != thief.agent_id and agent_id in self.slots]
+        for victim in sorted(victims, key=lambda slot: len(slot.backlog), reverse=True):
+            if not victim.backlog:
+                break
+            if getattr(thief, 'can_steal', thief.can_handle)(victim.backlog[-1]):
+                return victim.backlog.pop()
+        return None
+
+    def queue_depth(self, agent_id):
+        with self.lock:
+            slot = self.slots.get(agent_id)
+            return (slot.running + len(slot.backlog)) if slot else 0
+
+    def expected_wait(self, agent):
+        # Seconds a new task for agent would wait and run: (outstanding + 1) * EWMA service time
+        slot = self.slots.get(agent.agent_id)
+        if slot is None:
+            return self.default_latency
+        latency = slot.latency if slot.latency is not None else self.default_latency
+        return (slot.running + len(slot.backlog) + 1) * latency / slot.limit
+
+    def stats(self, agent_id=None):
+        # Queue depth, throughput and latency per agent, for tuning and dashboards
+        with self.lock:
+            slots = self.slots.items() if agent_id is None else [(agent_id, self.slots[agent_id])] if agent_id in self.slots else []
+            return {slot_id: {'running': slot.running, 'backlog': len(slot.backlog), 'completed': slot.completed,
+                              'stolen': slot.stolen, 'latency': slot.latency} for slot_id, slot in slots}
+
+    def forget_agent(self, agent_id):
+        # Removes the agent's slot now if idle, otherwise when its running and backlogged tasks finish
+        with self.lock:
+            slot = self.slots.get(agent_id)
+            if slot is not None:
+                slot.forgotten = True
+                self._remove_if_idle_locked(agent_id, slot)
+
+    def _remove_if_idle_locked(self, agent_id, slot):
+        if slot.forgotten and not slot.running and not slot.backlog and self.slots.get(agent_id) is slot:
+            del self.slots[agent_id]
+            self.groups.get(type(slot.agent), set()).discard(agent_id)
+
+    def shutdown(self, wait=True):
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown(wait=wait)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=wait)
+        logging.info("AgentExecutor shut down")
@@ -1,37 +1,108 @@
-from omnipong.agents.curiosity_engine import CuriosityEngine
-from omnipong.agents.problem_solver import ProblemSolver
-from omnipong.agents.mr_meeseeks import MrMeeseeks
-from omnipong.agents.fog_node_agent import FogNodeAgent
-from omnipong.agents.edge_node_agent import EdgeNodeAgent
+import importlib
 import logging
-
-# Rest of the code remains unchanged
-
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def create_agent(agent_type, agent_id, task=None):
-    try:
-        if agent_type == 'CuriosityEngine':
-            agent = CuriosityEngine(agent_id)
-        elif agent_type == 'ProblemSolver':
-            agent = ProblemSolver(agent_id)
-        elif agent_type == 'MrMeeseeks':
-            agent = MrMeeseeks(agent_id, task)
-        elif agent_type == 'FogNodeAgent':
-            agent = FogNodeAgent(agent_id)
-        elif agent_type == 'EdgeNodeAgent':
-            agent = EdgeNodeAgent(agent_id)
+# Agent type name -> class, or a 'module:Class' path imported on first use
+AGENT_TYPES = {}
+TASK_AGENT_TYPES = set()  # Types whose constructor takes (agent_id, task)
+ENTRY_POINT_GROUP = 'omnipong.agents'
+
+def register_agent_type(name, target=None, takes_task=False):
+    # register_agent_type('Name', 'package.module:Class'), or @register_agent_type('Name') on a class
+    def register(cls_or_path):
+        AGENT_TYPES[name] = cls_or_path
+        if takes_task:
+            TASK_AGENT_TYPES.add(name)
         else:
-            raise ValueError(f"Unknown agent type: {agent_type}")
+            TASK_AGENT_TYPES.discard(name)
+        return cls_or_path
+    return register(target) if target is not None else register
+
+def _load_entry_point(agent_type):
+    try:
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            if entry_point.name == agent_type:
+                return register_agent_type(agent_type, entry_point.value)
+    except Exception as e:
+        logging.error(f"Error reading '{ENTRY_POINT_GROUP}' entry points: {e}")
+    return None
+
+def get_agent_class(agent_type):
+    target = AGENT_TYPES.get(agent_type) or _load_entry_point(agent_type)
+    if target is None:
+        raise ValueError(f"Unknown agent type: {agent_type}")
+    if isinstance(target, str):
+        module_name, class_name = target.split(':')
+        target = getattr(importlib.import_module(module_name), class_name)
+        AGENT_TYPES[agent_type] = target
+    return target
+
+register_agent_type('CuriosityEngine', 'agents.curiosity_engine:CuriosityEngine')
+register_agent_type('ProblemSolver', 'agents.problem_solver:ProblemSolver')
+register_agent_type('MrMeeseeks', 'agents.mr_meeseeks:MrMeeseeks', takes_task=True)
+register_agent_type('FogNodeAgent', 'agents.fog_node_agent:FogNodeAgent')
+register_agent_type('EdgeNodeAgent', 'agents.edge_node_agent:EdgeNodeAgent')
+
+# Warm pool of idle agents for short-lived types. Only classes with poolable = True
+# are recycled; they must implement reset(agent_id, task) to look freshly built.
+class AgentPool:
+    def __init__(self, max_idle=32):
+        self.max_idle = max_idle  # Per agent type
+        self.idle = {}  # agent_type -> list of idle agents
+        self.lock = threading.Lock()
 
+    def acquire(self, agent_type, agent_id, task=None):
+        with self.lock:
+            idle = self.idle.get(agent_type)
+            agent = idle.pop() if idle else None
+        if agent is not None:
+            agent.reset(agent_id, task)
+        return agent
+
+    def release(self, agent_type, agent):
+        if not getattr(agent, 'poolable', False):
+            return False
+        with self.lock:
+            idle = self.idle.setdefault(agent_type, [])
+            if len(idle) >= self.max_idle:
+                return False
+            idle.append(agent)
+        return True
+
+    def prewarm(self, agent_type, count):
+        for i in range(count):
+            if not self.release(agent_type, _construct(agent_type, f"{agent_type}_pooled_{i}")):
+                break
+
+    def size(self, agent_type):
+        with self.lock:
+            return len(self.idle.get(agent_type, ()))
+
+agent_pool = AgentPool()
+
+def _construct(agent_type, agent_id, task=None):
+    agent_class = get_agent_class(agent_type)
+    return agent_class(agent_id, task) if agent_type in TASK_AGENT_TYPES else agent_class(agent_id)
+
+def create_agent(agent_type, agent_id, task=None):
+    try:
+        agent = agent_pool.acquire(agent_type, agent_id, task)
+        if agent is None:
+            agent = _construct(agent_type, agent_id, task)
         logging.info(f"Created agent: {agent_type} with ID: {agent_id}")
         return agent
     except Exception as e:
         logging.error(f"Error creating agent: {e}")
         raise
 
+def release_agent(agent_type, agent):
+    # Returns a finished agent to the warm pool; callers must have unregistered it first
+    return agent_pool.release(agent_type, agent)
+
 # Example usage
 if __name__ == '__main__':
     agent = create_agent('CuriosityEngine', 'CuriosityEngine_1')
@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+from utils.codec import encode, decode, dtype_from_descr
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_ALIGNMENT = 64  # Segment offsets stay aligned for any dtype, so arrays map in place
+
+# Binary checkpoints of agent state, one directory per agent:
+#   manifest.bin        utils.codec map of the agent's metadata (scalars, small dicts)
+#                       and, per array, its dtype, shape and chunk locations
+#   <generation>.seg    raw array bytes, chunk_bytes per chunk, 64-byte aligned
+# Agents provide checkpoint_state() -> (metadata, arrays) and restore_checkpoint().
+# Every array is split into chunks and each chunk hashed; a delta checkpoint writes
+# only the chunks whose hash changed since the previous checkpoint into a new segment
+# and points the manifest at older segments for the rest, and every full_every-th
+# checkpoint writes everything again so segments no longer referenced are deleted.
+# save() hashes and copies the changed chunks on the calling thread (call it from the
+# agent's own thread or while the agent is idle) and leaves writing and fsync to a
+# background pool. Arrays stored contiguously in one segment are restored as
+# copy-on-write memory maps, so restoring reads no data until it is touched.
+class Checkpointer:
+    def __init__(self, path, full_every=10, chunk_bytes=1 << 16, max_workers=4):
+        self.path = path
+        self.full_every = full_every
+        self.chunk_bytes = max(chunk_bytes // _ALIGNMENT, 1) * _ALIGNMENT
+        self.max_workers = max_workers
+        self.manifests = {}  # agent_id -> manifest of its latest capture, written or not
+        self.pending = {}  # agent_id -> future of its latest write; writes per agent run in order
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers, thread_name_prefix='checkpoint')
+        os.makedirs(path, exist_ok=True)
+        logging.info(f"Checkpointer initialized at {path}")
+
+    def _directory(self, agent_id):
+        return os.path.join(self.path, re.sub(r'[^\w.-]', '_', str(agent_id)))
+
+    def _read_manifest(self, agent_id):
+        filename = os.path.join(self._directory(agent_id), 'manifest.bin')
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'rb') as file:
+            return decode(file.read())
+
+    def _capture(self, agent):
+        metadata, arrays = agent.checkpoint_state()
+        with self.lock:
+            previous = self.manifests.get(agent.agent_id)
+        if previous is None:
+            previous = self._read_manifest(agent.agent_id)
+        full = previous is None or previous['deltas'] + 1 >= self.full_every
+        layout, writes, changed = {}, [], 0
+        for name, array in arrays.items():
+            array = np.require(array, requirements='C')  # Unlike ascontiguousarray, keeps 0-d arrays 0-d
+            descr = np.lib.format.dtype_to_descr(array.dtype)
+            raw = array.reshape(-1).view(np.uint8)
+            old = None if full or previous is None else previous['arrays'].get(name)
+            if old is not None and (old['dtype'] != descr or tuple(old['shape']) != array.shape):
+                old = None
+            chunks = []
+            for index, start in enumerate(range(0, raw.size, self.chunk_bytes)):
+                piece = raw[start:start + self.chunk_bytes]
+                digest = hashlib.sha1(piece).digest()  # Only detects changes; sha1 hashes about twice as fast as blake2b
+                if old is not None and old['chunks'][index][3] == digest:
+                    chunks.append(old['chunks'][index])
+                    continue
+                chunk = [None, None, piece.size, digest]  # Segment and offset filled in by the write
+                chunks.append(chunk)
+                writes.append((chunk, piece.copy()))
+                changed += piece.size
+            layout[name] = {'dtype': descr, 'shape': list(array.shape), 'chunks': chunks}
+        manifest = {'agent_id': agent.agent_id, 'generation': previous['generation'] + 1 if previous else 1,
+                    'deltas': 0 if full else previous['deltas'] + 1, 'metadata': metadata, 'arrays': layout}
+        return manifest, writes, changed
+
+    def save(self, agent, background=True):
+        # Returns the future of the write; with background=False waits for it first
+        manifest, writes, changed = self._capture(agent)
+        with self.lock:
+            self.manifests[agent.agent_id] = manifest
+            previous = self.pending.get(agent.agent_id)
+            future = self.pending[agent.agent_id] = self.pool.submit(self._write, manifest, writes, changed, previous)
+        if not background:
+            future.result()
+        return future
+
+    def save_all(self, agents, background=True):
+        futures = []
+        for agent in agents:
+            try:
+                futures.append(self.save(agent, background=True))
+            except Exception as e:
+                logging.error(f"Error capturing checkpoint for {agent.agent_id}: {e}")
+        if not background:
+            wait(futures)
+        return futures
+
+    def _write(self, manifest, writes, changed, previous):
+        agent_id = manifest['agent_id']
+        if previous is not None:
+            wait([previous])
+        try:
+            directory = self._directory(agent_id)
+            os.makedirs(directory, exist_ok=True)
+            segment = f"{manifest['generation']:010d}.seg"
+            if writes:
+                offset = 0
+                with open(os.path.join(directory, segment), 'wb') as file:
+                    for chunk, data in writes:
+                        file.write(data.tobytes())
+                        chunk[0], chunk[1] = segment, offset
+                        padding = -data.size % _ALIGNMENT
+                        file.write(b'\0' * padding)
+                        offset += data.size + padding
+                    file.flush()
+                    os.fsync(file.fileno())
+            if any(chunk[0] is None for entry in manifest['arrays'].values() for chunk in entry['chunks']):
+                raise RuntimeError("an earlier checkpoint of this agent failed to write")
+            temporary = os.path.join(directory, 'manifest.bin.tmp')
+            with open(temporary, 'wb') as file:
+                file.write(encode(manifest))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, os.path.join(directory, 'manifest.bin'))
+            referenced = {chunk[0] for entry in manifest['arrays'].values() for chunk in entry['chunks']}
+            for filename in os.listdir(directory):
+                if filename.endswith('.seg') and filename not in referenced:
+                    os.remove(os.path.join(directory, filename))
+            kind = 'Delta' if manifest['deltas'] else 'Full'
+            logging.info(f"{kind} checkpoint {manifest['generation']} of {agent_id} written ({changed} bytes of arrays)")
+            return manifest['generation']
+        except Exception as e:
+            logging.error(f"Error writing checkpoint for {agent_id}: {e}")
+            with self.lock:
+                if self.manifests.get(agent_id) is manifest:
+                    del self.manifests[agent_id]  # The next save starts from the last manifest on disk
+            raise
+
+    def load(self, agent_id):
+        # (metadata, arrays) of the latest written checkpoint, or None
+        manifest = self._read_manifest(agent_id)
+        if manifest is None:
+            return None
+        directory = self._directory(agent_id)
+        segments = {}  # One copy-on-write map per segment file, shared by the arrays in it
+
+        def segment_map(segment):
+            if segment not in segments:
+                segments[segment] = np.memmap(os.path.join(directory, segment), dtype=np.uint8, mode='c')
+            return segments[segment]
+
+        arrays = {}
+        for name, entry in manifest['arrays'].items():
+            dtype, shape, chunks = dtype_from_descr(entry['dtype']), tuple(entry['shape']), entry['chunks']
+            if not chunks:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            contiguous = all(chunk[0] == chunks[0][0] and chunk[1] == chunks[0][1] + index * self.chunk_bytes
+                             for index, chunk in enumerate(chunks))
+            if contiguous:
+                offset = chunks[0][1]
+                size = sum(chunk[2] for chunk in chunks)
+                arrays[name] = segment_map(chunks[0][0])[offset:offset + size].view(dtype).reshape(shape)
+                continue
+            array = np.empty(shape, dtype=dtype)
+            raw = array.reshape(-1).view(np.uint8)
+            position = 0
+            for segment, offset, length, _ in chunks:
+                raw[position:position + length] = segment_map(segment)[offset:offset + length]
+                position += length
+            arrays[name] = array
+        return manifest['metadata'], arrays
+
+    def restore(self, agent):
+        try:
+            checkpoint = self.load(agent.agent_id)
+            if checkpoint is None:
+                return False
+            agent.restore_checkpoint(*checkpoint)
+            logging.info(f"{agent.agent_id} restored from checkpoint")
+            return True
+        except Exception as e:
+            logging.error(f"Error restoring checkpoint for {agent.agent_id}: {e}")
+            return False
+
+    def restore_all(self, agents, max_workers=None):
+        # Restores agents in parallel; returns how many had a checkpoint
+        with ThreadPoolExecutor(max_workers or self.max_workers) as pool:
+            return sum(pool.map(self.restore, list(agents)))
+
+    def wait(self):
+        with self.lock:
+            futures = list(self.pending.values())
+        wait(futures)
+
+    def close(self):
+        self.wait()
+        self.pool.shutdown(wait=True)
+
+# Example usage
+if __name__ == '__main__':
+    from learning_agent_base import LearningAgentBase
+
+    checkpointer = Checkpointer('data/checkpoints')
+    agent = LearningAgentBase('LearningAgent_1', state_size=4, action_size=2)
+    for _ in range(64):
+        agent.remember(np.random.rand(4), 0, 1.0, np.random.rand(4), False)
+    agent.replay(32)
+    checkpointer.save(agent, background=False)
+    restored = LearningAgentBase('LearningAgent_1', state_size=4, action_size=2)
+    checkpointer.restore(restored)
+    logging.info(f"Restored epsilon {restored.epsilon:.3f} and {len(restored.memory)} transitions")
+    checkpointer.close()
@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import random
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def inbox(node_id):
+    return f"cluster.{node_id}"
+
+def _version(entry):
+    return entry.get('incarnation', 0), entry['heartbeat']
+
+# Stands in for an agent registered on another core: the core's executor calls
+# receive_task as for any agent, and the task is forwarded to the owning node.
+class RemoteAgent:
+    max_concurrency = 64  # Forwarding is just a publish
+    execution_mode = 'thread'
+    tier = None
+
+    def __init__(self, cluster, node_id, agent_id):
+        self.cluster = cluster
+        self.node_id = node_id
+        self.target_id = agent_id
+        self.agent_id = f"{node_id}/{agent_id}"
+
+    def can_handle(self, task):
+        return True
+
+    def can_steal(self, task):
+        # Stand-ins for different nodes and agents share a class; a task forwarded to one was routed there on purpose
+        return False
+
+    def receive_task(self, task):
+        self.cluster.forward(self.node_id, self.target_id, task)
+
+    def report(self, data):
+        self.cluster.core.receive_report(self.agent_id, data)
+
+# Joins an OmnipongCore to a cluster of cores in other processes, each owning a
+# shard of the agents. Nodes talk through per-node inbox queues on the core's
+# transport (which needs a remote side: create_transport(amqp_host=...) or a broker).
+# Every gossip_interval each node bumps its heartbeat and sends its whole membership
+# table - node -> heartbeat, load and {agent_id: task types} - to fanout random peers,
+# keeping the newest entry per node, so registrations reach every node in
+# O(log nodes) rounds and nodes that stop gossiping drop out after member_timeout.
+# Entries are ordered by (incarnation, heartbeat), the incarnation being the node's
+# start time, so a node restarted under the same id replaces its old entry at once.
+# Tasks with an 'affinity' key go to the node picked by rendezvous hashing the key
+# over nodes that handle the task type; other tasks stay local when possible and
+# otherwise go to the least loaded node that can take them.
+class ClusterNode:
+    def __init__(self, core, node_id, seeds=(), gossip_interval=0.5, fanout=2, member_timeout=5.0):
+        self.core = core
+        self.node_id = node_id
+        self.transport = core.transport
+        self.seeds = [seed for seed in seeds if seed != node_id]
+        self.gossip_interval = gossip_interval
+        self.fanout = fanout
+        self.member_timeout = member_timeout
+        self.incarnation = time.time_ns()  # Newer on every start, so peers prefer it over a previous run's entry
+        self.members = {node_id: {'incarnation': self.incarnation, 'heartbeat': 0, 'load': 0, 'agents': {}}}
+        self.last_seen = {}  # node_id -> monotonic time its heartbeat last advanced
+        self.handlers = {}  # task type -> tuple of (node_id, agent_id) across the cluster
+        self.remote_agents = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self._bind(node_id)
+        for seed in self.seeds:
+            self._bind(seed)
+        core.cluster = self
+        logging.info(f"ClusterNode {node_id} initialized with seeds {self.seeds}")
+
+    def _bind(self, node_id):
+        if hasattr(self.transport, 'bind_remote'):
+            self.transport.bind_remote(inbox(node_id))
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def _run(self):
+        next_gossip = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                now = time.monotonic()
+                if now >= next_gossip:
+                    self.gossip()
+                    next_gossip = now + self.gossip_interval
+                message = self.transport.receive(inbox(self.node_id), timeout=max(next_gossip - time.monotonic(), 0.001))
+                if message is not None:
+                    self._handle(message)
+            except Exception as e:
+                logging.error(f"Error in cluster node {self.node_id}: {e}")
+
+    def _handle(self, message):
+        kind = message.get('kind')
+        if kind == 'gossip':
+            self.merge(message['members'])
+        elif kind == 'task':
+            agent = self.core.agents.get(message['agent_id'])
+            if agent is not None:
+                self.core.executor.submit(agent, message['task'])
+            else:  # Unregistered since the sender's last gossip: let the local dispatcher try
+                self.core.send_task(dict(message['task'], cluster_forwarded=True))
+
+    def _local_entry(self):
+        agent_types = self.core.dispatcher.agent_types
+        return {agent_id: list(task_types) for agent_id, task_types in list(agent_types.items()) if task_types}
+
+    def gossip(self):
+        with self.lock:
+            own = self.members[self.node_id]
+            agents = self._local_entry()
+            changed = agents != own['agents']
+            load = len(self.core.task_queue) + getattr(self.core.executor, 'in_flight', 0)
+            self.members[self.node_id] = {'incarnation': self.incarnation, 'heartbeat': own['heartbeat'] + 1,
+                                          'load': load, 'agents': agents}
+            if changed:
+                self._rebuild_handlers()
+            peers = [node_id for node_id in self.live_members() if node_id != self.node_id]
+            members = dict(self.members)
+        targets = set(random.sample(peers, min(self.fanout, len(peers))))
+        if len(targets) < self.fanout:
+            targets.update(random.sample(self.seeds, min(self.fanout - len(targets), len(self.seeds))))
+        for node_id in targets:
+            self.transport.send(inbox(node_id), {'kind': 'gossip', 'from': self.node_id, 'members': members})
+
+    def merge(self, members):
+        now = time.monotonic()
+        with self.lock:
+            changed = False
+            for node_id, entry in members.items():
+                if node_id == self.node_id:
+                    continue
+                current = self.members.get(node_id)
+                if current is None or _version(entry) > _version(current):
+                    if current is None:
+                        self._bind(node_id)
+                        logging.info(f"Cluster node {self.node_id} discovered {node_id}")
+                    changed = changed or current is None or entry['agents'] != current['agents']
+                    self.members[node_id] = entry
+                    self.last_seen[node_id] = now
+            if changed:
+                self._rebuild_handlers()
+
+    def live_members(self):
+        deadline = time.monotonic() - self.member_timeout
+        return [node_id for node_id in self.members
+                if node_id == self.node_id or self.last_seen.get(node_id, 0) >= deadline]
+
+    def _rebuild_handlers(self):
+        handlers = {}
+        for node_id, entry in self.members.items():
+            for agent_id, task_types in entry['agents'].items():
+                for task_type in task_types:
+                    handlers.setdefault(task_type, []).append((node_id, agent_id))
+        self.handlers = {task_type: tuple(sorted(owners)) for task_type, owners in handlers.items()}
+
+    def route(self, task):
+        # Returns (node_id, agent_id) of the agent that should run task, or None
+        owners = self.handlers.get(task.get('type'), ())
+        if not owners:
+            return None
+        live = set(self.live_members())
+        owners = [owner for owner in owners if owner[0] in live]
+        if not owners:
+            return None
+        affinity = task.get('affinity')
+        if affinity is not None:
+            nodes = sorted({node_id for node_id, _ in owners})
+            chosen = max(nodes, key=lambda node_id: hashlib.blake2b(f"{affinity}|{node_id}".encode(), digest_size=8).digest())
+            return next(owner for owner in owners if owner[0] == chosen)
+        local = [owner for owner in owners if owner[0] == self.node_id]
+        if local:
+            return local[0]
+        return min(owners, key=lambda owner: self.members[owner[0]]['load'])
+
+    def select_agent(self, task):
+        owner = self.route(task)
+        if owner is None:
+            return None
+        node_id, agent_id = owner
+        if node_id == self.node_id:
+            return self.core.agents.get(agent_id)
+        agent = self.remote_agents.get(owner)
+        if agent is None:
+            agent = self.remote_agents[owner] = RemoteAgent(self, node_id, agent_id)
+        return agent
+
+    def forward(self, node_id, agent_id, task):
+        self.transport.send(inbox(node_id), {'kind': 'task', 'from': self.node_id, 'agent_id': agent_id, 'task': task})
+
+def create_cluster_core(node_id, seeds=(), amqp_host=None, broker=None, **kwargs):
+    # An OmnipongCore whose transport reaches the other nodes, with its ClusterNode started
+    from omnipong_core import OmnipongCore
+    from utils.transport import create_transport
+    core = OmnipongCore(transport=create_transport(amqp_host=amqp_host, broker=broker))
+    node = ClusterNode(core, node_id, seeds, **kwargs)
+    node.start()
+    return core, node
+
+# Example usage
+if __name__ == '__main__':
+    from agent_base import AgentBase
+    from utils.inprocess_broker import InProcessBroker
+
+    class EchoAgent(AgentBase):
+        handled_task_types = ('echo',)
+
+        def receive_task(self, task):
+            self.report({'echoed': task['message']})
+
+    broker = InProcessBroker()  # Both nodes in this process for the example; see serve_broker for separate processes
+    core_a, node_a = create_cluster_core('node_a', seeds=['node_b'], broker=broker, gossip_interval=0.1)
+    core_b, node_b = create_cluster_core('node_b', seeds=['node_a'], broker=broker, gossip_interval=0.1)
+    core_b.register_agent(EchoAgent('EchoAgent_1'))
+    time.sleep(0.5)
+    core_a.send_task({'type': 'echo', 'message': 'Hello, World!'})
+    core_a.distribute_tasks()
+    time.sleep(0.5)
+    logging.info(f"node_b knowledge base: {core_b.knowledge_base}")
+    for node, core in ((node_a, core_a), (node_b, core_b)):
+        node.stop()
+        core.shutdown()
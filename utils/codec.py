@@ -0,0 +1,76 @@
+import logging
+import struct
+import msgpack
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Binary wire format for tasks, reports and messages: msgpack for the dict/list/scalar
+# structure, plus an extension type carrying NumPy arrays as their raw buffer behind a
+# small [dtype descr, shape] header. Decoded arrays are read-only views of the message
+# bytes, so large payloads are neither copied nor converted element by element.
+EXT_NDARRAY = 1
+_HEADER_LENGTH = struct.Struct('<I')
+
+# Fixed-layout record for numeric sensor payloads; a batch of readings is one
+# structured array, i.e. 16 packed bytes per reading on the wire.
+SENSOR_READING_DTYPE = np.dtype([('timestamp', '<f8'), ('value', '<f8')])
+
+def pack_readings(timestamps, values):
+    readings = np.empty(len(values), dtype=SENSOR_READING_DTYPE)
+    readings['timestamp'] = timestamps
+    readings['value'] = values
+    return readings
+
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            raise TypeError(f"Cannot encode object array of shape {obj.shape}")
+        header = msgpack.packb([np.lib.format.dtype_to_descr(obj.dtype), obj.shape])
+        return msgpack.ExtType(EXT_NDARRAY, _HEADER_LENGTH.pack(len(header)) + header
+                               + np.ascontiguousarray(obj).tobytes())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Cannot encode object of type {type(obj).__name__}")
+
+def _descr(descr):
+    # msgpack turns the (name, format[, shape]) tuples of a structured descr into lists;
+    # name may be a (title, name) pair, format a nested descr and shape a subarray shape
+    if not isinstance(descr, list):
+        return descr
+    fields = []
+    for name, *rest in descr:
+        field = [tuple(name) if isinstance(name, list) else name, _descr(rest[0])]
+        if len(rest) > 1:
+            field.append(tuple(rest[1]) if isinstance(rest[1], list) else rest[1])
+        fields.append(tuple(field))
+    return fields
+
+def dtype_from_descr(descr):
+    # Inverse of np.lib.format.dtype_to_descr for a descr that went through msgpack
+    return np.lib.format.descr_to_dtype(_descr(descr))
+
+def _ext_hook(code, data):
+    if code == EXT_NDARRAY:
+        (length,) = _HEADER_LENGTH.unpack_from(data)
+        descr, shape = msgpack.unpackb(data[4:4 + length])
+        dtype = dtype_from_descr(descr)
+        return np.frombuffer(data, dtype=dtype, offset=4 + length).reshape(shape)
+    return msgpack.ExtType(code, data)
+
+def encode(obj):
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+def decode(body):
+    return msgpack.unpackb(body, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+# Example usage
+if __name__ == '__main__':
+    report = {'agent': 'EdgeNodeAgent_1', 'readings': pack_readings([1.0, 2.0], [42.0, 43.5]),
+              'features': np.random.rand(4, 3).astype(np.float32)}
+    body = encode(report)
+    decoded = decode(body)
+    logging.info(f"Encoded report in {len(body)} bytes; readings: {decoded['readings']}")
@@ -1,36 +1,234 @@
-import pika
+import asyncio
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from utils.codec import encode
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class _PooledChannel:
+    def __init__(self, connection):
+        self.connection = connection
+        self.channel = connection.channel()
+        self.channel.confirm_delivery()  # basic_publish returns once the broker has confirmed
+        self._tx_channel = None
+
+    @property
+    def tx_channel(self):
+        # Separate channel for batches: a channel can't be in confirm and tx mode at once
+        if self._tx_channel is None:
+            self._tx_channel = self.connection.channel()
+            self._tx_channel.tx_select()
+        return self._tx_channel
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception as e:
+            logging.error(f"Error closing pooled connection: {e}")
+
+# pika connections are not thread-safe, so each checkout gets a connection and
+# channel to itself. Connections are opened on demand up to size and reused after.
+class ChannelPool:
+    def __init__(self, connect, size=4):
+        self.connect = connect
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def channel(self):
+        entry = self._acquire()
+        try:
+            yield entry
+        except Exception:
+            self._discard(entry)  # The connection may be broken; don't hand it out again
+            raise
+        else:
+            self.idle.put(entry)
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+        if not can_create:
+            return self.idle.get()
+        try:
+            return _PooledChannel(self.connect())
+        except Exception:
+            with self.lock:
+                self.created -= 1
+            raise
+
+    def _discard(self, entry):
+        entry.close()
+        with self.lock:
+            self.created -= 1
+
+    def close(self):
+        while True:
+            try:
+                entry = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(entry)
+
 class Communication:
-    def __init__(self, host='localhost'):
+    def __init__(self, host='localhost', pool_size=4, broker=None):
         self.host = host
-        self.connection = pika.BlockingConnection(pika.ConnectionParameters(host))
-        self.channel = self.connection.channel()
-        logging.info("Communication channel established")
+        self.broker = broker  # e.g. utils.inprocess_broker.InProcessBroker; None means RabbitMQ at host
+        self.pool = ChannelPool(self._connect, pool_size)
+        self.declared_queues = set()  # Declaring is idempotent broker-side, so once per process is enough
+        self.declare_lock = threading.Lock()
+        self.consumers = []
+        logging.info("Communication initialized; connections open on first use")
+
+    def _connect(self):
+        if self.broker is not None:
+            return self.broker.connect()
+        import pika
+        return pika.BlockingConnection(pika.ConnectionParameters(self.host))
+
+    def _declare(self, channel, queue):
+        if queue in self.declared_queues:
+            return
+        channel.queue_declare(queue=queue)
+        with self.declare_lock:
+            self.declared_queues.add(queue)
+
+    def _body(self, message):
+        # bytes and str go out as they are; anything else in the utils.codec binary format
+        return message if isinstance(message, (bytes, str)) else encode(message)
 
     def send_message(self, queue, message):
         try:
-            self.channel.queue_declare(queue=queue)
-            self.channel.basic_publish(exchange='', routing_key=queue, body=message)
-            logging.info(f"Message sent to queue {queue}: {message}")
+            with self.pool.channel() as pooled:
+                self._declare(pooled.channel, queue)
+                pooled.channel.basic_publish(exchange='', routing_key=queue, body=self._body(message))
+            logging.debug(f"Message sent to queue {queue}: {message}")
         except Exception as e:
             logging.error(f"Error sending message to queue {queue}: {e}")
 
+    def send_messages(self, queue, messages, batch_size=500):
+        # Publishes in AMQP transactions: one broker round trip per batch instead of one confirm per message
+        sent = 0
+        try:
+            with self.pool.channel() as pooled:
+                self._declare(pooled.channel, queue)
+                channel = pooled.tx_channel
+                batch = 0
+                for message in messages:
+                    channel.basic_publish(exchange='', routing_key=queue, body=self._body(message))
+                    batch += 1
+                    if batch == batch_size:
+                        channel.tx_commit()
+                        sent += batch
+                        batch = 0
+                if batch:
+                    channel.tx_commit()
+                    sent += batch
+            logging.info(f"{sent} messages sent to queue {queue}")
+        except Exception as e:
+            logging.error(f"Error sending messages to queue {queue} after {sent} were committed: {e}")
+        return sent
+
+    def get_message(self, queue):
+        # Non-blocking: the next message body from queue, or None if it is empty
+        try:
+            with self.pool.channel() as pooled:
+                self._declare(pooled.channel, queue)
+                method, properties, body = pooled.channel.basic_get(queue, auto_ack=True)
+            return body if method is not None else None
+        except Exception as e:
+            logging.error(f"Error getting message from queue {queue}: {e}")
+            return None
+
     def receive_messages(self, queue, callback):
+        # Blocks the calling thread until stop_consuming(); callback(ch, method, properties, body) as with pika
         try:
-            self.channel.queue_declare(queue=queue)
-            self.channel.basic_consume(queue=queue, on_message_callback=callback, auto_ack=True)
+            connection = self._connect()
+            channel = connection.channel()
+            channel.queue_declare(queue=queue)
+            channel.basic_consume(queue=queue, on_message_callback=callback, auto_ack=True)
+            self.consumers.append((connection, channel))
             logging.info(f"Waiting for messages from queue {queue}")
-            self.channel.start_consuming()
+            channel.start_consuming()
         except Exception as e:
             logging.error(f"Error receiving messages from queue {queue}: {e}")
 
+    def stop_consuming(self):
+        for connection, channel in self.consumers:
+            try:
+                if hasattr(connection, 'add_callback_threadsafe'):
+                    connection.add_callback_threadsafe(channel.stop_consuming)
+                else:
+                    channel.stop_consuming()
+            except Exception as e:
+                logging.error(f"Error stopping consumer: {e}")
+
+    async def consume(self, queue, handler, prefetch_count=10, stop_event=None, inactivity_timeout=0.05):
+        # asyncio consumer: at most prefetch_count unacked messages; each is acked once handler
+        # (a coroutine function or plain callable taking (body, properties)) returns, and nacked
+        # if it raises, requeued once if it had not been redelivered already.
+        loop = asyncio.get_running_loop()
+        io = ThreadPoolExecutor(max_workers=1)  # Every call on this consumer's channel stays on one thread
+        stop_event = stop_event or asyncio.Event()
+        in_flight = set()
+        connection = None
+        try:
+            connection = await loop.run_in_executor(io, self._connect)
+            channel = await loop.run_in_executor(io, connection.channel)
+            await loop.run_in_executor(io, lambda: channel.basic_qos(prefetch_count=prefetch_count))
+            await loop.run_in_executor(io, lambda: channel.queue_declare(queue=queue))
+            messages = channel.consume(queue, auto_ack=False, inactivity_timeout=inactivity_timeout)
+            logging.info(f"Consuming from queue {queue} with prefetch {prefetch_count}")
+            while not stop_event.is_set():
+                delivery = await loop.run_in_executor(io, next, messages, None)
+                if delivery is None:  # Generator ended: channel closed or cancelled
+                    break
+                method, properties, body = delivery
+                if method is None:
+                    continue
+                task = asyncio.ensure_future(self._handle(connection, channel, method, properties, body, handler))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            await loop.run_in_executor(io, channel.cancel)
+        except Exception as e:
+            logging.error(f"Error consuming from queue {queue}: {e}")
+        finally:
+            if connection is not None:
+                await loop.run_in_executor(io, connection.close)
+            io.shutdown(wait=False)
+
+    async def _handle(self, connection, channel, method, properties, body, handler):
+        # Acks go through add_callback_threadsafe so they are sent from inside the blocked
+        # consume() call on the I/O thread instead of queueing behind it
+        try:
+            result = handler(body, properties)
+            if asyncio.iscoroutine(result):
+                await result
+            connection.add_callback_threadsafe(partial(channel.basic_ack, delivery_tag=method.delivery_tag))
+        except Exception as e:
+            logging.error(f"Error handling message {method.delivery_tag}: {e}")
+            connection.add_callback_threadsafe(
+                partial(channel.basic_nack, delivery_tag=method.delivery_tag, requeue=not method.redelivered))
+
     def close_connection(self):
         try:
-            self.connection.close()
+            self.stop_consuming()
+            self.pool.close()
             logging.info("Communication channel closed")
         except Exception as e:
             logging.error(f"Error closing communication channel: {e}")
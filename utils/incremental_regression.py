@@ -0,0 +1,105 @@
+import logging
+import os
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Least-squares linear regression updated one batch at a time. Only the sufficient
+# statistics X'X and X'y are kept (with an intercept column), so partial_fit costs
+# O(batch * features^2) plus a features^3 solve, independent of how many rows came
+# before, and the coefficients match a full refit on all rows seen. forgetting < 1
+# discounts older batches, as in recursive least squares with a forgetting factor.
+# A batch's statistics can be computed apart from the model (batch_statistics, e.g. in
+# a worker process) and folded in with merge().
+def _design(X):
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(-1, 1)
+    return np.hstack([X, np.ones((len(X), 1))])
+
+def batch_statistics(X, y):
+    # (X'X, X'y, rows, single_output) of one batch, intercept column included
+    design = _design(X)
+    y = np.asarray(y, dtype=np.float64)
+    targets = y.reshape(len(y), -1)
+    return design.T @ design, design.T @ targets, len(design), y.ndim == 1
+
+class IncrementalLinearRegression:
+    def __init__(self, forgetting=1.0, ridge=1e-8):
+        self.forgetting = forgetting
+        self.ridge = ridge
+        self.xtx = None
+        self.xty = None
+        self.n_samples = 0
+        self.coef_ = None
+        self.intercept_ = None
+
+    def partial_fit(self, X, y):
+        return self.merge(*batch_statistics(X, y))
+
+    def merge(self, xtx, xty, rows, single_output):
+        if self.xtx is not None and (self.xtx.shape != xtx.shape or self.xty.shape != xty.shape):
+            logging.warning("Regression input shape changed; discarding previous state")
+            self.xtx = None
+        if self.xtx is None:
+            self.xtx = np.zeros_like(xtx)
+            self.xty = np.zeros_like(xty)
+            self.n_samples = 0
+        if self.forgetting != 1.0:
+            self.xtx *= self.forgetting ** rows
+            self.xty *= self.forgetting ** rows
+        self.xtx += xtx
+        self.xty += xty
+        self.n_samples += rows
+        self._solve(single_output=single_output)
+        return self
+
+    def _solve(self, single_output):
+        regularized = self.xtx + self.ridge * np.eye(len(self.xtx))
+        weights = np.linalg.lstsq(regularized, self.xty, rcond=None)[0]  # lstsq: still defined while rank deficient
+        coef, intercept = weights[:-1].T, weights[-1]
+        self.coef_ = coef[0] if single_output else coef
+        self.intercept_ = float(intercept[0]) if single_output else intercept
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+        return X @ self.coef_.T + self.intercept_
+
+    def save(self, filepath):
+        # Written to a temporary file first so a crash mid-save keeps the previous state
+        temporary = f"{filepath}.tmp"
+        with open(temporary, 'wb') as file:
+            np.savez(file, xtx=self.xtx, xty=self.xty, n_samples=self.n_samples,
+                     single_output=np.ndim(self.coef_) == 1, forgetting=self.forgetting)
+        os.replace(temporary, filepath)
+
+    def checkpoint_state(self):
+        # (metadata, arrays) in the form utils.checkpoint stores; no arrays before the first batch
+        metadata = {'n_samples': self.n_samples, 'forgetting': self.forgetting, 'single_output': np.ndim(self.coef_) == 1}
+        return metadata, ({'xtx': self.xtx.copy(), 'xty': self.xty.copy()} if self.xtx is not None else {})
+
+    def restore_checkpoint(self, metadata, arrays):
+        if 'xtx' not in arrays:
+            return
+        self.xtx, self.xty = np.array(arrays['xtx']), np.array(arrays['xty'])
+        self.n_samples = metadata['n_samples']
+        self.forgetting = metadata['forgetting']
+        self._solve(single_output=metadata['single_output'])
+
+    def load(self, filepath):
+        with np.load(filepath) as data:
+            self.xtx, self.xty = data['xtx'], data['xty']
+            self.n_samples = int(data['n_samples'])
+            self.forgetting = float(data['forgetting'])
+            self._solve(single_output=bool(data['single_output']))
+        return self
+
+# Example usage
+if __name__ == '__main__':
+    model = IncrementalLinearRegression()
+    true_coef = np.array([2.0, -1.0, 0.5])
+    for _ in range(10):
+        X = np.random.rand(1000, 3)
+        model.partial_fit(X, X @ true_coef + 3.0 + np.random.normal(0, 0.01, 1000))
+    logging.info(f"Coefficients after {model.n_samples} rows: {model.coef_}, intercept {model.intercept_:.3f}")
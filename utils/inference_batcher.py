@@ -0,0 +1,95 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from utils.model_registry import model_registry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def _freeze(value):
+    # Hashable stand-in for keyword arguments, recursing into dicts, lists and sets
+    if isinstance(value, dict):
+        return tuple(sorted(((repr(k), _freeze(v)) for k, v in value.items()), key=lambda item: item[0]))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return ('set',) + tuple(sorted(repr(v) for v in value))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+# Collects single-input pipeline calls from every agent for up to max_wait seconds
+# (or until max_batch_size requests arrive) and runs them as one batched call.
+# Requests are grouped by their keyword arguments, e.g. zero-shot candidate_labels,
+# since one pipeline call can only take one set. Calling the batcher looks like
+# calling the pipeline on a single input, and returns that input's result.
+class InferenceBatcher:
+    def __init__(self, model_name, max_batch_size=16, max_wait=0.01, registry=None):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait  # Seconds to hold the first request while the batch fills
+        self.registry = registry or model_registry
+        self.requests = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.batched_requests = 0
+
+    def submit(self, inputs, **kwargs):
+        future = Future()
+        self.requests.put((inputs, kwargs, future))
+        if self.worker is None:
+            self._start_worker()
+        return future
+
+    def __call__(self, inputs, **kwargs):
+        return self.submit(inputs, **kwargs).result()
+
+    def _start_worker(self):
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name=f"batcher-{self.model_name}", daemon=True)
+                self.worker.start()
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            groups = {}
+            for inputs, kwargs, future in self._collect():
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(_freeze(kwargs), []).append((inputs, kwargs, future))
+            for group in groups.values():
+                self._run_group(group)
+
+    def _run_group(self, group):
+        try:
+            model = self.registry.get(self.model_name)
+            outputs = model([inputs for inputs, _, _ in group], batch_size=len(group), **group[0][1])
+            for (_, _, future), output in zip(group, outputs):
+                future.set_result(output)
+            self.batches += 1
+            self.batched_requests += len(group)
+        except Exception as e:
+            logging.error(f"Error running {self.model_name} batch of {len(group)}: {e}")
+            for _, _, future in group:
+                future.set_exception(e)
+
+# Shared by every agent in the process
+zero_shot_classifier = InferenceBatcher('zero-shot-classification')
+summarizer = InferenceBatcher('summarization', max_batch_size=8, max_wait=0.02)
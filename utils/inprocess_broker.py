@@ -0,0 +1,249 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque, OrderedDict
+from multiprocessing.managers import BaseManager
+from types import SimpleNamespace
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# In-process stand-in for a RabbitMQ broker. connect() returns an object shaped like
+# pika.BlockingConnection whose channels implement the subset of BlockingChannel
+# that Communication uses (default exchange only): queue_declare, basic_publish,
+# confirm_delivery, tx_select/tx_commit, basic_qos, basic_get, consume, basic_ack,
+# basic_nack, basic_consume/start_consuming. Lets the messaging layer be exercised
+# and benchmarked without a live broker. serve_broker/BrokerClient share one broker
+# between local processes.
+class InProcessBroker:
+    def __init__(self):
+        self.queues = {}  # queue name -> deque of (properties, body, redelivered)
+        self.condition = threading.Condition()
+        self.delivery_tags = itertools.count(1)
+        self.published = 0
+        logging.info("InProcessBroker initialized")
+
+    def connect(self, *args, **kwargs):
+        return InProcessConnection(self)
+
+    def next_delivery_tag(self):
+        return next(self.delivery_tags)
+
+    def declare(self, queue):
+        with self.condition:
+            return len(self.queues.setdefault(queue, deque()))
+
+    def publish(self, queue, properties, body, redelivered=False, front=False):
+        with self.condition:
+            messages = self.queues.get(queue)
+            if messages is None:
+                return False  # Like the default exchange: unroutable messages are dropped
+            if front:
+                messages.appendleft((properties, body, redelivered))
+            else:
+                messages.append((properties, body, redelivered))
+            self.published += 1
+            self.condition.notify_all()
+            return True
+
+    def get(self, queue, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while True:
+                messages = self.queues.get(queue)
+                if messages:
+                    return messages.popleft()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def message_count(self, queue):
+        with self.condition:
+            return len(self.queues.get(queue, ()))
+
+class InProcessConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = []
+        self.is_open = True
+
+    def add_callback_threadsafe(self, callback):
+        callback()  # Channels here are safe to call from any thread
+
+    def channel(self):
+        channel = InProcessChannel(self.broker)
+        self.channels.append(channel)
+        return channel
+
+    def close(self):
+        for channel in self.channels:
+            channel.close()
+        self.is_open = False
+
+class UnroutableError(Exception):
+    pass
+
+class InProcessChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.unacked = OrderedDict()  # delivery_tag -> (queue, properties, body)
+        self.prefetch_count = 0
+        self.confirming = False
+        self.transactional = False
+        self.tx_buffer = []
+        self.consumers = {}  # consumer_tag -> (queue, callback, auto_ack)
+        self.consumer_tags = itertools.count(1)
+        self.consuming = False
+        self.is_open = True
+        self.window = threading.Condition(threading.RLock())  # Guards unacked; acks may arrive from other threads
+
+    def queue_declare(self, queue, durable=False, **kwargs):
+        count = self.broker.declare(queue)
+        return SimpleNamespace(method=SimpleNamespace(queue=queue, message_count=count))
+
+    def confirm_delivery(self):
+        self.confirming = True
+
+    def tx_select(self):
+        self.transactional = True
+
+    def tx_commit(self):
+        buffered, self.tx_buffer = self.tx_buffer, []
+        for routing_key, properties, body in buffered:
+            self.broker.publish(routing_key, properties, body)
+
+    def tx_rollback(self):
+        self.tx_buffer = []
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        if exchange:
+            raise ValueError("InProcessChannel only supports the default exchange")
+        if self.transactional:
+            self.tx_buffer.append((routing_key, properties, body))
+            return
+        if not self.broker.publish(routing_key, properties, body) and mandatory:
+            raise UnroutableError(routing_key)
+
+    def basic_qos(self, prefetch_count=0, **kwargs):
+        self.prefetch_count = prefetch_count
+
+    def _deliver(self, queue, auto_ack, timeout):
+        if not auto_ack and self.prefetch_count:
+            with self.window:  # Window full: nothing is delivered until the consumer acks
+                if not self.window.wait_for(lambda: len(self.unacked) < self.prefetch_count, timeout):
+                    return None, None, None
+        message = self.broker.get(queue, timeout)
+        if message is None:
+            return None, None, None
+        properties, body, redelivered = message
+        tag = self.broker.next_delivery_tag()
+        if not auto_ack:
+            with self.window:
+                self.unacked[tag] = (queue, properties, body)
+        method = SimpleNamespace(delivery_tag=tag, routing_key=queue, redelivered=redelivered)
+        return method, properties or SimpleNamespace(), body
+
+    def basic_get(self, queue, auto_ack=False):
+        return self._deliver(queue, auto_ack, 0)
+
+    def consume(self, queue, auto_ack=False, inactivity_timeout=None):
+        self.consuming = True
+        while self.consuming and self.is_open:
+            method, properties, body = self._deliver(queue, auto_ack, inactivity_timeout)
+            if method is None and inactivity_timeout is None:
+                continue
+            yield method, properties, body
+
+    def cancel(self):
+        self.consuming = False
+        return self._requeue_unacked()
+
+    def _tags(self, delivery_tag, multiple):
+        if multiple:
+            return [tag for tag in self.unacked if delivery_tag == 0 or tag <= delivery_tag]
+        return [delivery_tag]
+
+    def basic_ack(self, delivery_tag=0, multiple=False):
+        with self.window:
+            for tag in self._tags(delivery_tag, multiple):
+                self.unacked.pop(tag, None)
+            self.window.notify_all()
+
+    def basic_nack(self, delivery_tag=0, multiple=False, requeue=True):
+        with self.window:
+            for tag in reversed(self._tags(delivery_tag, multiple)):  # Requeued to the front, oldest first
+                message = self.unacked.pop(tag, None)
+                if message is not None and requeue:
+                    queue, properties, body = message
+                    self.broker.publish(queue, properties, body, redelivered=True, front=True)
+            self.window.notify_all()
+
+    def basic_consume(self, queue, on_message_callback, auto_ack=False, **kwargs):
+        consumer_tag = f"ctag{next(self.consumer_tags)}"
+        self.consumers[consumer_tag] = (queue, on_message_callback, auto_ack)
+        return consumer_tag
+
+    def start_consuming(self):
+        self.consuming = True
+        while self.consuming and self.consumers and self.is_open:
+            for queue, callback, auto_ack in list(self.consumers.values()):
+                method, properties, body = self._deliver(queue, auto_ack, 0.05)
+                if method is not None:
+                    callback(self, method, properties, body)
+
+    def stop_consuming(self):
+        self.consuming = False
+
+    def _requeue_unacked(self):
+        count = len(self.unacked)
+        self.basic_nack(0, multiple=True, requeue=True)
+        return count
+
+    def close(self):
+        if self.is_open:
+            self._requeue_unacked()
+            self.consuming = False
+            self.is_open = False
+
+class BrokerManager(BaseManager):
+    pass
+
+_served_broker = None
+
+def _get_served_broker():
+    global _served_broker
+    if _served_broker is None:
+        _served_broker = InProcessBroker()
+    return _served_broker
+
+BrokerManager.register('get_broker', callable=_get_served_broker)
+
+def serve_broker(address=('127.0.0.1', 0), authkey=b'omnipong'):
+    # Starts a broker in a server process; other processes connect with BrokerClient(manager.address)
+    manager = BrokerManager(address=address, authkey=authkey)
+    manager.start()
+    logging.info(f"Broker serving at {manager.address}")
+    return manager
+
+# Client side of serve_broker, usable wherever a broker is: Communication(broker=BrokerClient(address)).
+# Channels run here and call the shared broker through a proxy.
+class BrokerClient:
+    def __init__(self, address, authkey=b'omnipong'):
+        manager = BrokerManager(address=tuple(address), authkey=authkey)
+        manager.connect()
+        self.broker = manager.get_broker()
+
+    def connect(self, *args, **kwargs):
+        return InProcessConnection(self.broker)
+
+# Example usage
+if __name__ == '__main__':
+    broker = InProcessBroker()
+    channel = broker.connect().channel()
+    channel.queue_declare(queue='test_queue')
+    channel.basic_publish(exchange='', routing_key='test_queue', body=b'Hello, World!')
+    method, properties, body = channel.basic_get('test_queue')
+    channel.basic_ack(method.delivery_tag)
+    logging.info(f"Received message: {body}")
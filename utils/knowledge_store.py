@@ -0,0 +1,347 @@
+import bisect
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from itertools import islice
+import numpy as np
+from utils.codec import encode, decode
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_RECORD_HEADER = struct.Struct('<II')  # payload length, crc32 of payload
+
+# Persistent, append-only store of agent reports in a directory:
+#   knowledge.log   records of [length][crc32][utils.codec payload], appended only
+#   index.seg       index entries (id, log location, agent, topic, timestamp) in the
+#                   same framing, one block per snapshot, appended only
+#   snapshot.bin    the latest-value view, the log offset it covers and how much of
+#                   index.seg is valid
+# Appends go to the log under a lock and are fsynced in groups by a background
+# thread (every sync_interval seconds or sync_batch records), so a report costs a
+# buffered write and durability is at most sync_interval behind; sync() forces it.
+# Records are indexed in memory by agent, topic (the report's 'topic' or 'problem')
+# and timestamp, and read back through a memory map of the log. A snapshot appends
+# only the index entries of records added since the previous one, so its cost follows
+# new data, not history. Reopening loads the snapshot, rebuilds the indexes from
+# index.seg without touching the log, and replays only the log written after it,
+# stopping at the first torn or corrupt record. compact() drops records older than
+# the retention period and rewrites the log and index.seg. snapshot_listeners are
+# called after each snapshot, so derived state (e.g. utils.vector_index.KnowledgeIndex)
+# is saved at the same points. File writes that happen outside the main lock (fsyncs,
+# snapshot files) are serialized by file_lock, which is always taken before lock, so
+# close() and compact() wait for an fsync or snapshot already in progress.
+class KnowledgeStore:
+    def __init__(self, path, sync_interval=0.05, sync_batch=256, snapshot_every=10000, retention=None):
+        self.path = path
+        self.log_path = os.path.join(path, 'knowledge.log')
+        self.snapshot_path = os.path.join(path, 'snapshot.bin')
+        self.index_path = os.path.join(path, 'index.seg')
+        self.sync_interval = sync_interval
+        self.sync_batch = sync_batch
+        self.snapshot_every = snapshot_every  # Records appended between automatic snapshots
+        self.retention = retention  # Seconds of history compact() keeps; None keeps everything
+        self.lock = threading.RLock()
+        self.file_lock = threading.RLock()
+        self.unsynced = threading.Condition(self.lock)
+        self.offsets = {}  # record id -> (offset, length) of its payload in the log
+        self.by_agent = {}
+        self.by_topic = {}
+        self.by_time = []  # (timestamp, id), sorted
+        self.latest = {}  # Every report merged in order, as the core's knowledge_base
+        self.next_id = 0
+        self.pending = 0  # Records written but not yet fsynced
+        self.since_snapshot = 0
+        self.unsnapshotted = []  # (id, offset, length, agent, topic, timestamp) indexed since the last snapshot
+        self.index_length = 0  # Valid bytes of index.seg
+        self.snapshot_listeners = []
+        self.map = None
+        self.closed = False
+        os.makedirs(path, exist_ok=True)
+        self._load_snapshot()
+        self.log = open(self.log_path, 'ab')
+        self.written = self.log.tell()  # Bytes handed to the file so far
+        self.flushed = self.written  # Bytes visible to the memory map
+        self.synced = self.written  # Bytes known to be on disk
+        self.sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
+        self.sync_thread.start()
+        logging.info(f"KnowledgeStore opened at {path} with {len(self.offsets)} records")
+
+    def _index(self, record_id, offset, length, agent_id, timestamp, report):
+        topic = report.get('topic', report.get('problem'))
+        topic = topic if isinstance(topic, str) else None
+        self._index_entry(record_id, offset, length, agent_id, topic, timestamp)
+        self.unsnapshotted.append((record_id, offset, length, agent_id, topic, timestamp))
+        self.latest.update(report)
+
+    def _index_entry(self, record_id, offset, length, agent_id, topic, timestamp):
+        self.offsets[record_id] = (offset, length)
+        self.by_agent.setdefault(agent_id, []).append(record_id)
+        if topic is not None:
+            self.by_topic.setdefault(topic, []).append(record_id)
+        if not self.by_time or timestamp >= self.by_time[-1][0]:
+            self.by_time.append((timestamp, record_id))
+        else:
+            bisect.insort(self.by_time, (timestamp, record_id))
+        self.next_id = max(self.next_id, record_id + 1)
+
+    def _load_index(self, length):
+        # Index entries from the first length bytes of index.seg
+        with open(self.index_path, 'rb') as file:
+            data = file.read(length)
+        if len(data) < length:
+            raise ValueError(f"index.seg holds {len(data)} of {length} bytes")
+        offset = 0
+        while offset < length:
+            size, crc = _RECORD_HEADER.unpack_from(data, offset)
+            payload = data[offset + _RECORD_HEADER.size:offset + _RECORD_HEADER.size + size]
+            if len(payload) < size or zlib.crc32(payload) != crc:
+                raise ValueError(f"corrupt index block at {offset}")
+            block = decode(payload)
+            for entry in zip(block['ids'].tolist(), block['offsets'].tolist(), block['lengths'].tolist(),
+                             block['agents'], block['topics'], block['timestamps'].tolist()):
+                self._index_entry(*entry)
+            offset += _RECORD_HEADER.size + size
+
+    def _load_snapshot(self):
+        start = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'rb') as file:
+                    snapshot = decode(file.read())
+                self._load_index(snapshot['index_length'])
+                self.index_length = snapshot['index_length']
+                self.latest = decode(snapshot['latest'])
+                self.next_id = max(self.next_id, snapshot['next_id'])
+                start = snapshot['log_offset']
+            except Exception as e:
+                logging.error(f"Error loading knowledge snapshot, replaying the whole log: {e}")
+                self.offsets, self.by_agent, self.by_topic, self.by_time, self.latest = {}, {}, {}, [], {}
+                self.index_length, self.next_id = 0, 0
+                start = 0
+        self._replay(start)
+
+    def _replay(self, start):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'r+b') as file:
+            size = os.fstat(file.fileno()).st_size
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            offset, replayed = start, 0
+            while offset + _RECORD_HEADER.size <= size:
+                length, crc = _RECORD_HEADER.unpack_from(data, offset)
+                payload_offset = offset + _RECORD_HEADER.size
+                payload = data[payload_offset:payload_offset + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                record = decode(payload)
+                self._index(record['id'], payload_offset, length, record['agent'], record['timestamp'], record['report'])
+                offset = payload_offset + length
+                replayed += 1
+            if size:
+                data.close()
+            if offset < size:
+                logging.warning(f"Truncating {size - offset} bytes of incomplete records from {self.log_path}")
+                file.truncate(offset)
+        if replayed:
+            logging.info(f"Replayed {replayed} knowledge records written after the last snapshot")
+
+    def append(self, agent_id, report, durable=False):
+        timestamp = time.time()
+        with self.lock:
+            record_id = self.next_id
+            payload = encode({'id': record_id, 'agent': agent_id, 'timestamp': timestamp, 'report': report})
+            self.log.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+            self.log.write(payload)
+            self._index(record_id, self.written + _RECORD_HEADER.size, len(payload), agent_id, timestamp, report)
+            self.written += _RECORD_HEADER.size + len(payload)
+            self.pending += 1
+            self.since_snapshot += 1
+            if self.pending >= self.sync_batch:
+                self.unsynced.notify()
+        if durable:
+            self.sync()
+        return record_id
+
+    def _sync_loop(self):
+        while True:
+            with self.lock:
+                self.unsynced.wait_for(lambda: self.pending >= self.sync_batch or self.closed, self.sync_interval)
+                if self.closed:
+                    return
+            try:
+                self.sync()
+                if self.since_snapshot >= self.snapshot_every:
+                    self.snapshot()
+            except Exception as e:
+                logging.error(f"Error syncing knowledge store: {e}")
+
+    def sync(self):
+        # Flushes and fsyncs everything appended so far; one fsync covers every pending record.
+        # Appends go on during the fsync; closing or compacting waits for it
+        with self.file_lock:
+            with self.lock:
+                if self.closed:
+                    return
+                if self.pending:
+                    self.log.flush()
+                    self.flushed = self.written
+                    self.pending = 0
+                target = self.written
+                if self.synced >= target:
+                    return
+                fileno = self.log.fileno()
+            os.fsync(fileno)
+            with self.lock:
+                self.synced = max(self.synced, target)
+
+    def snapshot(self):
+        # Persists the index entries added since the last snapshot, so reopening replays only
+        # records appended after this point
+        with self.file_lock:
+            with self.lock:
+                if self.closed:
+                    return
+                self.sync()
+                entries, self.unsnapshotted = self.unsnapshotted, []
+                latest, next_id, log_offset = encode(self.latest), self.next_id, self.written
+                self.since_snapshot = 0
+            try:
+                block = b''
+                if entries:
+                    ids, offsets, lengths, agents, topics, timestamps = zip(*entries)
+                    payload = encode({'ids': np.array(ids, dtype=np.int64), 'offsets': np.array(offsets, dtype=np.int64),
+                                      'lengths': np.array(lengths, dtype=np.int64), 'agents': list(agents),
+                                      'topics': list(topics), 'timestamps': np.array(timestamps, dtype=np.float64)})
+                    block = _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+                with open(self.index_path, 'ab') as file:
+                    file.truncate(self.index_length)  # Drops a block torn by an earlier crash
+                    file.write(block)
+                    file.flush()
+                    os.fsync(file.fileno())
+                snapshot = encode({'latest': latest, 'next_id': next_id, 'log_offset': log_offset,
+                                   'index_length': self.index_length + len(block)})
+                temporary = f"{self.snapshot_path}.tmp"
+                with open(temporary, 'wb') as file:
+                    file.write(snapshot)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temporary, self.snapshot_path)
+                self.index_length += len(block)
+            except Exception:
+                with self.lock:
+                    self.unsnapshotted[:0] = entries  # Written again with the next snapshot
+                raise
+            for listener in list(self.snapshot_listeners):
+                try:
+                    listener()
+                except Exception as e:
+                    logging.error(f"Error in knowledge snapshot listener: {e}")
+
+    def _view(self, end):
+        # Memory map covering at least end bytes of the log, remapped as the log grows
+        if self.flushed < end:
+            self.log.flush()
+            self.flushed = self.written
+        if self.map is None or len(self.map) < end:
+            if self.map is not None:
+                self.map.close()
+            with open(self.log_path, 'rb') as file:
+                self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    def get(self, record_id):
+        with self.lock:
+            location = self.offsets.get(record_id)
+            if location is None:
+                return None
+            offset, length = location
+            view = self._view(offset + length)
+            return decode(view[offset:offset + length])
+
+    def query(self, agent=None, topic=None, since=None, until=None, limit=None):
+        # Records matching every given filter, oldest first; starts from the smallest index that applies
+        with self.lock:
+            candidates = []
+            if agent is not None:
+                candidates.append(self.by_agent.get(agent, []))
+            if topic is not None:
+                candidates.append(self.by_topic.get(topic, []))
+            if since is not None or until is not None:
+                low = bisect.bisect_left(self.by_time, (since, -1)) if since is not None else 0
+                high = bisect.bisect_right(self.by_time, (until, float('inf'))) if until is not None else len(self.by_time)
+                candidates.append(sorted(record_id for _, record_id in self.by_time[low:high]))
+            if not candidates:  # Ids are appended in increasing order
+                ids = list(self.offsets) if limit is None else list(islice(reversed(self.offsets), limit))[::-1]
+            else:
+                candidates.sort(key=len)
+                ids = candidates[0]
+                for other in candidates[1:]:
+                    allowed = set(other)
+                    ids = [record_id for record_id in ids if record_id in allowed]
+            if limit is not None:
+                ids = ids[-limit:]  # The most recent matches
+            return [self.get(record_id) for record_id in ids]
+
+    def compact(self):
+        # Rewrites the log without records older than retention, then snapshots the new layout
+        cutoff = time.time() - self.retention if self.retention is not None else None
+        with self.file_lock, self.lock:
+            self.sync()
+            keep = sorted(record_id for timestamp, record_id in self.by_time if cutoff is None or timestamp >= cutoff)
+            records = [self.get(record_id) for record_id in keep]
+            payloads = [encode(record) for record in records]
+            temporary = f"{self.log_path}.tmp"
+            with open(temporary, 'wb') as file:
+                for payload in payloads:
+                    file.write(_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+                    file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.log.close()
+            if os.path.exists(self.snapshot_path):
+                os.remove(self.snapshot_path)  # Its index points into the old log; until the new snapshot, reopening replays
+            os.replace(temporary, self.log_path)
+            latest, next_id = self.latest, self.next_id
+            self.offsets, self.by_agent, self.by_topic, self.by_time = {}, {}, {}, []
+            self.unsnapshotted, self.index_length = [], 0
+            offset = 0
+            for record, payload in zip(records, payloads):
+                self._index(record['id'], offset + _RECORD_HEADER.size, len(payload), record['agent'],
+                            record['timestamp'], record['report'])
+                offset += _RECORD_HEADER.size + len(payload)
+            self.latest, self.next_id = latest, next_id  # Dropped history still shaped the latest view
+            self.log = open(self.log_path, 'ab')
+            self.written = self.flushed = self.synced = offset
+            self.snapshot()
+            logging.info(f"Compacted knowledge log to {len(records)} records")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def close(self):
+        with self.file_lock, self.lock:
+            if self.closed:
+                return
+            self.snapshot()
+            self.closed = True
+            self.unsynced.notify_all()
+            self.log.close()
+            if self.map is not None:
+                self.map.close()
+        self.sync_thread.join()
+
+# Example usage
+if __name__ == '__main__':
+    store = KnowledgeStore('data/knowledge')
+    store.append('CuriosityEngine_1', {'agent': 'CuriosityEngine_1', 'topic': 'AI', 'findings': {'summary': '...'}})
+    store.append('ProblemSolver_1', {'agent': 'ProblemSolver_1', 'problem': 'Optimize routing', 'subtasks': []})
+    logging.info(f"Reports on AI: {store.query(topic='AI')}")
+    store.close()
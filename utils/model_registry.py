@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def estimate_model_size(model):
+    # Bytes held by the torch parameters behind a transformers pipeline (or a bare torch module)
+    module = getattr(model, 'model', model)
+    try:
+        return sum(p.numel() * p.element_size() for p in module.parameters())
+    except Exception:
+        return 0
+
+# Process-wide cache of heavy models. Each model is loaded once, on first get()
+# (or warmup()), and shared by every agent. When memory_budget is set, the least
+# recently used models are evicted until the loaded total fits the budget.
+class ModelRegistry:
+    def __init__(self, memory_budget=None):
+        self.memory_budget = memory_budget  # Bytes; None means never evict for size
+        self.loaders = {}  # name -> (loader, size override)
+        self.models = OrderedDict()  # name -> model, least recently used first
+        self.sizes = {}
+        self.last_used = {}
+        self.load_locks = {}  # name -> lock so concurrent first calls load once
+        self.identities = {}  # name -> what the model is (checkpoint, package version), or a callable computing it
+        self.lock = threading.Lock()
+        logging.info("ModelRegistry initialized")
+
+    def register(self, name, loader, size=None, identity=None):
+        with self.lock:
+            self.loaders[name] = (loader, size)
+            self.load_locks.setdefault(name, threading.Lock())
+            self.identities[name] = identity if identity is not None else name
+
+    def identity(self, name):
+        # Names the model behind name without loading it, e.g. for keys of cached outputs
+        identity = self.identities.get(name, name)
+        if callable(identity):
+            try:
+                identity = identity()
+            except Exception as e:
+                logging.error(f"Error identifying model '{name}': {e}")
+                identity = name
+            self.identities[name] = identity
+        return identity
+
+    def get(self, name):
+        with self.lock:
+            model = self.models.get(name)
+            if model is not None:
+                self.models.move_to_end(name)
+                self.last_used[name] = time.time()
+                return model
+            if name not in self.loaders:
+                raise KeyError(f"Unknown model: {name}")
+            load_lock = self.load_locks[name]
+        with load_lock:
+            with self.lock:
+                model = self.models.get(name)
+            if model is None:
+                model = self._load(name)
+        return model
+
+    def _load(self, name):
+        loader, size = self.loaders[name]
+        start = time.time()
+        model = loader()
+        size = size if size is not None else estimate_model_size(model)
+        logging.info(f"Model '{name}' loaded in {time.time() - start:.1f}s ({size / 2**20:.0f} MiB)")
+        with self.lock:
+            self.models[name] = model
+            self.sizes[name] = size
+            self.last_used[name] = time.time()
+            self._enforce_budget(keep=name)
+        return model
+
+    def _enforce_budget(self, keep=None):
+        if self.memory_budget is None:
+            return
+        for name in list(self.models):
+            if sum(self.sizes.values()) <= self.memory_budget:
+                break
+            if name != keep:
+                self._evict_locked(name)
+
+    def _evict_locked(self, name):
+        if self.models.pop(name, None) is not None:
+            self.sizes.pop(name, None)
+            self.last_used.pop(name, None)
+            logging.info(f"Model '{name}' evicted")
+
+    def evict(self, name):
+        with self.lock:
+            self._evict_locked(name)
+
+    def evict_idle(self, max_idle):
+        cutoff = time.time() - max_idle
+        with self.lock:
+            for name in [n for n, used in self.last_used.items() if used < cutoff]:
+                self._evict_locked(name)
+
+    def is_loaded(self, name):
+        return name in self.models
+
+    def loaded_size(self):
+        with self.lock:
+            return sum(self.sizes.values())
+
+    def warmup(self, names=None, background=False):
+        names = list(names) if names is not None else list(self.loaders)
+        if background:
+            thread = threading.Thread(target=self.warmup, args=(names,), daemon=True)
+            thread.start()
+            return thread
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logging.error(f"Error warming up model '{name}': {e}")
+
+def load_pipeline(task, model=None):
+    from transformers import pipeline
+    return pipeline(task, model=model) if model else pipeline(task)
+
+def load_spacy(name):
+    import spacy
+    return spacy.load(name)
+
+def package_identity(name):
+    # 'name==version' of an installed model package, without importing it
+    from importlib.metadata import version
+    return f"{name}=={version(name)}"
+
+model_registry = ModelRegistry()
+model_registry.register('zero-shot-classification', lambda: load_pipeline("zero-shot-classification"))
+model_registry.register('summarization', lambda: load_pipeline("summarization", "sshleifer/distilbart-cnn-12-6"),
+                        identity="sshleifer/distilbart-cnn-12-6")
+model_registry.register('en_core_web_sm', lambda: load_spacy("en_core_web_sm"), size=50 * 2**20,
+                        identity=lambda: package_identity("en_core_web_sm"))
+
+# Example usage
+if __name__ == '__main__':
+    registry = ModelRegistry(memory_budget=2 * 2**20)
+    registry.register('small', lambda: bytearray(2**20), size=2**20)
+    registry.register('large', lambda: bytearray(2 * 2**20), size=2 * 2**20)
+    registry.warmup(['small', 'large'])
+    logging.info(f"Loaded: small={registry.is_loaded('small')}, large={registry.is_loaded('large')}")
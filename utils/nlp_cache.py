@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from utils.codec import encode, decode
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Results of NLP steps (summaries, entities, vectors) keyed by a hash of the step, its
+# parameters and the input text, so the same snippet costs one inference however many
+# explorations bring it back. Two tiers: an in-memory LRU of max_entries results, and,
+# when path is set (or use_disk is called), one utils.codec file per result under
+# path/<2 hex>/<key>, read on a memory miss and shared across restarts and processes.
+# The disk tier is an LRU by mtime: hits touch their file, and once the files pass
+# max_bytes the oldest are removed down to 90% of it. Callers put the model identity
+# in params, so results of a replaced model are never served. Thread-safe.
+class NlpCache:
+    def __init__(self, path=None, max_entries=4096, max_bytes=256 * 2**20):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_bytes = None  # Counted on the first write, corrected by every eviction scan
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evict_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def use_disk(self, path, max_bytes=None):
+        self.path = path
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self.disk_bytes = None
+
+    def key(self, kind, text, params=()):
+        digest = hashlib.sha1(f"{kind}\0{params!r}\0".encode())
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def _files(self):
+        # (mtime, size, filename) of every entry on disk
+        files = []
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                except FileNotFoundError:  # Evicted by another process meanwhile
+                    pass
+        return files
+
+    def _evict(self):
+        # Removes the least recently used files until the tier is at 90% of max_bytes
+        if not self.evict_lock.acquire(blocking=False):
+            return  # Another thread is already evicting
+        try:
+            files = sorted(self._files())
+            total = sum(size for _, size, _ in files)
+            target = self.max_bytes * 0.9
+            removed = 0
+            for _, size, filename in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(filename)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self.disk_bytes = total
+            if removed:
+                logging.info(f"NLP cache evicted {removed} entries, {total} bytes on disk")
+        except Exception as e:
+            logging.error(f"Error evicting NLP cache entries: {e}")
+        finally:
+            self.evict_lock.release()
+
+    def _remember(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def lookup(self, key):
+        # (found, value)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+        if self.path is not None:
+            try:
+                filename = self._file(key)
+                with open(filename, 'rb') as file:
+                    value = decode(file.read())
+                os.utime(filename)  # Recently used: evicted last
+                self._remember(key, value)
+                with self.lock:
+                    self.disk_hits += 1
+                return True, value
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.error(f"Error reading NLP cache entry {key}: {e}")
+        with self.lock:
+            self.misses += 1
+        return False, None
+
+    def store(self, key, value):
+        self._remember(key, value)
+        if self.path is None:
+            return
+        try:
+            filename = self._file(key)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            temporary = f"{filename}.{threading.get_ident()}.tmp"
+            data = encode(value)
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, filename)
+        except Exception as e:
+            logging.error(f"Error writing NLP cache entry {key}: {e}")
+            return
+        if self.disk_bytes is None:
+            self._evict()  # First write: count what earlier runs left, trimming it if over
+        else:
+            with self.lock:
+                self.disk_bytes += len(data)
+            if self.disk_bytes > self.max_bytes:
+                self._evict()
+
+    def get_or_compute(self, kind, text, compute, params=()):
+        key = self.key(kind, text, params)
+        found, value = self.lookup(key)
+        if not found:
+            value = compute(text)
+            self.store(key, value)
+        return value
+
+    def get_or_compute_many(self, kind, texts, compute_many, params=()):
+        # compute_many gets only the distinct texts that missed, in one batch, and returns their results in order
+        keys = [self.key(kind, text, params) for text in texts]
+        results, missing = {}, {}
+        for key, text in zip(keys, texts):
+            if key in results or key in missing:
+                continue
+            found, value = self.lookup(key)
+            if found:
+                results[key] = value
+            else:
+                missing[key] = text
+        if missing:
+            for key, value in zip(missing, compute_many(list(missing.values()))):
+                self.store(key, value)
+                results[key] = value
+        return [results[key] for key in keys]
+
+# Shared by every agent in the process; memory only unless the application calls use_disk
+nlp_cache = NlpCache()
+
+# Example usage
+if __name__ == '__main__':
+    cache = NlpCache()
+    shout = lambda texts: [text.upper() for text in texts]
+    cache.get_or_compute_many('upper', ['a', 'b', 'a'], shout)
+    logging.info(f"Results: {cache.get_or_compute_many('upper', ['a', 'b', 'c'], shout)}")
+    logging.info(f"Hits: {cache.hits}, misses: {cache.misses}")
@@ -0,0 +1,102 @@
+import logging
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Running count/mean/variance/min/max for many keys (e.g. sensors) at once. Each key
+# owns a slot in flat NumPy arrays; partial_fit folds a whole batch in with
+# bincount and the parallel-variance merge (Chan et al.), so updates cost O(batch)
+# NumPy work and never revisit earlier data.
+class OnlineStats:
+    def __init__(self, capacity=64):
+        self.slots = {}  # key -> slot index
+        self.keys = []
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros(capacity, dtype=np.float64)
+        self.m2 = np.zeros(capacity, dtype=np.float64)
+        self.min = np.full(capacity, np.inf)
+        self.max = np.full(capacity, -np.inf)
+
+    def _grow(self, capacity):
+        extra = capacity - len(self.count)
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.m2 = np.concatenate([self.m2, np.zeros(extra)])
+        self.min = np.concatenate([self.min, np.full(extra, np.inf)])
+        self.max = np.concatenate([self.max, np.full(extra, -np.inf)])
+
+    def slot(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            if slot >= len(self.count):
+                self._grow(2 * len(self.count))
+        return slot
+
+    def partial_fit(self, slots, values):
+        slots = np.asarray(slots, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        size = len(self.count)
+        batch_count = np.bincount(slots, minlength=size)
+        touched = np.flatnonzero(batch_count)
+        batch_mean = np.bincount(slots, weights=values, minlength=size) / np.maximum(batch_count, 1)
+        deviation = values - batch_mean[slots]
+        batch_m2 = np.bincount(slots, weights=deviation * deviation, minlength=size)
+
+        count_a, count_b = self.count[touched], batch_count[touched]
+        total = count_a + count_b
+        delta = batch_mean[touched] - self.mean[touched]
+        self.mean[touched] += delta * count_b / total
+        self.m2[touched] += batch_m2[touched] + delta * delta * count_a * count_b / total
+        self.count[touched] = total
+        np.minimum.at(self.min, slots, values)
+        np.maximum.at(self.max, slots, values)
+
+    def merge(self, other):
+        # Folds in another OnlineStats (e.g. from a different node) key by key
+        for key, other_slot in other.slots.items():
+            slot, count_b = self.slot(key), other.count[other_slot]
+            if not count_b:
+                continue
+            count_a = self.count[slot]
+            total = count_a + count_b
+            delta = other.mean[other_slot] - self.mean[slot]
+            self.mean[slot] += delta * count_b / total
+            self.m2[slot] += other.m2[other_slot] + delta * delta * count_a * count_b / total
+            self.count[slot] = total
+            self.min[slot] = min(self.min[slot], other.min[other_slot])
+            self.max[slot] = max(self.max[slot], other.max[other_slot])
+
+    def variance(self, slots=None):
+        count = self.count if slots is None else self.count[slots]
+        m2 = self.m2 if slots is None else self.m2[slots]
+        return np.where(count > 0, m2 / np.maximum(count, 1), 0.0)
+
+    def transform(self, slots, values):
+        # Standardizes values with each key's running mean/std (0 where the std is still 0)
+        slots = np.asarray(slots, dtype=np.int64)
+        std = np.sqrt(self.variance(slots))
+        centered = np.asarray(values, dtype=np.float64) - self.mean[slots]
+        return np.divide(centered, std, out=np.zeros_like(centered), where=std > 0)
+
+    def stats(self, key):
+        slot = self.slots.get(key)
+        if slot is None or not self.count[slot]:
+            return None
+        return {'count': int(self.count[slot]), 'mean': float(self.mean[slot]),
+                'variance': float(self.variance([slot])[0]),
+                'min': float(self.min[slot]), 'max': float(self.max[slot])}
+
+# Example usage
+if __name__ == '__main__':
+    stats = OnlineStats()
+    sensors = np.random.randint(0, 3, 10000)
+    values = np.random.normal(loc=sensors * 10.0, scale=1.0)
+    slots = np.array([stats.slot(f"sensor_{i}") for i in range(3)])[sensors]
+    stats.partial_fit(slots[:5000], values[:5000])
+    stats.partial_fit(slots[5000:], values[5000:])
+    logging.info(f"sensor_1: {stats.stats('sensor_1')}")
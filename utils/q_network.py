@@ -0,0 +1,151 @@
+import logging
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Dense ReLU MLP with a linear output layer, MSE loss and Adam, in plain NumPy.
+# Exposes the subset of the Keras model API the learning agents use
+# (predict/predict_on_batch/train_on_batch/fit, get/set/save/load_weights) so it
+# is a drop-in replacement for the Keras Q-network without importing TensorFlow.
+class NumpyQNetwork:
+    def __init__(self, state_size, action_size, hidden_sizes=(24, 24), learning_rate=0.001,
+                 beta_1=0.9, beta_2=0.999, epsilon=1e-7, seed=None):
+        self.learning_rate = learning_rate
+        self.beta_1 = beta_1
+        self.beta_2 = beta_2
+        self.epsilon = epsilon
+        rng = np.random.default_rng(seed)
+        sizes = [state_size, *hidden_sizes, action_size]
+        self.weights = []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            limit = np.sqrt(6.0 / (fan_in + fan_out))  # Glorot uniform, as Keras Dense
+            self.weights.append(rng.uniform(-limit, limit, (fan_in, fan_out)).astype(np.float32))
+            self.weights.append(np.zeros(fan_out, dtype=np.float32))
+        self.m = [np.zeros_like(w) for w in self.weights]
+        self.v = [np.zeros_like(w) for w in self.weights]
+        self.iterations = 0
+
+    def _forward(self, x):
+        activations = [np.asarray(x, dtype=np.float32)]
+        last = len(self.weights) // 2 - 1
+        for layer in range(last + 1):
+            z = activations[-1] @ self.weights[2 * layer] + self.weights[2 * layer + 1]
+            activations.append(z if layer == last else np.maximum(z, 0.0))
+        return activations
+
+    def predict_on_batch(self, x):
+        return self._forward(x)[-1]
+
+    def predict(self, x, verbose=0):
+        return self.predict_on_batch(x)
+
+    def train_on_batch(self, x, y, sample_weight=None):
+        activations = self._forward(x)
+        output = activations[-1]
+        batch_size, output_size = output.shape
+        error = output - np.asarray(y, dtype=np.float32)
+        per_sample = np.mean(error ** 2, axis=1)
+        grad = 2.0 * error / (output_size * batch_size)
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=np.float32)
+            per_sample = per_sample * sample_weight
+            grad = grad * sample_weight[:, None]
+
+        grads = [None] * len(self.weights)
+        for layer in range(len(self.weights) // 2 - 1, -1, -1):
+            grads[2 * layer] = activations[layer].T @ grad
+            grads[2 * layer + 1] = grad.sum(axis=0)
+            if layer:
+                grad = (grad @ self.weights[2 * layer].T) * (activations[layer] > 0)
+        self._apply_adam(grads)
+        return float(per_sample.mean())
+
+    def _apply_adam(self, grads):
+        self.iterations += 1
+        step = self.learning_rate * np.sqrt(1 - self.beta_2 ** self.iterations) / (1 - self.beta_1 ** self.iterations)
+        for w, g, m, v in zip(self.weights, grads, self.m, self.v):
+            m *= self.beta_1
+            m += (1 - self.beta_1) * g
+            v *= self.beta_2
+            v += (1 - self.beta_2) * g * g
+            w -= step * m / (np.sqrt(v) + self.epsilon)
+
+    def fit(self, x, y, epochs=1, verbose=0, sample_weight=None):
+        for _ in range(epochs):
+            loss = self.train_on_batch(x, y, sample_weight=sample_weight)
+        return loss
+
+    def get_weights(self):
+        return [w.copy() for w in self.weights]
+
+    def set_weights(self, weights):
+        self.weights = [np.array(w, dtype=np.float32) for w in weights]
+
+    def get_optimizer_weights(self):
+        return [np.array(self.iterations, dtype=np.int64)] + [m.copy() for m in self.m] + [v.copy() for v in self.v]
+
+    def set_optimizer_weights(self, weights):
+        self.iterations = int(weights[0])
+        count = len(self.weights)
+        self.m = [np.array(m, dtype=np.float32) for m in weights[1:1 + count]]
+        self.v = [np.array(v, dtype=np.float32) for v in weights[1 + count:1 + 2 * count]]
+
+    def save_weights(self, filepath):
+        with open(filepath, 'wb') as file:
+            np.savez(file, *self.weights)
+
+    def load_weights(self, filepath):
+        with np.load(filepath) as data:
+            self.set_weights([data[f"arr_{i}"] for i in range(len(data.files))])
+
+def build_keras_q_network(state_size, action_size, hidden_sizes=(24, 24), learning_rate=0.001):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense
+    from tensorflow.keras.optimizers import Adam
+
+    model = Sequential()
+    model.add(Dense(hidden_sizes[0], input_dim=state_size, activation='relu'))
+    for units in hidden_sizes[1:]:
+        model.add(Dense(units, activation='relu'))
+    model.add(Dense(action_size, activation='linear'))
+    model.compile(loss='mse', optimizer=Adam(learning_rate=learning_rate))
+    return model
+
+def _optimizer_variables(model):
+    optimizer = model.optimizer
+    return optimizer.variables() if callable(optimizer.variables) else optimizer.variables
+
+def get_optimizer_state(model):
+    # Optimizer slots (Adam moments and step count) as a list of arrays, for either backend
+    if hasattr(model, 'get_optimizer_weights'):
+        return model.get_optimizer_weights()
+    return [np.asarray(variable) for variable in _optimizer_variables(model)]
+
+def set_optimizer_state(model, weights):
+    if hasattr(model, 'set_optimizer_weights'):
+        model.set_optimizer_weights(weights)
+        return
+    variables = _optimizer_variables(model)
+    if len(variables) != len(weights):  # Keras creates slots on the first training step
+        model.optimizer.build(model.trainable_variables)
+        variables = _optimizer_variables(model)
+    for variable, value in zip(variables, weights):
+        variable.assign(value)
+
+def build_q_network(backend, state_size, action_size, hidden_sizes=(24, 24), learning_rate=0.001):
+    if backend == 'numpy':
+        return NumpyQNetwork(state_size, action_size, hidden_sizes, learning_rate)
+    elif backend == 'keras':
+        return build_keras_q_network(state_size, action_size, hidden_sizes, learning_rate)
+    else:
+        raise ValueError(f"Unknown model backend: {backend}")
+
+# Example usage
+if __name__ == '__main__':
+    network = NumpyQNetwork(state_size=4, action_size=2, seed=0)
+    states = np.eye(4, dtype=np.float32)
+    targets = np.array([[1, 0], [0, 1], [1, 0], [0, 1]], dtype=np.float32)
+    for _ in range(500):
+        loss = network.train_on_batch(states, targets)
+    logging.info(f"Loss after 500 steps: {loss:.5f}")
@@ -0,0 +1,158 @@
+import logging
+import os
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class SumTree:
+    # Binary tree over priorities stored in a flat array; leaves all sit at the same depth
+    def __init__(self, capacity):
+        self.leaf_offset = 1 << max(int(np.ceil(np.log2(max(capacity, 1)))), 0)
+        self.tree = np.zeros(2 * self.leaf_offset, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaf_offset
+        self.tree[nodes] = priorities
+        if nodes.size == 1:  # Single insert: a scalar walk beats per-level NumPy calls
+            node, tree = int(nodes[0]) >> 1, self.tree
+            while node >= 1:
+                tree[node] = tree[2 * node] + tree[2 * node + 1]
+                node >>= 1
+            return
+        nodes = np.unique(nodes // 2)
+        while nodes.size and nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        # Walks all lookups down the tree together: one NumPy step per level
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while self.leaf_offset > 1 and nodes[0] < self.leaf_offset:
+            left = 2 * nodes
+            go_right = values > self.tree[left]
+            values -= np.where(go_right, self.tree[left], 0.0)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self.leaf_offset
+
+# Fixed-capacity ring buffer of transitions kept in preallocated NumPy arrays, so
+# inserts and samples are O(1) per transition with no per-transition Python objects.
+# With prioritized=True, transitions are sampled in proportion to priority**alpha
+# through a SumTree. Passing path stores the arrays as .npy memory maps in that
+# directory, so large buffers live on disk and survive restarts.
+class ReplayBuffer:
+    def __init__(self, capacity, state_size, prioritized=False, alpha=0.6, path=None):
+        self.capacity = capacity
+        self.state_size = state_size
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.path = path
+        self.states = self._allocate('states', (capacity, state_size), np.float32)
+        self.actions = self._allocate('actions', (capacity,), np.int64)
+        self.rewards = self._allocate('rewards', (capacity,), np.float32)
+        self.next_states = self._allocate('next_states', (capacity, state_size), np.float32)
+        self.dones = self._allocate('dones', (capacity,), np.bool_)
+        self.counters = self._allocate('counters', (2,), np.int64)  # [next write position, size]
+        self.tree = SumTree(capacity) if prioritized else None
+        self.max_priority = 1.0
+        if self.tree is not None and len(self):
+            self.tree.update(np.arange(len(self)), np.full(len(self), self.max_priority))
+        logging.info(f"ReplayBuffer initialized with capacity {capacity}" + (f" at {path}" if path else ""))
+
+    def _allocate(self, name, shape, dtype):
+        if self.path is None:
+            return np.zeros(shape, dtype=dtype)
+        os.makedirs(self.path, exist_ok=True)
+        filename = os.path.join(self.path, f"{name}.npy")
+        if os.path.exists(filename):
+            array = np.lib.format.open_memmap(filename, mode='r+')
+            if array.shape == shape and array.dtype == dtype:
+                return array
+            logging.warning(f"Replay buffer file {filename} does not match; recreating it")
+            del array
+        return np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=shape)
+
+    def __len__(self):
+        return int(self.counters[1])
+
+    def append(self, state, action, reward, next_state, done):
+        position = int(self.counters[0])
+        self.states[position] = state
+        self.actions[position] = action
+        self.rewards[position] = reward
+        self.next_states[position] = next_state
+        self.dones[position] = done
+        if self.tree is not None:
+            self.tree.update([position], [self.max_priority ** self.alpha])
+        self.counters[0] = (position + 1) % self.capacity
+        self.counters[1] = min(len(self) + 1, self.capacity)
+
+    def sample(self, batch_size, beta=0.4):
+        # Returns (states, actions, rewards, next_states, dones, indices, weights)
+        size = len(self)
+        if self.tree is None:
+            indices = np.random.randint(0, size, size=batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
+        else:
+            # Stratified: one draw from each of batch_size equal slices of the priority mass
+            total = self.tree.total()
+            values = (np.arange(batch_size) + np.random.rand(batch_size)) * (total / batch_size)
+            indices = np.minimum(self.tree.find(values), size - 1)
+            probabilities = self.tree.tree[indices + self.tree.leaf_offset] / total
+            weights = (size * np.maximum(probabilities, 1e-12)) ** -beta
+            weights = (weights / weights.max()).astype(np.float32)
+        return (self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices], indices, weights)
+
+    def update_priorities(self, indices, td_errors):
+        if self.tree is None:
+            return
+        priorities = np.abs(td_errors) + 1e-6
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def checkpoint_arrays(self):
+        arrays = {'states': self.states, 'actions': self.actions, 'rewards': self.rewards,
+                  'next_states': self.next_states, 'dones': self.dones, 'counters': self.counters}
+        if self.tree is not None:
+            arrays['tree'] = self.tree.tree
+        return arrays
+
+    def restore(self, arrays, max_priority=1.0):
+        # Adopts checkpointed arrays as they are (e.g. memory maps); a path-backed buffer copies them into its files
+        if arrays['states'].shape != self.states.shape:
+            logging.warning(f"Checkpointed replay buffer has shape {arrays['states'].shape}, expected {self.states.shape}; ignoring it")
+            return False
+        for name in ('states', 'actions', 'rewards', 'next_states', 'dones', 'counters'):
+            if self.path is None:
+                setattr(self, name, arrays[name])
+            else:
+                getattr(self, name)[...] = arrays[name]
+        self.max_priority = max_priority
+        if self.tree is not None:
+            if 'tree' in arrays and arrays['tree'].shape == self.tree.tree.shape:
+                self.tree.tree = arrays['tree']
+            else:
+                self.tree.tree[:] = 0.0
+                self.tree.update(np.arange(len(self)), np.full(len(self), self.max_priority ** self.alpha))
+        return True
+
+    def flush(self):
+        for array in (self.states, self.actions, self.rewards, self.next_states, self.dones, self.counters):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+# Example usage
+if __name__ == '__main__':
+    buffer = ReplayBuffer(capacity=1000, state_size=4, prioritized=True)
+    for i in range(1500):
+        buffer.append(np.random.rand(4), i % 2, 1.0, np.random.rand(4), False)
+    states, actions, rewards, next_states, dones, indices, weights = buffer.sample(32)
+    buffer.update_priorities(indices, np.random.rand(32))
+    logging.info(f"Buffer holds {len(buffer)} transitions; sampled states shape {states.shape}")
@@ -0,0 +1,107 @@
+import logging
+import random
+import threading
+from collections import deque
+from agent_base import AgentBase
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Pending tasks plus a task type -> handler index, so picking an agent is a dict
+# lookup instead of a can_handle() scan over every registered agent. Given a load
+# function (agent -> expected wait, e.g. AgentExecutor.expected_wait), tasks go to
+# the less loaded of two randomly chosen handlers (power of two choices), which
+# is the least loaded one when a type has only two; without one, to the first.
+class TaskDispatcher:
+    def __init__(self, load=None):
+        self.pending = deque()  # append/popleft are atomic; the queue itself needs no lock
+        self.handlers = {}  # task type -> tuple of agents, replaced (never mutated) on change
+        self.generic_handlers = ()  # agents with a custom can_handle and no declared types
+        self.agent_types = {}  # agent_id -> task types the agent was indexed under
+        self.lock = threading.Lock()  # serialises index rebuilds only
+        self.task_available = threading.Condition()  # wakes the distribution loop on enqueue
+        self.closed = False
+        self.load = load
+        logging.info("TaskDispatcher initialized")
+
+    def add_agent(self, agent):
+        with self.lock:
+            self._remove_locked(agent.agent_id)
+            task_types = tuple(getattr(agent, 'handled_task_types', ()))
+            if task_types:
+                handlers = dict(self.handlers)
+                for task_type in task_types:
+                    handlers[task_type] = handlers.get(task_type, ()) + (agent,)
+                self.handlers = handlers
+            elif getattr(type(agent), 'can_handle', AgentBase.can_handle) is not AgentBase.can_handle:
+                self.generic_handlers = self.generic_handlers + (agent,)
+            self.agent_types[agent.agent_id] = task_types
+
+    def remove_agent(self, agent_id):
+        with self.lock:
+            self._remove_locked(agent_id)
+
+    def _remove_locked(self, agent_id):
+        task_types = self.agent_types.pop(agent_id, None)
+        if task_types is None:
+            return
+        if task_types:
+            handlers = dict(self.handlers)
+            for task_type in task_types:
+                remaining = tuple(a for a in handlers.get(task_type, ()) if a.agent_id != agent_id)
+                if remaining:
+                    handlers[task_type] = remaining
+                else:
+                    handlers.pop(task_type, None)
+            self.handlers = handlers
+        else:
+            self.generic_handlers = tuple(a for a in self.generic_handlers if a.agent_id != agent_id)
+
+    def enqueue(self, task):
+        self.pending.append(task)
+        with self.task_available:
+            self.task_available.notify()
+
+    def wait_for_task(self, timeout=None):
+        # Returns True when tasks are pending, False on timeout or once closed
+        with self.task_available:
+            self.task_available.wait_for(lambda: self.pending or self.closed, timeout)
+            return bool(self.pending) and not self.closed
+
+    def open(self):
+        with self.task_available:
+            self.closed = False
+
+    def close(self):
+        with self.task_available:
+            self.closed = True
+            self.task_available.notify_all()
+
+    def next_task(self):
+        try:
+            return self.pending.popleft()
+        except IndexError:
+            return None
+
+    def select_agent(self, task):
+        handlers = self.handlers.get(task.get('type'))
+        if handlers:
+            if len(handlers) == 1 or self.load is None:
+                return handlers[0]
+            first, second = handlers if len(handlers) == 2 else random.sample(handlers, 2)
+            return first if self.load(first) <= self.load(second) else second
+        for agent in self.generic_handlers:
+            if agent.can_handle(task):
+                return agent
+        return None
+
+# Example usage
+if __name__ == '__main__':
+    class EchoAgent(AgentBase):
+        handled_task_types = ('echo',)
+
+    dispatcher = TaskDispatcher()
+    dispatcher.add_agent(EchoAgent('EchoAgent_1'))
+    dispatcher.enqueue({'type': 'echo', 'message': 'Hello, World!'})
+    task = dispatcher.next_task()
+    logging.info(f"Task {task} -> {dispatcher.select_agent(task).agent_id}")
@@ -4,19 +4,24 @@ import threading
 import time
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime=s - %(levelname=s - %(message=s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class TaskScheduler:
-    def __init__(self):
+    def __init__(self, batch_size=64):
         self.task_queue = []
         self.task_id_counter = 0
         self.lock = threading.Lock()
+        self.task_available = threading.Condition(self.lock)
+        self.batch_size = batch_size  # Max tasks handed to the core per wake-up
+        self.running = False
+        self.scheduler_thread = None
         logging.info("TaskScheduler initialized")
 
     def add_task(self, task, priority=1):
-        with self.lock:
+        with self.task_available:
             self.task_id_counter += 1
             heapq.heappush(self.task_queue, (priority, self.task_id_counter, task))
+            self.task_available.notify()
             logging.info(f"Task added: {task} with priority {priority}")
 
     def get_next_task(self):
@@ -26,15 +31,46 @@ class TaskScheduler:
             else:
                 return None
 
-    def schedule_tasks(self, core, interval=5):
+    def get_next_tasks(self, max_tasks=None):
+        with self.lock:
+            return self._pop_batch(max_tasks or self.batch_size)
+
+    def _pop_batch(self, max_tasks):
+        batch = []
+        while self.task_queue and len(batch) < max_tasks:
+            batch.append(heapq.heappop(self.task_queue)[2])
+        return batch
+
+    def schedule_tasks(self, core, interval=None):
+        # Wakes on add_task and drains up to batch_size tasks per pass, in priority order;
+        # interval only bounds how long an idle scheduler sleeps between checks
+        if self.scheduler_thread and self.scheduler_thread.is_alive():
+            return
+        self.running = True
+
         def scheduler():
             while True:
-                task = self.get_next_task()
-                if task:
+                with self.task_available:
+                    self.task_available.wait_for(lambda: self.task_queue or not self.running, timeout=interval)
+                    if not self.running:
+                        break
+                    batch = self._pop_batch(self.batch_size)
+                for task in batch:
                     core.send_task(task)
-                    logging.info(f"Scheduled task: {task}")
-                time.sleep(interval)
-        threading.Thread(target=scheduler, daemon=True).start()
+                if batch:
+                    logging.info(f"Scheduled {len(batch)} tasks")
+            logging.info("TaskScheduler stopped")
+
+        self.scheduler_thread = threading.Thread(target=scheduler, daemon=True)
+        self.scheduler_thread.start()
+
+    def stop(self, timeout=None):
+        with self.task_available:
+            self.running = False
+            self.task_available.notify_all()
+        if self.scheduler_thread and self.scheduler_thread is not threading.current_thread():
+            self.scheduler_thread.join(timeout)
+        self.scheduler_thread = None
 
 # Example usage
 if __name__ == '__main__':
@@ -47,4 +83,5 @@ if __name__ == '__main__':
     scheduler.add_task({'type': 'explore', 'topic': 'artificial intelligence'}, priority=2)
     scheduler.add_task({'type': 'solve_problem', 'problem': 'climate change'}, priority=1)
     scheduler.schedule_tasks(core)
-    time.sleep(10)  # Let the scheduler run for a while
+    time.sleep(1)  # Let the scheduler run for a while
+    scheduler.stop()
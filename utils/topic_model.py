@@ -0,0 +1,139 @@
+import logging
+import threading
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Online clustering of text into a growing set of topics. Documents are turned into
+# unit vectors by a stateless hashing vectorizer (no vocabulary to refit), and each
+# one joins the topic whose centroid is most similar (cosine) or, below threshold,
+# starts a new topic, up to max_topics. A topic's centroid is the running mean of its
+# documents, so assigning a document costs one pass over the current centroids,
+# independent of how many documents came before. Each topic counts the labels (e.g.
+# exploration topics) its documents came from, which is what related() reports.
+class OnlineTopicModel:
+    def __init__(self, n_features=4096, threshold=0.25, max_topics=1024, capacity=64):
+        self.n_features = n_features
+        self.threshold = threshold
+        self.max_topics = max_topics
+        self.size = 0
+        self.labels = []  # Per topic: {label: document count}
+        self.lock = threading.Lock()
+        self._vectorizer = None
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.centroids = np.zeros((capacity, self.n_features), dtype=np.float32)
+        self.unit = np.zeros((capacity, self.n_features), dtype=np.float32)  # Normalized centroids
+        self.counts = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self):
+        old = (self.centroids, self.unit, self.counts)
+        self._allocate(min(2 * len(self.counts), self.max_topics))
+        for old_array, new_array in zip(old, (self.centroids, self.unit, self.counts)):
+            new_array[:len(old_array)] = old_array
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(n_features=self.n_features, alternate_sign=False,
+                                                 norm='l2', stop_words='english')
+        return self._vectorizer
+
+    def transform(self, texts):
+        if not len(texts):
+            return np.zeros((0, self.n_features), dtype=np.float32)
+        return self.vectorizer.transform(texts).toarray().astype(np.float32)
+
+    def partial_fit(self, texts, label=None):
+        return self.partial_fit_vectors(self.transform(texts), label)
+
+    def partial_fit_vectors(self, vectors, label=None):
+        # Topic id per document; -1 for documents with no terms left after stop words
+        assigned = []
+        with self.lock:
+            for vector in np.asarray(vectors, dtype=np.float32):
+                if not vector.any():
+                    assigned.append(-1)
+                    continue
+                topic, similarity = self._nearest(vector)
+                if topic < 0 or (similarity < self.threshold and self.size < self.max_topics):
+                    topic = self._new_topic()
+                self.counts[topic] += 1
+                self.centroids[topic] += (vector - self.centroids[topic]) / self.counts[topic]
+                self.unit[topic] = self.centroids[topic] / max(np.linalg.norm(self.centroids[topic]), 1e-12)
+                if label is not None:
+                    self.labels[topic][label] = self.labels[topic].get(label, 0) + 1
+                assigned.append(topic)
+        return assigned
+
+    def _nearest(self, vector):
+        if not self.size:
+            return -1, 0.0
+        similarities = self.unit[:self.size] @ vector
+        topic = int(np.argmax(similarities))
+        return topic, float(similarities[topic])
+
+    def _new_topic(self):
+        if self.size == len(self.counts):
+            self._grow()
+        self.labels.append({})
+        self.size += 1
+        return self.size - 1
+
+    def assign(self, texts):
+        # Nearest topic per text without updating the model
+        vectors = self.transform(texts)
+        with self.lock:
+            return [self._nearest(vector)[0] if vector.any() else -1 for vector in vectors]
+
+    def related(self, text, k=5, exclude=None):
+        # The k topics closest to text, with the labels most of their documents came from
+        vector = self.transform([text])[0]
+        with self.lock:
+            if not self.size or not vector.any():
+                return []
+            similarities = self.unit[:self.size] @ vector
+            order = np.argsort(-similarities)[:k + (1 if exclude is not None else 0)]
+            results = []
+            for topic in order:
+                if similarities[topic] <= 0.0:
+                    break
+                labels = sorted(self.labels[topic], key=self.labels[topic].get, reverse=True)
+                if exclude is not None and labels[:1] == [exclude]:
+                    continue
+                results.append({'topic_id': int(topic), 'similarity': float(similarities[topic]),
+                                'documents': int(self.counts[topic]), 'labels': labels[:3]})
+            return results[:k]
+
+    def checkpoint_state(self):
+        # (metadata, arrays) in the form utils.checkpoint stores
+        with self.lock:
+            return ({'size': self.size, 'labels': [dict(labels) for labels in self.labels]},
+                    {'centroids': self.centroids[:self.size].copy(), 'counts': self.counts[:self.size].copy()})
+
+    def restore_checkpoint(self, metadata, arrays):
+        with self.lock:
+            size = metadata['size']
+            if arrays['centroids'].shape[1:] != (self.n_features,):
+                logging.warning(f"Checkpointed topic model has {arrays['centroids'].shape[1]} features, expected {self.n_features}; ignoring it")
+                return
+            self._allocate(max(size, 1))
+            self.centroids[:size] = arrays['centroids']
+            self.counts[:size] = arrays['counts']
+            norms = np.maximum(np.linalg.norm(self.centroids[:size], axis=1, keepdims=True), 1e-12)
+            self.unit[:size] = self.centroids[:size] / norms
+            self.labels = [dict(labels) for labels in metadata['labels']]
+            self.size = size
+
+# Shared by every agent in the process, so all explorations cluster into one set of topics
+topic_model = OnlineTopicModel()
+
+# Example usage
+if __name__ == '__main__':
+    model = OnlineTopicModel()
+    model.partial_fit(["Neural networks learn representations", "Deep learning trains neural networks"], label='AI')
+    model.partial_fit(["Glaciers are melting as temperatures rise", "Rising sea levels follow melting ice"], label='climate')
+    logging.info(f"{model.size} topics; related to 'training neural networks': {model.related('training neural networks', k=2)}")
@@ -0,0 +1,79 @@
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Edge -> fog -> core hierarchy. Each edge agent is assigned one fog agent (the
+# least loaded when no fog is requested), and data keys such as sensor ids are
+# pinned to the edge that first handled them, so tasks about that data can be
+# routed to its edge or to the fog aggregating it.
+class Topology:
+    def __init__(self):
+        self.fogs = {}  # fog_id -> set of assigned edge ids
+        self.edges = {}  # edge_id -> fog_id, or None while no fog is available
+        self.locations = {}  # data key (sensor/node id) -> edge_id
+        self.lock = threading.Lock()
+
+    def add_fog(self, fog_id):
+        # Returns the edges that were waiting for a fog and are now assigned to this one
+        with self.lock:
+            self.fogs.setdefault(fog_id, set())
+            orphans = [edge_id for edge_id, assigned in self.edges.items() if assigned is None]
+            for edge_id in orphans:
+                self.edges[edge_id] = fog_id
+                self.fogs[fog_id].add(edge_id)
+            return orphans
+
+    def assign(self, edge_id, fog_id=None):
+        with self.lock:
+            previous = self.edges.get(edge_id)
+            if previous is not None:
+                self.fogs[previous].discard(edge_id)
+            if fog_id is None or fog_id not in self.fogs:
+                fog_id = min(self.fogs, key=lambda fog: len(self.fogs[fog])) if self.fogs else None
+            self.edges[edge_id] = fog_id
+            if fog_id is not None:
+                self.fogs[fog_id].add(edge_id)
+            return fog_id
+
+    def remove(self, agent_id):
+        # Returns the edges orphaned when agent_id was a fog; the caller reassigns them
+        with self.lock:
+            fog_id = self.edges.pop(agent_id, None)
+            if fog_id is not None:
+                self.fogs[fog_id].discard(agent_id)
+            orphans = self.fogs.pop(agent_id, set())
+            for edge_id in orphans:
+                self.edges[edge_id] = None
+            self.locations = {key: edge_id for key, edge_id in self.locations.items() if edge_id != agent_id}
+            return list(orphans)
+
+    def locate(self, key, edge_id):
+        self.locations[key] = edge_id
+
+    def edge_for(self, task):
+        edge_id = task.get('edge_id')
+        if edge_id is None:
+            key = task.get('sensor_id', task.get('node_id'))
+            edge_id = self.locations.get(key, key)  # A node id may name the edge itself
+        return edge_id if edge_id in self.edges else None
+
+    def candidates(self, task):
+        # Agents closest to the task's data, nearest first: its edge, then that edge's fog
+        edge_id = self.edge_for(task)
+        if edge_id is None:
+            return ()
+        fog_id = self.edges.get(edge_id)
+        return (edge_id,) if fog_id is None else (edge_id, fog_id)
+
+# Example usage
+if __name__ == '__main__':
+    topology = Topology()
+    topology.add_fog('FogNodeAgent_1')
+    topology.add_fog('FogNodeAgent_2')
+    for i in range(4):
+        topology.assign(f"EdgeNodeAgent_{i}")
+    topology.locate('sensor_42', 'EdgeNodeAgent_3')
+    logging.info(f"Assignments: {topology.edges}")
+    logging.info(f"Route for sensor_42: {topology.candidates({'type': 'aggregate_data', 'sensor_id': 'sensor_42'})}")
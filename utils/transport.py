@@ -0,0 +1,150 @@
+import logging
+import queue
+import threading
+import time
+from utils.codec import encode, decode
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Message transports share one interface: send/send_many/receive/consume/close.
+# consume() is written once here in terms of receive(), so a transport only has to
+# implement the primitives.
+class Transport:
+    def send(self, queue_name, message):
+        raise NotImplementedError
+
+    def send_many(self, queue_name, messages):
+        for message in messages:
+            self.send(queue_name, message)
+
+    def receive(self, queue_name, timeout=None):
+        # Returns the next message, or None if none arrived within timeout
+        raise NotImplementedError
+
+    def consume(self, queue_name, callback, stop_event=None, poll_interval=0.05):
+        # Blocks calling callback(message) for each message until stop_event is set
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            message = self.receive(queue_name, timeout=poll_interval)
+            if message is None:
+                continue
+            try:
+                callback(message)
+            except Exception as e:
+                logging.error(f"Error handling message from queue {queue_name}: {e}")
+
+    def close(self):
+        pass
+
+# Same-process transport: messages are handed over as the objects themselves through
+# thread-safe queues, with no serialization or copying. Receivers must treat them as
+# read-only, as the sender still holds a reference.
+class InMemoryTransport(Transport):
+    def __init__(self):
+        self.queues = {}
+        self.lock = threading.Lock()
+
+    def _queue(self, queue_name):
+        messages = self.queues.get(queue_name)
+        if messages is None:
+            with self.lock:
+                messages = self.queues.setdefault(queue_name, queue.SimpleQueue())
+        return messages
+
+    def send(self, queue_name, message):
+        self._queue(queue_name).put(message)
+
+    def send_many(self, queue_name, messages):
+        put = self._queue(queue_name).put
+        for message in messages:
+            put(message)
+
+    def receive(self, queue_name, timeout=None):
+        try:
+            return self._queue(queue_name).get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def pending(self, queue_name):
+        return self._queue(queue_name).qsize()
+
+# Cross-process transport over the pooled AMQP client in utils.communication.
+# Messages are encoded with utils.codec on send and decoded on receive.
+class AmqpTransport(Transport):
+    def __init__(self, communication=None, host='localhost', encode=encode, decode=decode):
+        if communication is None:
+            from utils.communication import Communication
+            communication = Communication(host=host)
+        self.communication = communication
+        self.encode = encode
+        self.decode = decode
+
+    def send(self, queue_name, message):
+        self.communication.send_message(queue_name, self.encode(message))
+
+    def send_many(self, queue_name, messages):
+        self.communication.send_messages(queue_name, [self.encode(message) for message in messages])
+
+    def receive(self, queue_name, timeout=None, poll_interval=0.01):
+        # basic_get doesn't block, so waits are polled
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            body = self.communication.get_message(queue_name)
+            if body is not None:
+                return self.decode(body)
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def close(self):
+        self.communication.close_connection()
+
+# Routes each queue to the in-memory transport unless it was bound as remote, so
+# traffic between agents in this process never touches the broker and only queues
+# shared with other nodes go over AMQP.
+class RoutingTransport(Transport):
+    def __init__(self, local=None, remote=None):
+        self.local = local or InMemoryTransport()
+        self.remote = remote
+        self.remote_queues = set()
+
+    def bind_remote(self, queue_name):
+        if self.remote is None:
+            raise ValueError(f"No remote transport configured for queue {queue_name}")
+        self.remote_queues.add(queue_name)
+
+    def bind_local(self, queue_name):
+        self.remote_queues.discard(queue_name)
+
+    def route(self, queue_name):
+        return self.remote if queue_name in self.remote_queues else self.local
+
+    def send(self, queue_name, message):
+        self.route(queue_name).send(queue_name, message)
+
+    def send_many(self, queue_name, messages):
+        self.route(queue_name).send_many(queue_name, messages)
+
+    def receive(self, queue_name, timeout=None):
+        return self.route(queue_name).receive(queue_name, timeout)
+
+    def close(self):
+        self.local.close()
+        if self.remote is not None:
+            self.remote.close()
+
+def create_transport(amqp_host=None, broker=None):
+    # In-memory only by default; give an AMQP host (or a broker stand-in) to allow remote queues
+    remote = None
+    if amqp_host is not None or broker is not None:
+        from utils.communication import Communication
+        remote = AmqpTransport(Communication(host=amqp_host or 'localhost', broker=broker))
+    return RoutingTransport(InMemoryTransport(), remote)
+
+# Example usage
+if __name__ == '__main__':
+    transport = create_transport()
+    transport.send('test_queue', {'agent': 'EdgeNodeAgent_1', 'data': [1, 2, 3]})
+    logging.info(f"Received message: {transport.receive('test_queue', timeout=1)}")
+    transport.close()
@@ -0,0 +1,486 @@
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from utils.codec import encode, decode
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_BLOCK_HEADER = struct.Struct('<II')  # payload length, crc32 of payload
+
+# Text -> unit vector: hashed term counts (scikit-learn's HashingVectorizer, nothing to
+# fit) multiplied by a fixed random projection, which keeps cosine similarities
+# approximately while shrinking the vector to dim floats.
+class TextEmbedder:
+    def __init__(self, dim=128, n_features=2 ** 13, seed=0):
+        self.dim = dim
+        self.n_features = n_features
+        rng = np.random.default_rng(seed)
+        self.projection = (rng.standard_normal((n_features, dim)) / np.sqrt(dim)).astype(np.float32)
+        self._vectorizer = None
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(n_features=self.n_features, norm='l2', stop_words='english')
+        return self._vectorizer
+
+    def embed(self, texts):
+        if not len(texts):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        vectors = np.asarray(self.vectorizer.transform(texts) @ self.projection, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+# Approximate nearest neighbours by inner product (cosine for unit vectors) with an
+# inverted file: k-means splits the vectors into nlist lists around centroids, and a
+# query scores only the vectors in the nprobe lists whose centroids are closest. Below
+# min_train vectors everything sits in one list and search is exact. The lists are
+# re-clustered whenever the index has grown retrain_growth-fold since the last
+# training, so list sizes stay near sqrt(n) and adds stay O(nlist * dim). Training
+# works on a copy of the lists taken at its start and only swaps the new lists in
+# under the lock, assigning the vectors added meanwhile; with background set it runs
+# on its own thread, so add() and search() carry on while it runs. add() returns the
+# list of each vector and the training version it belongs to; saved with the vectors
+# and training_state(), they let load() rebuild the lists without reassigning. Thread-safe.
+class IVFIndex:
+    def __init__(self, dim, nprobe=8, min_train=4096, retrain_growth=4.0, kmeans_iterations=8, seed=0, background=False):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.retrain_growth = retrain_growth
+        self.kmeans_iterations = kmeans_iterations
+        self.background = background
+        self.rng = np.random.default_rng(seed)
+        self.centroids = None
+        self.trained_size = 0
+        self.size = 0
+        self.list_vectors = [np.zeros((64, dim), dtype=np.float32)]
+        self.list_ids = [np.zeros(64, dtype=np.int64)]
+        self.list_sizes = [0]
+        self.version = 0  # Bumped by every training swapped in
+        self.assignment = None  # (ids, lists) of every vector when the last training was swapped in
+        self.training = None  # Thread running a training, if any
+        self.generation = 0  # Bumped when load replaces the lists, so an older training isn't swapped in
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def _append(self, list_id, vectors, ids):
+        size, count = self.list_sizes[list_id], len(ids)
+        if size + count > len(self.list_ids[list_id]):
+            capacity = max(2 * len(self.list_ids[list_id]), size + count)
+            grown_vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown_ids = np.zeros(capacity, dtype=np.int64)
+            grown_vectors[:size] = self.list_vectors[list_id][:size]
+            grown_ids[:size] = self.list_ids[list_id][:size]
+            self.list_vectors[list_id], self.list_ids[list_id] = grown_vectors, grown_ids
+        self.list_vectors[list_id][size:size + count] = vectors
+        self.list_ids[list_id][size:size + count] = ids
+        self.list_sizes[list_id] = size + count
+
+    def _assign(self, vectors, centroids, chunk=65536):
+        # Nearest centroid per vector, in chunks to bound the score matrix
+        return np.concatenate([np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+                               for start in range(0, len(vectors), chunk)]) if len(vectors) else np.zeros(0, np.int64)
+
+    def _insert(self, vectors, ids):
+        lists = self._assign(vectors, self.centroids) if self.centroids is not None else np.zeros(len(ids), np.int64)
+        order = np.argsort(lists, kind='stable')
+        boundaries = np.flatnonzero(np.diff(lists[order])) + 1
+        for group in np.split(order, boundaries):
+            if len(group):
+                self._append(int(lists[group[0]]), vectors[group], ids[group])
+        return lists
+
+    def add(self, vectors, ids):
+        # (list of each vector, training version)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        with self.lock:
+            lists = self._insert(vectors, ids)
+            version = self.version
+            self.size += len(ids)
+            retrain = (self.training is None and self.size >= self.min_train
+                       and self.size >= self.retrain_growth * max(self.trained_size, 1))
+            if retrain:
+                self.training = threading.Thread(target=self.train, daemon=True) if self.background else threading.current_thread()
+        if retrain:
+            if self.background:
+                self.training.start()
+            else:
+                self.train()
+        return lists, version
+
+    def train(self):
+        # Spherical k-means on a sample, then every vector is redistributed over the new lists
+        try:
+            start = time.time()
+            with self.lock:  # Rows below each list's size are never rewritten, so these references stay valid
+                lists = list(zip(self.list_vectors, self.list_ids, self.list_sizes))
+                generation = self.generation
+            vectors = np.concatenate([v[:n] for v, _, n in lists])
+            ids = np.concatenate([i[:n] for _, i, n in lists])
+            nlist = int(np.clip(np.sqrt(len(vectors)), 16, 1024))
+            sample = vectors[self.rng.choice(len(vectors), min(len(vectors), 32 * nlist), replace=False)]
+            centroids = sample[self.rng.choice(len(sample), nlist, replace=False)].copy()
+            for _ in range(self.kmeans_iterations):
+                labels = self._assign(sample, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                empty = ~np.bincount(labels, minlength=nlist).astype(bool)
+                sums[empty] = sample[self.rng.choice(len(sample), int(empty.sum()))]  # Re-seed empty lists
+                centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+            labels = self._assign(vectors, centroids)
+            order = np.argsort(labels, kind='stable')
+            counts = np.bincount(labels, minlength=nlist)
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            sorted_vectors, sorted_ids = vectors[order], ids[order]
+            list_vectors = [sorted_vectors[offsets[i]:offsets[i + 1]].copy() for i in range(nlist)]
+            list_ids = [sorted_ids[offsets[i]:offsets[i + 1]].copy() for i in range(nlist)]
+            with self.lock:
+                if self.generation != generation:
+                    return  # load replaced the lists meanwhile
+                added = [(v[n:m], i[n:m]) for (_, _, n), v, i, m in zip(lists, self.list_vectors, self.list_ids, self.list_sizes) if m > n]
+                self.centroids = centroids
+                self.list_vectors, self.list_ids, self.list_sizes = list_vectors, list_ids, counts.tolist()
+                if added:
+                    added_ids = np.concatenate([i for _, i in added])
+                    added_lists = self._insert(np.concatenate([v for v, _ in added]), added_ids)
+                    ids, labels = np.concatenate([ids, added_ids]), np.concatenate([labels, added_lists])
+                self.assignment = (ids, labels)
+                self.trained_size = len(vectors)
+                self.version += 1
+            logging.info(f"IVFIndex trained {nlist} lists over {len(vectors)} vectors in {time.time() - start:.1f}s")
+        except Exception as e:
+            logging.error(f"Error training IVF index: {e}")
+        finally:
+            with self.lock:
+                self.training = None
+
+    def search(self, query, k=10, nprobe=None):
+        # (ids, scores) of the k best matches, best first
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        with self.lock:
+            if self.centroids is None:
+                probes = [0]
+            else:
+                centroid_scores = self.centroids @ query
+                nprobe = min(nprobe or self.nprobe, len(centroid_scores))
+                probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+            scores = [self.list_vectors[p][:self.list_sizes[p]] @ query for p in probes]
+            ids = [self.list_ids[p][:self.list_sizes[p]] for p in probes]
+        scores, ids = np.concatenate(scores), np.concatenate(ids)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            scores, ids = scores[top], ids[top]
+        order = np.argsort(-scores)
+        return ids[order], scores[order]
+
+    def training_state(self):
+        # Centroids of the last training and the list of every vector it was swapped in over; None before any
+        with self.lock:
+            if self.centroids is None:
+                return None
+            ids, lists = self.assignment
+            return {'version': self.version, 'centroids': self.centroids, 'trained_size': self.trained_size,
+                    'ids': ids, 'lists': lists}
+
+    def load(self, vectors, ids, lists, versions, training=None):
+        # Replaces the contents with vectors, given the list and version add() returned for each and a
+        # training_state(); only vectors whose list under that training is unknown are reassigned
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if training is None:
+            centroids, resolved = None, np.zeros(len(ids), np.int64)
+        else:
+            centroids, resolved = training['centroids'], np.full(len(ids), -1, np.int64)
+            if len(ids):
+                order = np.argsort(ids, kind='stable')
+                rows = order[np.minimum(np.searchsorted(ids, training['ids'], sorter=order), len(ids) - 1)]
+                known = ids[rows] == training['ids']
+                resolved[rows[known]] = training['lists'][known]
+            current = np.asarray(versions) == training['version']
+            resolved[current] = np.asarray(lists)[current]
+            missing = resolved < 0
+            if missing.any():
+                resolved[missing] = self._assign(vectors[missing], centroids)
+        nlist = len(centroids) if centroids is not None else 1
+        order = np.argsort(resolved, kind='stable')
+        counts = np.bincount(resolved, minlength=nlist)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        sorted_vectors, sorted_ids = vectors[order], ids[order]
+        with self.lock:
+            # Each list starts at capacity, so the first add to it copies it out of the shared arrays
+            self.list_vectors = [sorted_vectors[offsets[i]:offsets[i + 1]] for i in range(nlist)]
+            self.list_ids = [sorted_ids[offsets[i]:offsets[i + 1]] for i in range(nlist)]
+            self.list_sizes = counts.tolist()
+            self.centroids = centroids
+            self.version = training['version'] if training is not None else 0
+            self.assignment = (training['ids'], training['lists']) if training is not None else None
+            self.trained_size = training['trained_size'] if training is not None else 0
+            self.size = len(ids)
+            self.generation += 1
+
+def _normalize(text):
+    return " ".join(str(text).lower().split())
+
+# Embedding index over the reports in the core's knowledge base, so a new explore or
+# solve_problem task can be matched against earlier results. lookup(task) returns
+# ('reuse', [match]) when a report on the same topic/problem is younger than reuse_age
+# (the core then answers the task with it), ('seed', matches) for reports at least
+# seed_threshold similar (the core attaches them to the task as related_results), or
+# None. Reports are embedded from their topic or problem plus what the agent found
+# (summary and entities, or subtask descriptions); reports that are themselves reuses
+# (reused_from) are not indexed again. attach(store) ties the index to a KnowledgeStore:
+# entries then keep only the store's record id, and every store snapshot saves the
+# index in the store's directory, as it does its own index:
+#   index_vectors.seg   the entries and vectors added since the previous save, with
+#                       their IVF lists, one framed block per save, appended only
+#   index_lists.bin     the last IVF training, rewritten only after a retrain
+#   index.bin           dimension, the store records covered and how much of
+#                       index_vectors.seg is valid
+# Only references are taken under the lock; encoding and writes happen outside it.
+# Reopening rebuilds the IVF lists from those files and indexes only the records
+# appended after them.
+class KnowledgeIndex:
+    def __init__(self, embedder=None, index=None, reuse_age=3600.0, seed_threshold=0.35, max_seeds=3):
+        self.embedder = embedder or TextEmbedder()
+        self.index = index if index is not None else IVFIndex(self.embedder.dim, background=True)  # Retrains without stalling reports and lookups
+        self.reuse_age = reuse_age
+        self.seed_threshold = seed_threshold
+        self.max_seeds = max_seeds
+        self.entries = []  # index id -> {'agent', 'subject', 'timestamp', 'record_id', and 'report' without a store}
+        self.latest = {}  # normalized subject -> index id of its newest report
+        self.store = None
+        self.next_record = 0  # Every store record below this id has been considered for the index
+        self.seen_records = set()  # Considered record ids at or above next_record (reports arrive out of order)
+        self.unsaved = []  # (vectors, lists, version) from index.add for the entries from saved_entries on
+        self.saved_entries = 0
+        self.saved_length = 0  # Valid bytes of index_vectors.seg
+        self.saved_version = None  # IVF training version in index_lists.bin, 0 for none, None when unknown
+        self.save_lock = threading.Lock()  # Serializes saves; taken before lock
+        self.lock = threading.Lock()
+        self.reused = 0
+        self.seeded = 0
+
+    def report_text(self, report):
+        findings = report.get('findings') or {}
+        parts = [report.get('topic') or report.get('problem') or '', findings.get('summary') or '']
+        parts.extend(str(entity[0]) for entity in findings.get('entities') or [])
+        parts.extend(subtask.get('description', '') for subtask in report.get('subtasks') or [])
+        return " ".join(part for part in parts if part)
+
+    def _subject(self, report):
+        # The topic or problem a report answers; None for errors, reuses and other reports
+        subject = report.get('topic') or report.get('problem')
+        if 'error' in report or 'reused_from' in report or not isinstance(subject, str):
+            return None
+        return subject
+
+    def _mark_seen_locked(self, record_id):
+        if record_id is None or record_id < self.next_record:
+            return
+        self.seen_records.add(record_id)
+        while self.next_record in self.seen_records:
+            self.seen_records.discard(self.next_record)
+            self.next_record += 1
+
+    def add_records(self, records):
+        # records: dicts shaped like KnowledgeStore records ('agent', 'report', 'timestamp' and,
+        # from a store, 'id'), embedded in one batch. Returns how many were indexed
+        records = list(records)
+        indexable = [record for record in records if isinstance(record['report'], dict)
+                     and self._subject(record['report']) is not None]
+        vectors = self.embedder.embed([self.report_text(record['report']) for record in indexable])
+        with self.lock:
+            first = len(self.entries)
+            for record in indexable:
+                entry = {'agent': record['agent'], 'subject': self._subject(record['report']),
+                         'timestamp': record['timestamp'], 'record_id': record.get('id')}
+                if self.store is None or entry['record_id'] is None:
+                    entry['report'] = record['report']
+                self.latest[_normalize(entry['subject'])] = len(self.entries)
+                self.entries.append(entry)
+            if indexable:
+                lists, version = self.index.add(vectors, np.arange(first, len(self.entries)))
+                if self.store is not None:
+                    self.unsaved.append((vectors, lists, version))
+            for record in records:
+                self._mark_seen_locked(record.get('id'))
+        return len(indexable)
+
+    def add_report(self, agent_id, report, record_id=None):
+        return self.add_records([{'id': record_id, 'agent': agent_id, 'report': report, 'timestamp': time.time()}])
+
+    def _match(self, index_id, similarity):
+        # Entry as a match, its report read back from the store when it isn't kept here; None once compacted away
+        entry = self.entries[index_id]
+        report = entry.get('report')
+        if report is None:
+            record = self.store.get(entry['record_id']) if self.store is not None else None
+            if record is None:
+                return None
+            report = record['report']
+        match = {key: value for key, value in entry.items() if key != 'report'}
+        match.update(id=int(index_id), similarity=float(similarity), report=report)
+        return match
+
+    def similar(self, text, k=5):
+        # [{'id', 'similarity', 'agent', 'subject', 'timestamp', 'record_id', 'report'}] for the k most similar reports
+        vector = self.embedder.embed([text])[0]
+        with self.lock:
+            if not len(self.index) or not vector.any():
+                return []
+            ids, scores = self.index.search(vector, k)
+        matches = (self._match(i, score) for i, score in zip(ids, scores))
+        return [match for match in matches if match is not None]
+
+    def lookup(self, task):
+        subject = {'explore': task.get('topic'), 'solve_problem': task.get('problem')}.get(task.get('type'))
+        if not isinstance(subject, str):
+            return None
+        if not task.get('refresh'):
+            with self.lock:
+                latest = self.latest.get(_normalize(subject))
+                fresh = latest is not None and time.time() - self.entries[latest]['timestamp'] <= self.reuse_age
+            match = self._match(latest, 1.0) if fresh else None
+            if match is not None:
+                self.reused += 1
+                return 'reuse', [match]
+        seeds = [match for match in self.similar(subject, self.max_seeds) if match['similarity'] >= self.seed_threshold]
+        if not seeds:
+            return None
+        self.seeded += 1
+        return 'seed', seeds
+
+    def _file(self, name):
+        return os.path.join(self.store.path, name)
+
+    def _write(self, name, data):
+        temporary = f"{self._file(name)}.tmp"
+        with open(temporary, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._file(name))
+
+    def _load(self):
+        # Entries and IVF lists from the files of the last save; False when there are none to use
+        if not os.path.exists(self._file('index.bin')):
+            return False
+        with open(self._file('index.bin'), 'rb') as file:
+            saved = decode(file.read())
+        if saved['dim'] != self.embedder.dim:
+            logging.warning(f"Saved knowledge index has dimension {saved['dim']}, expected {self.embedder.dim}; rebuilding it")
+            return False
+        if 'length' not in saved:
+            logging.warning("Saved knowledge index is in an older format; rebuilding it")
+            return False
+        with open(self._file('index_vectors.seg'), 'rb') as file:
+            data = file.read(saved['length'])
+        if len(data) < saved['length']:
+            raise ValueError(f"index_vectors.seg holds {len(data)} of {saved['length']} bytes")
+        blocks, offset = [], 0
+        while offset < len(data):
+            size, crc = _BLOCK_HEADER.unpack_from(data, offset)
+            payload = data[offset + _BLOCK_HEADER.size:offset + _BLOCK_HEADER.size + size]
+            if len(payload) < size or zlib.crc32(payload) != crc:
+                raise ValueError(f"corrupt knowledge index block at {offset}")
+            blocks.append(decode(payload))
+            offset += _BLOCK_HEADER.size + size
+        training = None
+        if os.path.exists(self._file('index_lists.bin')):
+            with open(self._file('index_lists.bin'), 'rb') as file:
+                training = decode(file.read())
+        entries = [{'agent': agent, 'subject': subject, 'timestamp': timestamp, 'record_id': record_id if record_id >= 0 else None}
+                   for block in blocks for agent, subject, timestamp, record_id
+                   in zip(block['agents'], block['subjects'], block['timestamps'].tolist(), block['record_ids'].tolist())]
+        column = lambda name, dtype: np.concatenate([block[name] for block in blocks]) if blocks else np.zeros(0, dtype)
+        self.index.load(column('vectors', np.float32).reshape(-1, self.embedder.dim), np.arange(len(entries)),
+                        column('lists', np.int64), column('versions', np.int64), training)
+        with self.lock:
+            self.entries = entries
+            self.latest = {_normalize(entry['subject']): index_id for index_id, entry in enumerate(entries)}
+            self.next_record = saved['next_record']
+            self.unsaved, self.saved_entries, self.saved_length = [], len(entries), saved['length']
+            self.saved_version = training['version'] if training is not None else 0
+        return True
+
+    def attach(self, store):
+        # Loads the index saved with store's last snapshot, indexes the records appended since,
+        # and saves again with every snapshot from now on. Returns how many records were indexed
+        self.store = store
+        try:
+            self._load()
+        except Exception as e:
+            logging.error(f"Error loading knowledge index, rebuilding it: {e}")
+            self.index = IVFIndex(self.embedder.dim, background=True)
+            with self.lock:
+                self.entries, self.latest, self.next_record = [], {}, 0
+                self.unsaved, self.saved_entries, self.saved_length, self.saved_version = [], 0, 0, None
+        loaded = len(self.entries)
+        records = (store.get(record_id) for record_id in range(self.next_record, store.next_id))
+        indexed = self.add_records(record for record in records if record is not None)
+        store.snapshot_listeners.append(self.save)
+        logging.info(f"Knowledge index loaded {loaded} reports and indexed {indexed} newer ones")
+        return indexed
+
+    def save(self):
+        # Appends what was added since the last save; the lock is held only to take references to it
+        if self.store is None:
+            return
+        with self.save_lock:
+            with self.lock:
+                chunks, self.unsaved = self.unsaved, []
+                entries = self.entries[self.saved_entries:]
+                next_record = self.next_record
+            training = self.index.training_state()
+            try:
+                block = b''
+                if entries:
+                    payload = encode({'vectors': np.concatenate([vectors for vectors, _, _ in chunks]),
+                                      'lists': np.concatenate([lists for _, lists, _ in chunks]),
+                                      'versions': np.concatenate([np.full(len(lists), version, np.int64) for _, lists, version in chunks]),
+                                      'agents': [entry['agent'] for entry in entries],
+                                      'subjects': [entry['subject'] for entry in entries],
+                                      'timestamps': np.array([entry['timestamp'] for entry in entries], dtype=np.float64),
+                                      'record_ids': np.array([entry['record_id'] if entry['record_id'] is not None else -1
+                                                              for entry in entries], dtype=np.int64)})
+                    block = _BLOCK_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+                with open(self._file('index_vectors.seg'), 'ab') as file:
+                    file.truncate(self.saved_length)  # Drops a block torn by an earlier crash
+                    file.write(block)
+                    file.flush()
+                    os.fsync(file.fileno())
+                version = training['version'] if training is not None else 0
+                if version != self.saved_version:
+                    if training is not None:
+                        self._write('index_lists.bin', encode(training))
+                    elif os.path.exists(self._file('index_lists.bin')):
+                        os.remove(self._file('index_lists.bin'))  # Left by an index rebuilt since
+                self._write('index.bin', encode({'dim': self.embedder.dim, 'next_record': next_record,
+                                                 'length': self.saved_length + len(block)}))
+                self.saved_entries += len(entries)
+                self.saved_length += len(block)
+                self.saved_version = version
+            except Exception:
+                with self.lock:
+                    self.unsaved[:0] = chunks  # Written again with the next save
+                raise
+
+# Example usage
+if __name__ == '__main__':
+    index = KnowledgeIndex()
+    index.add_report('CuriosityEngine_1', {'agent': 'CuriosityEngine_1', 'topic': 'neural networks',
+                                           'findings': {'summary': 'Deep neural networks learn layered representations'}})
+    index.add_report('ProblemSolver_1', {'agent': 'ProblemSolver_1', 'problem': 'reduce data center energy use',
+                                         'subtasks': [{'id': 1, 'description': 'Analyze cooling energy'}]})
+    logging.info(f"Lookup for a repeated topic: {index.lookup({'type': 'explore', 'topic': 'Neural Networks'})[0]}")
+    logging.info(f"Lookup for a related topic: {index.lookup({'type': 'explore', 'topic': 'training deep neural networks'})}")
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Responses by URL, least recently used evicted past max_entries. An entry is fresh
+# until its Cache-Control max-age (or ttl when the server gives none) runs out; after
+# that its ETag/Last-Modified let the fetcher revalidate with a conditional request
+# instead of downloading the body again.
+class HttpCache:
+    def __init__(self, ttl=300.0, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # url -> {'text', 'etag', 'last_modified', 'expires'}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _lifetime(self, headers):
+        control = headers.get('Cache-Control', '')
+        if 'no-store' in control:
+            return None
+        if 'no-cache' in control:
+            return 0.0
+        match = re.search(r'max-age=(\d+)', control)
+        return float(match.group(1)) if match else self.ttl
+
+    def get(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                self.entries.move_to_end(url)
+            return entry
+
+    def store(self, url, headers, text):
+        lifetime = self._lifetime(headers)
+        if lifetime is None:
+            return
+        with self.lock:
+            self.entries[url] = {'text': text, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified'),
+                                 'expires': time.time() + lifetime}
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def refresh(self, url, headers):
+        # The server answered 304: the cached body is fresh again
+        lifetime = self._lifetime(headers)
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                entry['expires'] = time.time() + (lifetime or 0.0)
+                self.revalidated += 1
+            return entry
+
+# Pooled HTTP GETs on an asyncio loop in a background thread (aiohttp), shared by
+# every agent so connections are reused across tasks. At most max_connections are
+# open at once and per_host per host; each request has a timeout and is retried with
+# exponential backoff on connection errors and on 429/5xx. Concurrent requests for
+# the same URL share one download. Synchronous code calls submit() to start a fetch
+# and keep working (e.g. while a previous task's content is processed) and get() to
+# wait for the body. prefetch() also starts a fetch, and its body is held until a
+# matching get() takes it whatever the HTTP cache allows (search pages are usually
+# sent with max-age=0), for up to max_prefetched URLs.
+class AsyncFetcher:
+    def __init__(self, max_connections=32, per_host=4, timeout=10.0, retries=2, backoff=0.5, cache=None, headers=None,
+                 max_prefetched=256):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache if cache is not None else HttpCache()
+        self.headers = headers or {'User-Agent': 'Mozilla/5.0 (compatible; Omnipong)'}
+        self.loop = None
+        self.thread = None
+        self.session = None
+        self.inflight = {}  # url -> asyncio task; only touched on the loop thread
+        self.max_prefetched = max_prefetched
+        self.prefetched = OrderedDict()  # url -> [future, gets still expected]
+        self.lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name='web-fetcher', daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def _session(self):
+        if self.session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def fetch(self, url):
+        task = self.inflight.get(url)
+        if task is None:
+            task = self.inflight[url] = asyncio.ensure_future(self._fetch(url))
+            task.add_done_callback(lambda _: self.inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url):
+        import aiohttp
+
+        entry = self.cache.get(url)
+        if entry is not None and entry['expires'] > time.time():
+            self.cache.hits += 1
+            return entry['text']
+        self.cache.misses += 1
+        headers = {}
+        if entry is not None and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry is not None and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._session().get(url, headers=headers) as response:
+                    if response.status == 304 and entry is not None:
+                        self.cache.refresh(url, response.headers)
+                        return entry['text']
+                    if response.status in RETRY_STATUSES:
+                        if attempt < self.retries:
+                            logging.warning(f"HTTP {response.status} from {url}; retrying")
+                            await asyncio.sleep(self.backoff * 2 ** attempt)
+                            continue
+                        if entry is not None:
+                            logging.warning(f"HTTP {response.status} from {url}; using the stale cached copy")
+                            return entry['text']
+                    response.raise_for_status()
+                    text = await response.text()
+                    self.cache.store(url, response.headers, text)
+                    return text
+            except aiohttp.ClientResponseError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    if entry is not None:
+                        logging.warning(f"Fetching {url} failed ({e!r}); using the stale cached copy")
+                        return entry['text']
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    def submit(self, url):
+        # concurrent.futures.Future of the response body
+        return asyncio.run_coroutine_threadsafe(self.fetch(url), self._ensure_loop())
+
+    def prefetch(self, url):
+        # Starts fetching url for a later get(); each prefetch is matched by one get
+        with self.lock:
+            entry = self.prefetched.get(url)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0]
+        future = self.submit(url)
+        with self.lock:
+            entry = self.prefetched.setdefault(url, [future, 0])
+            entry[1] += 1
+            while len(self.prefetched) > self.max_prefetched:
+                self.prefetched.popitem(last=False)
+            return entry[0]
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            entry = self.prefetched.get(url)
+            if entry is not None:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.prefetched[url]
+        future = entry[0] if entry is not None else self.submit(url)
+        return future.result(timeout)
+
+    def close(self):
+        with self.lock:
+            loop, self.loop = self.loop, None
+            self.prefetched.clear()
+        if loop is None:
+            return
+        if self.session is not None:
+            asyncio.run_coroutine_threadsafe(self.session.close(), loop).result()
+            self.session = None
+        loop.call_soon_threadsafe(loop.stop)
+        self.thread.join()
+        loop.close()
+
+# Shared by every agent in the process
+web_fetcher = AsyncFetcher()
+
+# Example usage
+if __name__ == '__main__':
+    urls = [f"https://example.com/?q={i}" for i in range(4)]
+    futures = [web_fetcher.submit(url) for url in urls]  # All in flight at once
+    for url, future in zip(urls, futures):
+        try:
+            logging.info(f"{url}: {len(future.result())} characters")
+        except Exception as e:
+            logging.error(f"Error fetching {url}: {e}")
+    web_fetcher.get(urls[0])
+    logging.info(f"Cache hits: {web_fetcher.cache.hits}, misses: {web_fetcher.cache.misses}")
+    web_fetcher.close()
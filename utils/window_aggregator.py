@@ -0,0 +1,169 @@
+import logging
+import threading
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Log-spaced histogram bins with bounded relative error (as in DDSketch): |x| in
+# [min_value * gamma**(k-1), min_value * gamma**k) falls in bin k, mirrored for
+# negative values around a zero bin. Histograms with the same layout add and subtract
+# bin by bin, which is what lets windows expire old data without the raw values.
+class QuantileBins:
+    def __init__(self, relative_accuracy=0.05, min_value=1e-4, bins_per_sign=256):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+        self.bins_per_sign = bins_per_sign
+        self.size = 2 * bins_per_sign + 1
+        k = np.arange(bins_per_sign)
+        magnitudes = min_value * 2 * self.gamma ** k / (self.gamma + 1)  # Midpoint estimate per bin
+        self.values = np.concatenate([-magnitudes[::-1], [0.0], magnitudes])
+
+    def index(self, values):
+        magnitude = np.abs(values)
+        k = np.ceil(np.log(np.maximum(magnitude, self.min_value) / self.min_value) / self.log_gamma)
+        k = np.clip(k, 0, self.bins_per_sign - 1).astype(np.int64)
+        return np.where(magnitude < self.min_value, self.bins_per_sign,
+                        np.where(values > 0, self.bins_per_sign + 1 + k, self.bins_per_sign - 1 - k))
+
+    def quantiles(self, histogram, qs):
+        cumulative = np.cumsum(histogram)
+        if not cumulative[-1]:
+            return [None] * len(qs)
+        ranks = np.asarray(qs, dtype=np.float64) * (cumulative[-1] - 1)
+        return self.values[np.searchsorted(cumulative, ranks, side='right')].tolist()
+
+# Per-key statistics over event-time windows. Time is cut into buckets of
+# bucket_width seconds kept in a ring of num_buckets slots per key: each bucket is a
+# tumbling window, and the last num_buckets buckets form the sliding window. Running
+# sliding-window totals are updated as data arrives and as buckets expire, so count,
+# mean and variance queries are O(1) and min/max/quantiles cost O(num_buckets) or
+# O(bins), never a pass over the raw readings. Readings older than the sliding
+# window are dropped. Thread-safe.
+class WindowedAggregator:
+    def __init__(self, bucket_width=1.0, num_buckets=60, capacity=16, quantile_bins=None):
+        self.bucket_width = bucket_width
+        self.num_buckets = num_buckets
+        self.bins = quantile_bins or QuantileBins()
+        self.slots = {}  # key -> row in the arrays below
+        self.keys = []
+        self.head = None  # Absolute index of the newest bucket seen
+        self.lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        shape = (capacity, self.num_buckets)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.sum = np.zeros(shape)
+        self.sumsq = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.histogram = np.zeros(shape + (self.bins.size,), dtype=np.int32)
+        self.window_count = np.zeros(capacity, dtype=np.int64)
+        self.window_sum = np.zeros(capacity)
+        self.window_sumsq = np.zeros(capacity)
+        self.window_histogram = np.zeros((capacity, self.bins.size), dtype=np.int64)
+
+    def _grow(self):
+        old = (self.count, self.sum, self.sumsq, self.min, self.max, self.histogram,
+               self.window_count, self.window_sum, self.window_sumsq, self.window_histogram)
+        self._allocate(2 * len(old[0]))
+        new = (self.count, self.sum, self.sumsq, self.min, self.max, self.histogram,
+               self.window_count, self.window_sum, self.window_sumsq, self.window_histogram)
+        for old_array, new_array in zip(old, new):
+            new_array[:len(old_array)] = old_array
+
+    def _slot(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            if slot >= len(self.count):
+                self._grow()
+        return slot
+
+    def _expire(self, positions):
+        # Takes whole ring columns out of the sliding totals and clears them for reuse
+        self.window_count -= self.count[:, positions].sum(axis=1)
+        self.window_sum -= self.sum[:, positions].sum(axis=1)
+        self.window_sumsq -= self.sumsq[:, positions].sum(axis=1)
+        self.window_histogram -= self.histogram[:, positions].sum(axis=1)
+        self.count[:, positions] = 0
+        self.sum[:, positions] = 0.0
+        self.sumsq[:, positions] = 0.0
+        self.min[:, positions] = np.inf
+        self.max[:, positions] = -np.inf
+        self.histogram[:, positions] = 0
+
+    def _advance(self, newest):
+        if self.head is None:
+            self.head = newest
+        elif newest > self.head:
+            expired = np.arange(self.head + 1, min(newest, self.head + self.num_buckets) + 1) % self.num_buckets
+            self._expire(expired)
+            self.head = newest
+
+    def add(self, key, timestamps, values):
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return 0
+        buckets = np.floor(timestamps / self.bucket_width).astype(np.int64)
+        with self.lock:
+            slot = self._slot(key)
+            self._advance(int(buckets.max()))
+            live = buckets > self.head - self.num_buckets
+            if not live.all():
+                buckets, values = buckets[live], values[live]
+            positions = buckets % self.num_buckets
+            bins = self.bins.index(values)
+            np.add.at(self.count[slot], positions, 1)
+            np.add.at(self.sum[slot], positions, values)
+            np.add.at(self.sumsq[slot], positions, values * values)
+            np.minimum.at(self.min[slot], positions, values)
+            np.maximum.at(self.max[slot], positions, values)
+            np.add.at(self.histogram[slot], (positions, bins), 1)
+            self.window_count[slot] += len(values)
+            self.window_sum[slot] += values.sum()
+            self.window_sumsq[slot] += (values * values).sum()
+            np.add.at(self.window_histogram[slot], bins, 1)
+            return len(values)
+
+    def _summary(self, count, total, total_sq, minimum, maximum, histogram, qs):
+        if not count:
+            return {'count': 0}
+        mean = total / count
+        summary = {'count': int(count), 'mean': float(mean), 'variance': float(max(total_sq / count - mean * mean, 0.0)),
+                   'min': float(minimum), 'max': float(maximum)}
+        summary.update(zip((f"p{round(q * 100)}" for q in qs), self.bins.quantiles(histogram, qs)))
+        return summary
+
+    def sliding(self, key, qs=(0.5, 0.9, 0.99)):
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None:
+                return {'count': 0}
+            return self._summary(self.window_count[slot], self.window_sum[slot], self.window_sumsq[slot],
+                                 self.min[slot].min(), self.max[slot].max(), self.window_histogram[slot], qs)
+
+    def tumbling(self, key, offset=1, qs=(0.5, 0.9, 0.99)):
+        # offset=0 is the bucket still filling, 1 the last complete one, and so on
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None or self.head is None or offset >= self.num_buckets:
+                return {'count': 0}
+            position = (self.head - offset) % self.num_buckets
+            summary = self._summary(self.count[slot, position], self.sum[slot, position], self.sumsq[slot, position],
+                                    self.min[slot, position], self.max[slot, position],
+                                    self.histogram[slot, position], qs)
+            summary['window_start'] = (self.head - offset) * self.bucket_width
+            return summary
+
+# Example usage
+if __name__ == '__main__':
+    aggregator = WindowedAggregator(bucket_width=1.0, num_buckets=10)
+    timestamps = np.arange(0, 20, 0.001)
+    aggregator.add('EdgeNodeAgent_1', timestamps, np.random.normal(50, 5, len(timestamps)))
+    logging.info(f"Sliding window: {aggregator.sliding('EdgeNodeAgent_1')}")
+    logging.info(f"Last tumbling window: {aggregator.tumbling('EdgeNodeAgent_1')}")